@@ -0,0 +1,67 @@
+"""
+Сравнение стоимости разбора callback_data: старый split/rsplit и фабрики CallbackData.
+
+Запуск из корня репозитория:
+    python -m benchmarks.callback_decode [-n 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from keyboards.callbacks import CourseCb, LeadCb, LeadKind, ServiceCb, SymptomItemCb
+
+
+def legacy_service(data: str) -> str:
+    return data.split("svc:", 1)[1]
+
+
+def legacy_course(data: str) -> str | None:
+    payload = data.split("course:", 1)[1].strip()
+    if payload in {"__menu__", "__back__"}:
+        return None
+    return payload
+
+
+def legacy_symptom_item(data: str) -> tuple[str, int]:
+    payload = (data or "").split("sym:item:", 1)[-1]
+    key, index_str = payload.rsplit(":", 1)
+    return key, int(index_str)
+
+
+def legacy_lead(data: str) -> tuple[str, str]:
+    _, kind, item_id = data.split(":", 2)
+    return kind, item_id
+
+
+# (случай, старый разбор, старый payload, фабрика, новый payload)
+CASES = [
+    ("service", legacy_service, "svc:support_complex_dairy_farm", ServiceCb, ServiceCb(n=3_912_417_065).pack()),
+    ("course", legacy_course, "course:dpo_agronomy", CourseCb, CourseCb(n=1_127_553_204).pack()),
+    ("symptom item", legacy_symptom_item, "sym:item:0a1b2c3d:12", SymptomItemCb,
+     SymptomItemCb(cat=5, i=12).pack()),
+    ("lead", legacy_lead, "lead:service:support_complex_dairy_farm", LeadCb,
+     LeadCb(kind=LeadKind.SERVICE, n=3_912_417_065).pack()),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--number", type=int, default=200_000, help="разборов на случай")
+    args = parser.parse_args()
+
+    print(f"{'case':<14} {'split, мкс':>11} {'unpack, мкс':>12} {'x':>6}  payload (было -> стало)")
+    for name, legacy, old_payload, factory, packed in CASES:
+        legacy_s = min(timeit.repeat(lambda: legacy(old_payload), number=args.number, repeat=3))
+        codec_s = min(timeit.repeat(lambda: factory.unpack(packed), number=args.number, repeat=3))
+        legacy_us = legacy_s / args.number * 1e6
+        codec_us = codec_s / args.number * 1e6
+        print(
+            f"{name:<14} {legacy_us:>11.3f} {codec_us:>12.3f} {codec_us / legacy_us:>6.1f}  "
+            f"{len(old_payload)}B -> {len(packed)}B"
+        )
+
+
+if __name__ == "__main__":
+    main()
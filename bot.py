@@ -3,57 +3,154 @@ from __future__ import annotations
 import asyncio
 import logging
 
-from aiogram import Bot, Dispatcher
+from aiogram import Bot, Dispatcher, Router
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
-from config import load_settings
+from config import Settings, load_settings
+from utils.lead_journal import close_journals
+from utils.subscribers import close_subscribers
+from utils.digest_store import flush_store, get_store as get_digest_store
+from utils.storage import run_io
+from utils.notify import close_outbox, start_outbox
+from utils.catalog import warm_catalogs
+from utils.rate_limit import RateLimitMiddleware
+from utils.fsm_storage import FSM_PATH, SQLiteStorage
+from utils.update_isolation import UserEventIsolation
+from utils.permissions import AdminGate
+from utils.webhook import run_webhook
 
 # Пользовательские разделы
+from handlers.menu import router as menu_router
 from handlers.start import router as start_router
-from handlers.services import router as services_router
-from handlers.courses import router as courses_router
-from handlers.forms import router as forms_router
-from handlers.symptoms import router as symptoms_router
+from handlers.services import router as services_router, warm_service_cards
+from handlers.courses import router as courses_router, warm_course_cards
+from handlers.forms import LeadForm, router as forms_router
+from handlers.symptoms import router as symptoms_router, warm_symptom_cards
 
 # Админка / служебные
 from handlers.admin import router as admin_router
-from handlers.admin_symptoms import router as admin_symptoms_router
+from handlers.admin_symptoms import (
+    AddSymptom,
+    DelSymptom,
+    EditSymptom,
+    RenameCategory,
+    router as admin_symptoms_router,
+)
 from handlers.leads_admin import router as leads_admin_router
-from handlers.digest_admin import router as digest_admin_router
+from handlers.digest_admin import router as digest_admin_router, resume_broadcasts
 from handlers.digest_collector import router as digest_collector_router
-
-
-async def main() -> None:
-    logging.basicConfig(level=logging.INFO)
-
-    settings = load_settings()
-
+from handlers.stale import router as stale_router
+from keyboards.callbacks import ADMIN_CALLBACK_PREFIXES
+
+# сколько живёт брошенная FSM-сессия (по группе состояний), секунды
+FSM_TTLS = {
+    LeadForm: 24 * 3600,
+    AddSymptom: 3600,
+    DelSymptom: 3600,
+    EditSymptom: 3600,
+    RenameCategory: 3600,
+}
+# сессии без состояния (только данные) и прочие состояния
+FSM_DEFAULT_TTL = 7 * 24 * 3600
+
+
+async def on_startup() -> None:
+    # первичная загрузка store дайджеста и каталогов — в пуле потоков, а не в event loop
+    await run_io(get_digest_store().items)
+    await warm_catalogs()
+    # карточки рендерим заранее, первые клики уже идут из кэша
+    await warm_service_cards()
+    await warm_course_cards()
+    await warm_symptom_cards()
+
+
+def build_bot(settings: Settings) -> Bot:
     bot = Bot(
         token=settings.bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
-
-    dp = Dispatcher()
+    # общий лимит исходящих запросов: рассылка не выдавливает ответы пользователям в 429
+    bot.session.middleware(RateLimitMiddleware())
+    return bot
+
+
+def build_dispatcher(settings: Settings) -> Dispatcher:
+    """
+    Диспетчер со всеми роутерами и хуками старта/остановки — общий для polling и webhook.
+    Роутеры — модульные синглтоны, поэтому вызывается один раз на процесс.
+    """
+    # FSM (формы заявок, правка симптомов) переживает рестарт и общая для нескольких процессов
+    storage = SQLiteStorage(FSM_PATH, state_ttls=FSM_TTLS, default_ttl=FSM_DEFAULT_TTL)
+    # апдейты обрабатываются параллельно (не больше update_concurrency),
+    # но у одного пользователя — строго по очереди
+    isolation = UserEventIsolation(settings.update_concurrency)
+    dp = Dispatcher(storage=storage, events_isolation=isolation)
+    # один фильтр на всю админку: не-админы отсекаются до подбора хендлеров
+    admin_gate = AdminGate(settings.admin_ids, callback_prefixes=ADMIN_CALLBACK_PREFIXES)
     # ✅ чтобы хендлеры могли принимать settings: Settings
-    dp.workflow_data.update(settings=settings)
+    dp.workflow_data.update(settings=settings, update_isolation=isolation, admin_gate=admin_gate)
 
-    # ✅ порядок: старт → пользовательские разделы → формы → симптомы → служебные/админ
+    # ✅ порядок: старт → меню → пользовательские разделы → формы → симптомы → служебные/админ
     dp.include_router(start_router)
+    # кнопки главного меню — одна таблица (точное совпадение), только вне FSM-состояний
+    dp.include_router(menu_router)
 
     dp.include_router(services_router)
     dp.include_router(courses_router)
     dp.include_router(forms_router)
     dp.include_router(symptoms_router)
 
-    # служебные/админские
+    # служебные: посты канала, не от админов — вне гейта
     dp.include_router(digest_collector_router)
-    dp.include_router(digest_admin_router)
-    dp.include_router(leads_admin_router)
-    dp.include_router(admin_symptoms_router)
-    dp.include_router(admin_router)
 
-    await dp.start_polling(bot)
+    # админские — под общим гейтом
+    admin_area = admin_gate.attach(Router(name="admin_area"))
+    admin_area.include_router(digest_admin_router)
+    admin_area.include_router(leads_admin_router)
+    admin_area.include_router(admin_symptoms_router)
+    admin_area.include_router(admin_router)
+    dp.include_router(admin_area)
+
+    # нажатия, которые никто не разобрал (старые/битые callback_data), — последними
+    dp.include_router(stale_router)
+
+    dp.startup.register(on_startup)
+    dp.startup.register(resume_broadcasts)
+    dp.startup.register(start_outbox)
+    # фоновая очистка просроченных FSM-сессий
+    dp.startup.register(storage.start_sweeper)
+    # при остановке: останавливаем outbox (недоставленное уйдёт после рестарта),
+    # fsync журнала заявок, компакция подписчиков, сброс дайджеста
+    dp.shutdown.register(close_outbox)
+    dp.shutdown.register(close_journals)
+    dp.shutdown.register(close_subscribers)
+    dp.shutdown.register(flush_store)
+    # FSM: остановка sweeper'а и запись хвоста на диск (в webhook-режиме storage иначе не закрывается)
+    dp.shutdown.register(storage.close)
+    return dp
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+
+    settings = load_settings()
+    bot = build_bot(settings)
+    dp = build_dispatcher(settings)
+
+    if settings.use_webhook:
+        await run_webhook(bot, dp, settings)
+    else:
+        # на случай, если раньше был выставлен webhook — иначе getUpdates вернёт 409
+        await bot.delete_webhook()
+        # Telegram присылает только те типы апдейтов, на которые есть хендлеры;
+        # задач на апдейты — не больше update_concurrency, в том числе для апдейтов
+        # без пользователя (channel_post), которые UserEventIsolation не ограничивает
+        await dp.start_polling(
+            bot,
+            allowed_updates=dp.resolve_used_update_types(),
+            tasks_concurrency_limit=settings.update_concurrency,
+        )
 
 
 if __name__ == "__main__":
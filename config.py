@@ -7,11 +7,20 @@ Environment variables:
 - BOT_TOKEN: Telegram bot token
 - ADMIN_IDS: comma-separated Telegram user IDs, e.g. "123,456"
 - DIGEST_CHANNEL_ID: Telegram channel ID (e.g. -1001234567890)
+- INACTIVE_RETENTION_DAYS: how long users who blocked the bot are kept
+  before being removed from the subscriber list (default 30)
+- BOT_MODE: "polling" (default) or "webhook"
+- WEBHOOK_URL: public HTTPS base URL for webhook mode, e.g. "https://bot.example.com"
+- WEBHOOK_PATH: path Telegram posts updates to (default "/webhook")
+- WEBHOOK_SECRET: secret token Telegram sends in X-Telegram-Bot-Api-Secret-Token
+- WEBHOOK_HOST / WEBHOOK_PORT: local address to listen on (default 0.0.0.0:8080)
+- UPDATE_CONCURRENCY: how many updates are handled at the same time (default 64)
 """
 
 from __future__ import annotations
 
 import os
+import re
 from dataclasses import dataclass
 
 from dotenv import load_dotenv
@@ -20,14 +29,27 @@ from dotenv import load_dotenv
 @dataclass(frozen=True)
 class Settings:
     bot_token: str
-    admin_ids: set[int]
+    # frozenset собирается один раз в load_settings — проверка админа без копий
+    admin_ids: frozenset[int]
     digest_channel_id: int
+    inactive_retention_days: int = 30
+    bot_mode: str = "polling"
+    webhook_url: str = ""
+    webhook_path: str = "/webhook"
+    webhook_secret: str = ""
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    update_concurrency: int = 64
 
+    @property
+    def use_webhook(self) -> bool:
+        return self.bot_mode == "webhook"
 
-def _parse_admin_ids(raw: str) -> set[int]:
+
+def _parse_admin_ids(raw: str) -> frozenset[int]:
     raw = (raw or "").strip()
     if not raw:
-        return set()
+        return frozenset()
     out: set[int] = set()
     for part in raw.split(","):
         part = part.strip()
@@ -37,7 +59,7 @@ def _parse_admin_ids(raw: str) -> set[int]:
             out.add(int(part))
         except ValueError:
             raise ValueError(f"Invalid ADMIN_IDS entry: {part!r}")
-    return out
+    return frozenset(out)
 
 
 def _parse_channel_id(raw: str) -> int:
@@ -50,6 +72,71 @@ def _parse_channel_id(raw: str) -> int:
         raise ValueError(f"Invalid DIGEST_CHANNEL_ID: {raw!r}")
 
 
+def _parse_retention_days(raw: str, default: int = 30) -> int:
+    raw = (raw or "").strip()
+    if not raw:
+        return default
+    try:
+        days = int(raw)
+    except ValueError:
+        raise ValueError(f"Invalid INACTIVE_RETENTION_DAYS: {raw!r}")
+    if days < 0:
+        raise ValueError(f"Invalid INACTIVE_RETENTION_DAYS: {raw!r}")
+    return days
+
+
+def _parse_positive_int(name: str, raw: str, default: int) -> int:
+    raw = (raw or "").strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {raw!r}")
+    if value < 1:
+        raise ValueError(f"Invalid {name}: {raw!r}")
+    return value
+
+
+# Telegram допускает в secret_token только A-Z, a-z, 0-9, _ и -
+_SECRET_RE = re.compile(r"^[A-Za-z0-9_-]{1,256}$")
+
+
+def _parse_webhook(env: dict[str, str]) -> dict[str, object]:
+    mode = (env.get("BOT_MODE") or "polling").strip().lower()
+    if mode not in {"polling", "webhook"}:
+        raise ValueError(f"Invalid BOT_MODE: {mode!r}")
+    if mode == "polling":
+        return {"bot_mode": mode}
+
+    url = (env.get("WEBHOOK_URL") or "").strip().rstrip("/")
+    if not url:
+        raise RuntimeError("WEBHOOK_URL is not set (required for BOT_MODE=webhook)")
+
+    secret = (env.get("WEBHOOK_SECRET") or "").strip()
+    if not _SECRET_RE.match(secret):
+        raise RuntimeError("WEBHOOK_SECRET is not set or invalid (1-256 chars: A-Z a-z 0-9 _ -)")
+
+    path = (env.get("WEBHOOK_PATH") or "/webhook").strip()
+    if not path.startswith("/"):
+        path = "/" + path
+
+    raw_port = (env.get("WEBHOOK_PORT") or "8080").strip()
+    try:
+        port = int(raw_port)
+    except ValueError:
+        raise ValueError(f"Invalid WEBHOOK_PORT: {raw_port!r}")
+
+    return {
+        "bot_mode": mode,
+        "webhook_url": url,
+        "webhook_path": path,
+        "webhook_secret": secret,
+        "webhook_host": (env.get("WEBHOOK_HOST") or "0.0.0.0").strip(),
+        "webhook_port": port,
+    }
+
+
 def load_settings() -> Settings:
     load_dotenv()
 
@@ -59,10 +146,16 @@ def load_settings() -> Settings:
 
     admin_ids = _parse_admin_ids(os.getenv("ADMIN_IDS", ""))
     digest_channel_id = _parse_channel_id(os.getenv("DIGEST_CHANNEL_ID", ""))
+    inactive_retention_days = _parse_retention_days(os.getenv("INACTIVE_RETENTION_DAYS", ""))
+    webhook = _parse_webhook(dict(os.environ))
+    update_concurrency = _parse_positive_int("UPDATE_CONCURRENCY", os.getenv("UPDATE_CONCURRENCY", ""), 64)
 
     return Settings(
         bot_token=token,
         admin_ids=admin_ids,
         digest_channel_id=digest_channel_id,
+        inactive_retention_days=inactive_retention_days,
+        update_concurrency=update_concurrency,
+        **webhook,
     )
 
@@ -1,20 +1,19 @@
 from __future__ import annotations
 
-import json
-from pathlib import Path
 from aiogram import Router, types
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from config import Settings
-from utils.json_loader import load_json
+from utils.catalog import SYMPTOMS_PATH, symptoms_cache
+from utils.fsm_storage import SQLiteStorage
+from utils.permissions import AdminGate
+from utils.update_isolation import UserEventIsolation
+from utils.storage import load_json, save_json
+from utils.symptoms_data import SymptomsDoc
 
 router = Router()
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-SYMPTOMS_PATH = BASE_DIR / "data" / "symptoms.json"
-
 
 class AddSymptom(StatesGroup):
     category = State()
@@ -22,21 +21,13 @@ class AddSymptom(StatesGroup):
     text = State()
 
 
-def _is_admin(user_id: int, settings: Settings) -> bool:
-    return user_id in set(settings.admin_ids)
-
-
-def _save_symptoms(data: dict) -> None:
-    SYMPTOMS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(SYMPTOMS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+async def _save_symptoms(doc: SymptomsDoc) -> None:
+    await save_json(SYMPTOMS_PATH, doc.to_json())
+    symptoms_cache.invalidate()
 
 
 @router.message(Command("admin"))
-async def admin_help(message: types.Message, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def admin_help(message: types.Message) -> None:
     await message.answer(
         "<b>Админ-панель</b>\n\n"
         "Команды:\n"
@@ -45,19 +36,49 @@ async def admin_help(message: types.Message, settings: Settings) -> None:
     )
 
 
-@router.message(Command("cancel"))
-async def cancel_any(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
+@router.message(Command("fsm_stats"))
+async def fsm_stats(
+    message: types.Message,
+    state: FSMContext,
+    update_isolation: UserEventIsolation | None = None,
+    admin_gate: AdminGate | None = None,
+) -> None:
+    updates = ""
+    if update_isolation is not None:
+        st = update_isolation.stats()
+        updates = (
+            f"\n\n<b>Апдейты</b>\n"
+            f"В очереди: {st['queued']}\n"
+            f"Обрабатываются: {st['running']} (лимит {st['limit']})\n"
+            f"Обработано: {st['processed']}"
+        )
+    if admin_gate is not None:
+        updates += f"\nПопыток не-админов попасть в админку: {admin_gate.rejected_total}"
+
+    storage = state.storage
+    if not isinstance(storage, SQLiteStorage):
+        await message.answer("Статистика доступна только для SQLite-хранилища FSM.")
         return
+
+    counts = await storage.sessions_by_state()
+    lines = [f"• <code>{name}</code>: {n}" for name, n in sorted(counts.items(), key=lambda x: -x[1])]
+    await message.answer(
+        "<b>Активные диалоги (FSM)</b>\n\n"
+        + ("\n".join(lines) if lines else "нет")
+        + f"\n\nВсего: {sum(counts.values())}\n"
+        f"Истекло с запуска: {storage.expired_total}"
+        + updates
+    )
+
+
+@router.message(Command("cancel"))
+async def cancel_any(message: types.Message, state: FSMContext) -> None:
     await state.clear()
     await message.answer("Ок, отменено ✅")
 
 
 @router.message(Command("add_symptom"))
-async def add_symptom_start(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def add_symptom_start(message: types.Message, state: FSMContext) -> None:
     await state.clear()
     await state.set_state(AddSymptom.category)
     await message.answer(
@@ -69,10 +90,7 @@ async def add_symptom_start(message: types.Message, state: FSMContext, settings:
 
 
 @router.message(AddSymptom.category)
-async def add_symptom_category(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def add_symptom_category(message: types.Message, state: FSMContext) -> None:
     category = (message.text or "").strip()
     if not category:
         await message.answer("Категория не должна быть пустой. Напишите ещё раз.")
@@ -88,10 +106,7 @@ async def add_symptom_category(message: types.Message, state: FSMContext, settin
 
 
 @router.message(AddSymptom.title)
-async def add_symptom_title(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def add_symptom_title(message: types.Message, state: FSMContext) -> None:
     title = (message.text or "").strip()
     if not title:
         await message.answer("Заголовок не должен быть пустым. Напишите ещё раз.")
@@ -106,10 +121,7 @@ async def add_symptom_title(message: types.Message, state: FSMContext, settings:
 
 
 @router.message(AddSymptom.text)
-async def add_symptom_text(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def add_symptom_text(message: types.Message, state: FSMContext) -> None:
     text = (message.text or "").strip()
     if not text:
         await message.answer("Текст не должен быть пустым. Напишите ещё раз.")
@@ -121,18 +133,12 @@ async def add_symptom_text(message: types.Message, state: FSMContext, settings:
     category = data_state.get("category", "")
     title = data_state.get("title", "")
 
-    data = load_json(SYMPTOMS_PATH)
-    if not isinstance(data, dict):
-        data = {}
-
-    items = data.get(category)
-    if not isinstance(items, list):
-        items = []
-
+    doc = SymptomsDoc.from_json(await load_json(SYMPTOMS_PATH))
+    doc.add_category(category)
+    items = doc.items[category]
     items.append({"title": title, "text": text})
-    data[category] = items
 
-    _save_symptoms(data)
+    await _save_symptoms(doc)
 
     await message.answer(
         "✅ Карточка добавлена!\n\n"
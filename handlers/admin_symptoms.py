@@ -1,28 +1,31 @@
 from __future__ import annotations
 
-import json
-from pathlib import Path
-
 from aiogram import Router, types, F
-from aiogram.filters import Command
+from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from config import Settings
-from utils.json_loader import load_json
+from handlers.menu import MenuButton
+from utils.catalog import SYMPTOMS_PATH, symptoms_cache
+from utils.storage import load_json, save_json
+from utils.symptoms_data import SymptomsDoc
+from keyboards.callbacks import (
+    AdminAction,
+    AdminActionCb,
+    AdminCategoryCb,
+    AdminCategoryOp,
+    AdminFieldCb,
+)
 from keyboards.admin_symptoms_menu import (
     build_admin_categories_kb,
     build_admin_del_categories_kb,
     build_admin_edit_categories_kb,
     build_admin_edit_field_kb,
-    cat_key,
+    build_admin_rename_categories_kb,
 )
 
 router = Router()
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-SYMPTOMS_PATH = BASE_DIR / "data" / "symptoms.json"
-
 
 class AddSymptom(StatesGroup):
     category = State()   # вводится только для НОВОЙ категории
@@ -31,37 +34,34 @@ class AddSymptom(StatesGroup):
 
 
 class DelSymptom(StatesGroup):
-    category = State()   # храним реальное имя категории
+    category = State()   # храним id категории — переживает переименование
     index = State()
 
 
 class EditSymptom(StatesGroup):
-    category = State()   # реальное имя категории
+    category = State()   # id категории
     index = State()
     field = State()      # title/text
     new_value = State()
 
 
-def _is_admin(user_id: int, settings: Settings) -> bool:
-    return user_id in set(settings.admin_ids)
+class RenameCategory(StatesGroup):
+    new_name = State()   # id категории — в данных состояния
 
 
-def _load_symptoms_dict() -> dict[str, list[dict[str, str]]]:
-    data = load_json(SYMPTOMS_PATH)
-    return data if isinstance(data, dict) else {}
+async def _load_symptoms() -> SymptomsDoc:
+    # админка правит данные — читаем свежую копию с диска, не общий снимок кэша
+    return SymptomsDoc.from_json(await load_json(SYMPTOMS_PATH))
 
 
-def _save_symptoms(data: dict) -> None:
-    SYMPTOMS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(SYMPTOMS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+async def _save_symptoms(doc: SymptomsDoc) -> None:
+    await save_json(SYMPTOMS_PATH, doc.to_json())
+    symptoms_cache.invalidate()
 
 
-def _key_to_category(categories: list[str], key: str) -> str | None:
-    for c in categories:
-        if cat_key(c) == key:
-            return c
-    return None
+def _state_category(doc: SymptomsDoc, data_state: dict) -> str | None:
+    cat_id = data_state.get("category_id")
+    return doc.name_of(cat_id) if isinstance(cat_id, int) else None
 
 
 def _format_categories_overview(data: dict[str, list[dict[str, str]]]) -> str:
@@ -89,10 +89,7 @@ def _format_category_items(data: dict[str, list[dict[str, str]]], category: str,
 
 
 @router.message(Command("admin"))
-async def admin_help(message: types.Message, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def admin_help(message: types.Message) -> None:
     await message.answer(
         "<b>Админ-панель</b>\n\n"
         "Команды:\n"
@@ -100,50 +97,49 @@ async def admin_help(message: types.Message, settings: Settings) -> None:
         "• /list_symptoms — список категорий\n"
         "• /del_symptom — удалить карточку по номеру\n"
         "• /edit_symptom — редактировать заголовок/текст\n"
+        "• /rename_category — переименовать категорию\n"
+        "• /fsm_stats — активные диалоги и очередь апдейтов\n"
         "• /cancel — отмена\n"
     )
 
 
 @router.message(Command("cancel"))
-async def cancel_any(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
+async def cancel_any(message: types.Message, state: FSMContext) -> None:
     await state.clear()
     await message.answer("Ок, отменено ✅")
 
 
-@router.callback_query(F.data == "adm_symcancel")
-async def cancel_any_cb(callback: types.CallbackQuery, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(callback.from_user.id, settings):
-        await callback.answer()
-        return
+@router.callback_query(AdminActionCb.filter(F.action == AdminAction.CANCEL))
+async def cancel_any_cb(callback: types.CallbackQuery, state: FSMContext) -> None:
     await state.clear()
     await callback.answer("Отменено")
     await callback.message.answer("Ок, отменено ✅")
 
 
+# Кнопки главного меню во время ввода — не название категории и не текст карточки.
+# «В меню» сбрасывает состояние ещё в handlers/menu.py, остальные здесь не принимаем.
+@router.message(StateFilter(AddSymptom, DelSymptom, EditSymptom, RenameCategory), MenuButton())
+async def reject_menu_button(message: types.Message) -> None:
+    await message.answer("Это кнопка меню, а не ответ. Напишите текст или /cancel.")
+
+
 # -------------------------
 # LIST
 # -------------------------
 @router.message(Command("list_symptoms"))
-async def list_symptoms(message: types.Message, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-    data = _load_symptoms_dict()
-    await message.answer(_format_categories_overview(data))
+async def list_symptoms(message: types.Message) -> None:
+    doc = await _load_symptoms()
+    await message.answer(_format_categories_overview(doc.items))
 
 
 # -------------------------
 # ADD
 # -------------------------
 @router.message(Command("add_symptom"))
-async def add_symptom_start(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def add_symptom_start(message: types.Message, state: FSMContext) -> None:
     await state.clear()
-    data = _load_symptoms_dict()
-    categories = sorted(data.keys())
+    doc = await _load_symptoms()
+    categories = doc.buttons()
 
     await message.answer(
         "Добавляем карточку в «Симптомы и решения».\n\n"
@@ -154,23 +150,16 @@ async def add_symptom_start(message: types.Message, state: FSMContext, settings:
     )
 
 
-@router.callback_query(F.data.startswith("adm_symcat:"))
-async def add_symptom_pick_existing_category(callback: types.CallbackQuery, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(callback.from_user.id, settings):
-        await callback.answer()
-        return
-
-    data = _load_symptoms_dict()
-    categories = sorted(data.keys())
-
-    key = (callback.data or "").split("adm_symcat:", 1)[-1].strip()
-    category = _key_to_category(categories, key)
+@router.callback_query(AdminCategoryCb.filter(F.op == AdminCategoryOp.ADD))
+async def add_symptom_pick_existing_category(callback: types.CallbackQuery, callback_data: AdminCategoryCb, state: FSMContext) -> None:
+    doc = await _load_symptoms()
+    category = doc.name_of(callback_data.cat)
 
     if not category:
         await callback.answer("Категория не найдена")
         return
 
-    await state.update_data(category=category)
+    await state.update_data(category_id=callback_data.cat)
     await state.set_state(AddSymptom.title)
 
     await callback.answer("Ок")
@@ -181,12 +170,8 @@ async def add_symptom_pick_existing_category(callback: types.CallbackQuery, stat
     )
 
 
-@router.callback_query(F.data == "adm_symnew")
-async def add_symptom_new_category(callback: types.CallbackQuery, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(callback.from_user.id, settings):
-        await callback.answer()
-        return
-
+@router.callback_query(AdminActionCb.filter(F.action == AdminAction.NEW_CATEGORY))
+async def add_symptom_new_category(callback: types.CallbackQuery, state: FSMContext) -> None:
     await state.set_state(AddSymptom.category)
     await callback.answer("Ок")
     await callback.message.answer(
@@ -197,10 +182,7 @@ async def add_symptom_new_category(callback: types.CallbackQuery, state: FSMCont
 
 
 @router.message(AddSymptom.category)
-async def add_symptom_category_text(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def add_symptom_category_text(message: types.Message, state: FSMContext) -> None:
     category = (message.text or "").strip()
     if not category:
         await message.answer("Категория не должна быть пустой. Напишите ещё раз.")
@@ -216,10 +198,7 @@ async def add_symptom_category_text(message: types.Message, state: FSMContext, s
 
 
 @router.message(AddSymptom.title)
-async def add_symptom_title(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def add_symptom_title(message: types.Message, state: FSMContext) -> None:
     title = (message.text or "").strip()
     if not title:
         await message.answer("Заголовок не должен быть пустым. Напишите ещё раз.")
@@ -234,10 +213,7 @@ async def add_symptom_title(message: types.Message, state: FSMContext, settings:
 
 
 @router.message(AddSymptom.text)
-async def add_symptom_text(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def add_symptom_text(message: types.Message, state: FSMContext) -> None:
     text = (message.text or "").strip()
     if not text:
         await message.answer("Текст не должен быть пустым. Напишите ещё раз.")
@@ -246,18 +222,19 @@ async def add_symptom_text(message: types.Message, state: FSMContext, settings:
     data_state = await state.get_data()
     await state.clear()
 
-    category = (data_state.get("category") or "").strip()
     title = (data_state.get("title") or "").strip()
 
-    data = _load_symptoms_dict()
-    items = data.get(category)
-    if not isinstance(items, list):
-        items = []
-
+    doc = await _load_symptoms()
+    # существующая категория — по id (могли переименовать), новая — по введённому названию
+    category = _state_category(doc, data_state) or (data_state.get("category") or "").strip()
+    if not category:
+        await message.answer("Категория не найдена. Начните заново: /add_symptom")
+        return
+    doc.add_category(category)
+    items = doc.items[category]
     items.append({"title": title, "text": text})
-    data[category] = items
 
-    _save_symptoms(data)
+    await _save_symptoms(doc)
 
     await message.answer(
         "✅ Карточка добавлена!\n\n"
@@ -271,13 +248,10 @@ async def add_symptom_text(message: types.Message, state: FSMContext, settings:
 # DELETE
 # -------------------------
 @router.message(Command("del_symptom"))
-async def del_symptom_start(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def del_symptom_start(message: types.Message, state: FSMContext) -> None:
     await state.clear()
-    data = _load_symptoms_dict()
-    categories = sorted(data.keys())
+    doc = await _load_symptoms()
+    categories = doc.buttons()
 
     if not categories:
         await message.answer("Пока нет категорий для удаления.")
@@ -290,40 +264,30 @@ async def del_symptom_start(message: types.Message, state: FSMContext, settings:
     )
 
 
-@router.callback_query(F.data.startswith("adm_symdelcat:"))
-async def del_symptom_pick_category(callback: types.CallbackQuery, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(callback.from_user.id, settings):
-        await callback.answer()
-        return
-
-    data = _load_symptoms_dict()
-    categories = sorted(data.keys())
-
-    key = (callback.data or "").split("adm_symdelcat:", 1)[-1].strip()
-    category = _key_to_category(categories, key)
+@router.callback_query(AdminCategoryCb.filter(F.op == AdminCategoryOp.DELETE))
+async def del_symptom_pick_category(callback: types.CallbackQuery, callback_data: AdminCategoryCb, state: FSMContext) -> None:
+    doc = await _load_symptoms()
+    category = doc.name_of(callback_data.cat)
 
     if not category:
         await callback.answer("Категория не найдена")
         return
 
-    items = data.get(category, [])
+    items = doc.items.get(category, [])
     if not items:
         await callback.answer()
         await callback.message.answer(f"В категории <b>{category}</b> пока нет карточек.")
         return
 
-    await state.update_data(category=category)
+    await state.update_data(category_id=callback_data.cat)
     await state.set_state(DelSymptom.index)
 
     await callback.answer("Ок")
-    await callback.message.answer(_format_category_items(data, category) + "\n\nОтправьте номер карточки для удаления.")
+    await callback.message.answer(_format_category_items(doc.items, category) + "\n\nОтправьте номер карточки для удаления.")
 
 
 @router.message(DelSymptom.index)
-async def del_symptom_by_index(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def del_symptom_by_index(message: types.Message, state: FSMContext) -> None:
     raw = (message.text or "").strip()
     if not raw.isdigit():
         await message.answer("Нужно отправить номер карточки (цифрой). Например: 2\n\nОтмена: /cancel")
@@ -331,18 +295,17 @@ async def del_symptom_by_index(message: types.Message, state: FSMContext, settin
 
     idx = int(raw) - 1
     data_state = await state.get_data()
-    category = (data_state.get("category") or "").strip()
 
-    data = _load_symptoms_dict()
-    items = data.get(category, [])
+    doc = await _load_symptoms()
+    category = _state_category(doc, data_state)
+    items = doc.items.get(category, []) if category else []
 
     if not items or idx < 0 or idx >= len(items):
         await message.answer("Такого номера нет. Отправьте номер из списка.\n\nОтмена: /cancel")
         return
 
     removed = items.pop(idx)
-    data[category] = items
-    _save_symptoms(data)
+    await _save_symptoms(doc)
 
     await state.clear()
 
@@ -359,13 +322,10 @@ async def del_symptom_by_index(message: types.Message, state: FSMContext, settin
 # EDIT (вариант А)
 # -------------------------
 @router.message(Command("edit_symptom"))
-async def edit_symptom_start(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def edit_symptom_start(message: types.Message, state: FSMContext) -> None:
     await state.clear()
-    data = _load_symptoms_dict()
-    categories = sorted(data.keys())
+    doc = await _load_symptoms()
+    categories = doc.buttons()
 
     if not categories:
         await message.answer("Пока нет категорий для редактирования.")
@@ -378,42 +338,32 @@ async def edit_symptom_start(message: types.Message, state: FSMContext, settings
     )
 
 
-@router.callback_query(F.data.startswith("adm_symeditcat:"))
-async def edit_symptom_pick_category(callback: types.CallbackQuery, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(callback.from_user.id, settings):
-        await callback.answer()
-        return
-
-    data = _load_symptoms_dict()
-    categories = sorted(data.keys())
-
-    key = (callback.data or "").split("adm_symeditcat:", 1)[-1].strip()
-    category = _key_to_category(categories, key)
+@router.callback_query(AdminCategoryCb.filter(F.op == AdminCategoryOp.EDIT))
+async def edit_symptom_pick_category(callback: types.CallbackQuery, callback_data: AdminCategoryCb, state: FSMContext) -> None:
+    doc = await _load_symptoms()
+    category = doc.name_of(callback_data.cat)
 
     if not category:
         await callback.answer("Категория не найдена")
         return
 
-    items = data.get(category, [])
+    items = doc.items.get(category, [])
     if not items:
         await callback.answer()
         await callback.message.answer(f"В категории <b>{category}</b> пока нет карточек.")
         return
 
-    await state.update_data(category=category)
+    await state.update_data(category_id=callback_data.cat)
     await state.set_state(EditSymptom.index)
 
     await callback.answer("Ок")
     await callback.message.answer(
-        _format_category_items(data, category) + "\n\n<b>Шаг 2/3</b>: отправьте номер карточки для редактирования."
+        _format_category_items(doc.items, category) + "\n\n<b>Шаг 2/3</b>: отправьте номер карточки для редактирования."
     )
 
 
 @router.message(EditSymptom.index)
-async def edit_symptom_pick_index(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def edit_symptom_pick_index(message: types.Message, state: FSMContext) -> None:
     raw = (message.text or "").strip()
     if not raw.isdigit():
         await message.answer("Нужно отправить номер карточки (цифрой). Например: 3\n\nОтмена: /cancel")
@@ -421,10 +371,10 @@ async def edit_symptom_pick_index(message: types.Message, state: FSMContext, set
 
     idx = int(raw) - 1
     data_state = await state.get_data()
-    category = (data_state.get("category") or "").strip()
 
-    data = _load_symptoms_dict()
-    items = data.get(category, [])
+    doc = await _load_symptoms()
+    category = _state_category(doc, data_state)
+    items = doc.items.get(category, []) if category else []
 
     if not items or idx < 0 or idx >= len(items):
         await message.answer("Такого номера нет. Отправьте номер из списка.\n\nОтмена: /cancel")
@@ -441,18 +391,9 @@ async def edit_symptom_pick_index(message: types.Message, state: FSMContext, set
     )
 
 
-@router.callback_query(F.data.startswith("adm_symentry:"))
-async def edit_symptom_pick_field(callback: types.CallbackQuery, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(callback.from_user.id, settings):
-        await callback.answer()
-        return
-
-    field = (callback.data or "").split("adm_symentry:", 1)[-1].strip()
-    if field not in ("title", "text"):
-        await callback.answer("Неверный выбор")
-        return
-
-    await state.update_data(field=field)
+@router.callback_query(AdminFieldCb.filter())
+async def edit_symptom_pick_field(callback: types.CallbackQuery, callback_data: AdminFieldCb, state: FSMContext) -> None:
+    await state.update_data(field=callback_data.field.value)
     await state.set_state(EditSymptom.new_value)
 
     await callback.answer("Ок")
@@ -460,22 +401,19 @@ async def edit_symptom_pick_field(callback: types.CallbackQuery, state: FSMConte
 
 
 @router.message(EditSymptom.new_value)
-async def edit_symptom_apply(message: types.Message, state: FSMContext, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
+async def edit_symptom_apply(message: types.Message, state: FSMContext) -> None:
     new_value = (message.text or "").strip()
     if not new_value:
         await message.answer("Значение не должно быть пустым. Введите ещё раз.")
         return
 
     data_state = await state.get_data()
-    category = (data_state.get("category") or "").strip()
     idx = int(data_state.get("index", -1))
     field = (data_state.get("field") or "").strip()
 
-    data = _load_symptoms_dict()
-    items = data.get(category, [])
+    doc = await _load_symptoms()
+    category = _state_category(doc, data_state)
+    items = doc.items.get(category, []) if category else []
 
     if not items or idx < 0 or idx >= len(items) or field not in ("title", "text"):
         await state.clear()
@@ -484,8 +422,7 @@ async def edit_symptom_apply(message: types.Message, state: FSMContext, settings
 
     old_value = (items[idx].get(field) or "").strip()
     items[idx][field] = new_value
-    data[category] = items
-    _save_symptoms(data)
+    await _save_symptoms(doc)
 
     await state.clear()
 
@@ -500,3 +437,74 @@ async def edit_symptom_apply(message: types.Message, state: FSMContext, settings
         f"<b>Было:</b> {_clip(old_value)}\n"
         f"<b>Стало:</b> {_clip(new_value)}"
     )
+
+
+# -------------------------
+# RENAME CATEGORY
+# -------------------------
+@router.message(Command("rename_category"))
+async def rename_category_start(message: types.Message, state: FSMContext) -> None:
+    await state.clear()
+    doc = await _load_symptoms()
+    categories = doc.buttons()
+
+    if not categories:
+        await message.answer("Пока нет категорий.")
+        return
+
+    await message.answer(
+        "Переименование категории.\n\n"
+        "<b>Шаг 1/2</b>: выберите категорию:",
+        reply_markup=build_admin_rename_categories_kb(categories),
+    )
+
+
+@router.callback_query(AdminCategoryCb.filter(F.op == AdminCategoryOp.RENAME))
+async def rename_category_pick(callback: types.CallbackQuery, callback_data: AdminCategoryCb, state: FSMContext) -> None:
+    doc = await _load_symptoms()
+    category = doc.name_of(callback_data.cat)
+
+    if not category:
+        await callback.answer("Категория не найдена")
+        return
+
+    await state.update_data(category_id=callback_data.cat)
+    await state.set_state(RenameCategory.new_name)
+
+    await callback.answer("Ок")
+    await callback.message.answer(
+        f"Категория: <b>{category}</b>\n\n"
+        "<b>Шаг 2/2</b>: напишите <b>новое название</b>\n\n"
+        "Отмена: /cancel"
+    )
+
+
+@router.message(RenameCategory.new_name)
+async def rename_category_apply(message: types.Message, state: FSMContext) -> None:
+    new_name = (message.text or "").strip()
+    if not new_name:
+        await message.answer("Название не должно быть пустым. Напишите ещё раз.")
+        return
+
+    data_state = await state.get_data()
+    doc = await _load_symptoms()
+    cat_id = data_state.get("category_id")
+    if _state_category(doc, data_state) is None:
+        await state.clear()
+        await message.answer("Ошибка состояния. Начните заново: /rename_category")
+        return
+
+    try:
+        old_name = doc.rename_category(cat_id, new_name)
+    except ValueError:
+        await message.answer("Категория с таким названием уже есть. Напишите другое.\n\nОтмена: /cancel")
+        return
+
+    # id категории не меняется — кнопки, уже отправленные пользователям, продолжают работать
+    await _save_symptoms(doc)
+    await state.clear()
+    await message.answer(
+        "✅ Категория переименована!\n\n"
+        f"<b>Было:</b> {old_name}\n"
+        f"<b>Стало:</b> {new_name}"
+    )
@@ -1,28 +1,22 @@
 from __future__ import annotations
 
-from pathlib import Path
 from aiogram import Router, types, F
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
-from keyboards.main_menu import get_main_menu
-from utils.json_loader import load_json
+from handlers.menu import menu_action
+from keyboards.callbacks import CourseCb, CoursesNavCb, LeadCb, LeadKind, Nav
+from keyboards.main_menu import MENU_COURSES, get_main_menu
+from utils.catalog import CoursesIndex, courses_index
+from utils.navigation import safe_edit_or_send
+from utils.render_cache import render_cache
+from utils.keyboard_cache import cached_keyboard
 
 router = Router()
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-COURSES_PATH = BASE_DIR / "data" / "courses.json"
-
 # расширитель для "широкого" пузыря как в услугах (если понадобится)
 WIDE_PAD = "⠀" * 60
 
 
-def _load_courses() -> list[dict]:
-    data = load_json(COURSES_PATH)
-    if isinstance(data, dict) and isinstance(data.get("courses"), list):
-        return data["courses"]
-    if isinstance(data, list):
-        return data
-    return []
 
 
 def _render_course(course: dict) -> str:
@@ -50,76 +44,86 @@ def _render_course(course: dict) -> str:
     return "\n".join(lines)
 
 
-def _courses_list_kb(courses: list[dict]) -> InlineKeyboardMarkup:
+def _course_card(index: CoursesIndex, course_id: str, course: dict) -> str:
+    return render_cache.get("courses", index.version, course_id, lambda: _render_course(course))
+
+
+async def warm_course_cards() -> None:
+    index = await courses_index()
+    for course_id, course in index.by_id.items():
+        _course_card(index, course_id, course)
+
+
+@cached_keyboard
+def _courses_list_kb(courses: tuple[tuple[int, str], ...]) -> InlineKeyboardMarkup:
+    # courses: ((номер, name), ...) из индекса каталога
     rows = []
-    for c in courses:
-        cid = (c.get("id") or "").strip()
-        name = (c.get("name") or c.get("title") or "").strip()
-        if not cid or not name:
-            continue
-        rows.append([InlineKeyboardButton(text=name, callback_data=f"course:{cid}")])
-
-    rows.append([InlineKeyboardButton(text="⬅️ В меню", callback_data="course:__menu__")])
+    for num, name in courses:
+        rows.append([InlineKeyboardButton(text=name, callback_data=CourseCb(n=num).pack())])
+
+    rows.append([InlineKeyboardButton(text="⬅️ В меню", callback_data=CoursesNavCb(to=Nav.MENU).pack())])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def _lead_kb(course_id: str) -> InlineKeyboardMarkup:
+@cached_keyboard
+def _lead_kb(num: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="📩 Оставить заявку", callback_data=f"lead:course:{course_id}")],
-        [InlineKeyboardButton(text="⬅️ К списку курсов", callback_data="course:__back__")],
-        [InlineKeyboardButton(text="⬅️ В меню", callback_data="course:__menu__")],
+        [InlineKeyboardButton(text="📩 Оставить заявку", callback_data=LeadCb(kind=LeadKind.COURSE, n=num).pack())],
+        [InlineKeyboardButton(text="⬅️ К списку курсов", callback_data=CoursesNavCb(to=Nav.BACK).pack())],
+        [InlineKeyboardButton(text="⬅️ В меню", callback_data=CoursesNavCb(to=Nav.MENU).pack())],
     ])
 
 
-@router.message(F.text.contains("Курс") | F.text.contains("обуч"))
+@menu_action(MENU_COURSES)
 async def open_courses(message: types.Message) -> None:
-    courses = _load_courses()
-    if not courses:
+    index = await courses_index()
+    if not index.buttons:
         await message.answer("Пока нет опубликованных курсов.", reply_markup=get_main_menu())
         return
 
     await message.answer(
         f"Выберите курс:\n{WIDE_PAD}",
-        reply_markup=_courses_list_kb(courses),
+        reply_markup=_courses_list_kb(index.buttons, version=index.version),
     )
 
 
-@router.callback_query(F.data == "course:__menu__")
+@router.callback_query(CoursesNavCb.filter(F.to == Nav.MENU))
 async def courses_to_menu(callback: types.CallbackQuery) -> None:
     await callback.message.answer("Главное меню 👇", reply_markup=get_main_menu())
     await callback.answer()
 
 
-@router.callback_query(F.data == "course:__back__")
+@router.callback_query(CoursesNavCb.filter(F.to == Nav.BACK))
 async def courses_back(callback: types.CallbackQuery) -> None:
-    courses = _load_courses()
-    if not courses:
-        await callback.message.answer("Пока нет опубликованных курсов.", reply_markup=get_main_menu())
-        await callback.answer()
+    index = await courses_index()
+    await callback.answer()
+
+    if not index.buttons:
+        await safe_edit_or_send(callback, "Пока нет опубликованных курсов.")
         return
 
-    await callback.message.answer(
+    await safe_edit_or_send(
+        callback,
         f"Выберите курс:\n{WIDE_PAD}",
-        reply_markup=_courses_list_kb(courses),
+        reply_markup=_courses_list_kb(index.buttons, version=index.version),
     )
-    await callback.answer()
 
 
-@router.callback_query(F.data.startswith("course:"))
-async def show_course(callback: types.CallbackQuery) -> None:
-    payload = callback.data.split("course:", 1)[1].strip()
-
-    if payload in {"__menu__", "__back__"}:
-        await callback.answer()
-        return
-
-    courses = _load_courses()
-    course = next((c for c in courses if (c.get("id") or "").strip() == payload), None)
+@router.callback_query(CourseCb.filter())
+async def show_course(callback: types.CallbackQuery, callback_data: CourseCb) -> None:
+    index = await courses_index()
+    course_id = index.id_at(callback_data.n)
+    course = index.by_id.get(course_id) if course_id else None
 
     await callback.answer()
 
     if not course:
-        await callback.message.answer("Курс не найден.")
+        await safe_edit_or_send(
+            callback,
+            "Курс не найден.",
+            reply_markup=_courses_list_kb(index.buttons, version=index.version),
+        )
         return
 
-    await callback.message.answer(_render_course(course), reply_markup=_lead_kb(payload))
+    # карточка курса на месте списка, заявка и «назад» — в её клавиатуре
+    await safe_edit_or_send(callback, _course_card(index, course_id, course), reply_markup=_lead_kb(callback_data.n))
@@ -1,99 +1,268 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import logging
 from pathlib import Path
 
-from aiogram import Router, types
+from aiogram import Bot, Router, types
 from aiogram.filters import Command
 
 from config import Settings
-from utils.digest_publisher import build_digest_text, clear_store
+from utils.broadcast import STATUS_BLOCKED, BroadcastEngine, BroadcastResult
+from utils.broadcast_jobs import (
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    BroadcastJob,
+    active_job,
+    cancel_job,
+    claim_job,
+    digest_job_id,
+    load_or_create_job,
+    pause_job,
+    pending_jobs,
+    prune_finished_jobs,
+    release_job,
+    resume_job,
+    run_job,
+    unfinished_job,
+)
+from utils.broadcast_progress import BroadcastProgress
+from utils.digest_publisher import build_digest_text, clear_store, count_week_items
+from utils.storage import run_io
+from utils.subscribers import get_subscribers
 
 router = Router()
+logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 USERS_PATH = BASE_DIR / "data" / "users.json"
 
 
-def _is_admin(user_id: int, settings: Settings) -> bool:
-    return user_id in set(settings.admin_ids)
+async def _load_users() -> list[int]:
+    # рассылаем только активным: заблокировавшие бота отсеяны
+    return await run_io(get_subscribers(USERS_PATH).active, path=USERS_PATH)
 
 
-def _load_users() -> list[int]:
-    if not USERS_PATH.exists():
-        return []
-    try:
-        data = json.loads(USERS_PATH.read_text(encoding="utf-8"))
-        return [int(x) for x in data.get("subscribers", [])]
-    except Exception:
-        return []
+async def _mark_blocked(uid: int, status: str) -> None:
+    # заблокировал бота / чат не найден — дальше этому пользователю не шлём
+    if status == STATUS_BLOCKED:
+        await run_io(get_subscribers(USERS_PATH).deactivate, uid, path=USERS_PATH)
 
 
-@router.message(Command("digest_status"))
-async def digest_status(message: types.Message, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
+async def _purge_inactive(settings: Settings) -> int:
+    retention = settings.inactive_retention_days * 86400
+    return await run_io(get_subscribers(USERS_PATH).purge_inactive, retention, path=USERS_PATH)
+
 
-    users = _load_users()
-    _, used = build_digest_text()
+@router.message(Command("digest_status"))
+async def digest_status(message: types.Message) -> None:
+    active, total = await run_io(get_subscribers(USERS_PATH).counts, path=USERS_PATH)
+    week_count = await run_io(count_week_items)
 
     await message.answer(
-        f"👥 Пользователей (нажимали /start): <b>{len(users)}</b>\n"
-        f"🗞 Пунктов в дайджесте за 7 дней: <b>{len(used)}</b>\n\n"
+        f"👥 Пользователей (нажимали /start): <b>{active}</b> активных из <b>{total}</b>\n"
+        f"🗞 Пунктов в дайджесте за 7 дней: <b>{week_count}</b>\n\n"
         "Команды:\n"
         "• /digest_preview — предпросмотр\n"
         "• /digest_broadcast — разослать всем\n"
+        "• /digest_pause, /digest_resume, /digest_cancel — управление идущей рассылкой\n"
         "• /digest_clear — очистить пункты дайджеста"
     )
 
 
 @router.message(Command("digest_preview"))
-async def digest_preview(message: types.Message, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-
-    text, _ = build_digest_text()
+async def digest_preview(message: types.Message) -> None:
+    text, _ = await run_io(build_digest_text)
     await message.answer("Предпросмотр (никому не отправляю):\n\n" + text)
 
 
 @router.message(Command("digest_broadcast"))
 async def digest_broadcast(message: types.Message, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
+    text, used = await run_io(build_digest_text)
+    job_id = digest_job_id(text, used)
+    # недоведённую рассылку (отменённую, прерванную) досылаем, а не начинаем заново:
+    # новый пост или смена даты дали бы другой job и повторную отправку всем
+    previous = await run_io(unfinished_job)
+    if previous is not None:
+        job_id = previous.job_id
+
+    # занимаем job до первого await: параллельный вызов не разошлёт дайджест второй раз
+    if not claim_job(job_id):
+        await message.answer(f"⏳ Рассылка <code>{job_id}</code> уже идёт.")
         return
 
-    text, used = build_digest_text()
-    user_ids = _load_users()
+    spawned = False
+    try:
+        await _purge_inactive(settings)
+        user_ids = await _load_users()
+        if not user_ids:
+            await message.answer("Активных пользователей нет (никто не нажал /start или все заблокировали бота).")
+            return
 
-    if not user_ids:
-        await message.answer("В users.json пока нет пользователей (никто не нажал /start).")
-        return
+        job, created = await run_io(
+            load_or_create_job,
+            job_id,
+            text,
+            user_ids,
+            report_chat_id=message.chat.id,
+            meta={
+                "items": len(used),
+                "message_ids": [it["message_id"] for it in used if it.get("message_id") is not None],
+            },
+        )
+        if job.status == STATUS_DONE:
+            await message.answer(f"Этот дайджест уже разослан (<code>{job_id}</code>). Повторно не отправляю.")
+            return
 
-    ok = 0
-    bad = 0
+        remaining = await run_io(job.remaining)
+        if created:
+            title = f"🚀 Рассылка <code>{job_id}</code>. Получателей: {len(job.recipients)}"
+        else:
+            title = (
+                f"🔁 Продолжаю рассылку <code>{job_id}</code>. "
+                f"Осталось: {len(remaining)} из {len(job.recipients)}"
+            )
+            if job.text != text:
+                title += "\nТекст — как при первом запуске; новые пункты уйдут следующим дайджестом."
 
-    await message.answer(f"🚀 Начинаю рассылку. Получателей: {len(user_ids)}")
+        # рассылка идёт фоном: хендлер сразу отпускает lock чата админа,
+        # иначе /digest_pause, /digest_resume и /digest_cancel ждали бы её конца
+        _spawn(message.bot, job, title)
+        spawned = True
+    finally:
+        if not spawned:
+            release_job(job_id)
 
-    for uid in user_ids:
-        try:
-            await message.bot.send_message(uid, text)
-            ok += 1
-        except Exception:
-            bad += 1
 
-    clear_store()
+async def _run(bot: Bot, job: BroadcastJob, engine: BroadcastEngine, title: str) -> None:
+    progress: BroadcastProgress | None = None
+    if job.report_chat_id is not None:
+        sent = await bot.send_message(job.report_chat_id, title)
+        progress = BroadcastProgress(
+            bot,
+            sent.chat.id,
+            sent.message_id,
+            title=title,
+            total=len(job.recipients),
+            # failed из прошлых запусков ещё будут повторены — в «готово» не считаем
+            done=await run_io(job.result, final_only=True),
+            engine=engine,
+        )
+        progress.start()
 
-    await message.answer(
+    async def on_result(uid: int, status: str) -> None:
+        await _mark_blocked(uid, status)
+        if progress is not None:
+            await progress.record(uid, status)
+
+    try:
+        result = await run_job(job, engine, on_result=on_result)
+    except BaseException:
+        if progress is not None:
+            await progress.stop("❌ прервана")
+        raise
+
+    if progress is not None:
+        await progress.stop("⏹ отменена" if job.status == STATUS_CANCELLED else "✅ завершена")
+    await _finish(bot, job, result)
+
+
+async def _finish(bot: Bot, job: BroadcastJob, result: BroadcastResult) -> None:
+    if job.status == STATUS_CANCELLED:
+        # дайджест не отправлен всем — пункты оставляем
+        if job.report_chat_id is not None:
+            await bot.send_message(
+                job.report_chat_id,
+                f"⏹ Рассылка <code>{job.job_id}</code> отменена.\n"
+                f"Доставлено: {result.ok}\n"
+                f"Не отправлено: {len(job.recipients) - result.total}\n"
+                f"Пункты дайджеста сохранены; /digest_broadcast продолжит с того же места."
+            )
+        return
+
+    # убираем только разосланные пункты: пришедшие во время рассылки остаются до следующей
+    await run_io(clear_store, job.meta.get("message_ids"))
+    await run_io(prune_finished_jobs)
+
+    if job.report_chat_id is None:
+        return
+    await bot.send_message(
+        job.report_chat_id,
         f"✅ Готово.\n"
-        f"Доставлено: {ok}\n"
-        f"Ошибок: {bad}\n"
-        f"Пунктов в дайджесте: {len(used)}\n"
-        f"Хранилище очищено."
+        f"Доставлено: {result.ok}\n"
+        f"Заблокировали бота: {result.blocked} (исключены из рассылок)\n"
+        f"Ошибок: {result.failed}\n"
+        f"Пунктов в дайджесте: {job.meta.get('items', 0)}\n"
+        f"Разосланные пункты убраны из хранилища."
     )
 
 
+async def _run_logged(bot: Bot, job: BroadcastJob, title: str) -> None:
+    try:
+        await _run(bot, job, BroadcastEngine(bot), title)
+    except Exception:
+        logger.exception("broadcast %s: run failed", job.job_id)
+    finally:
+        release_job(job.job_id)
+
+
+_broadcast_tasks: set[asyncio.Task] = set()
+
+
+def _spawn(bot: Bot, job: BroadcastJob, title: str) -> asyncio.Task:
+    task = asyncio.create_task(_run_logged(bot, job, title))
+    _broadcast_tasks.add(task)
+    task.add_done_callback(_broadcast_tasks.discard)
+    return task
+
+
+async def resume_broadcasts(bot: Bot) -> None:
+    """
+    На старте бота досылаем рассылки, прерванные рестартом (только недоставленным),
+    и удаляем файлы давно завершённых.
+    """
+    await run_io(prune_finished_jobs)
+    for job in await run_io(pending_jobs):
+        if not claim_job(job.job_id):
+            continue
+        logger.info("broadcast %s: resuming", job.job_id)
+        _spawn(bot, job, f"🔁 Рассылка <code>{job.job_id}</code> продолжена после перезапуска бота")
+
+
 @router.message(Command("digest_clear"))
-async def digest_clear(message: types.Message, settings: Settings) -> None:
-    if not _is_admin(message.from_user.id, settings):
-        return
-    clear_store()
+async def digest_clear(message: types.Message) -> None:
+    await run_io(clear_store)
     await message.answer("🧹 Ок, пункты дайджеста очищены.")
+
+
+@router.message(Command("digest_pause"))
+async def digest_pause(message: types.Message) -> None:
+    active = active_job()
+    if active is None:
+        await message.answer("Сейчас нет идущей рассылки.")
+        return
+    job, engine = active
+    await pause_job(job, engine)
+    await message.answer(f"⏸ Рассылка <code>{job.job_id}</code> на паузе. /digest_resume — продолжить.")
+
+
+@router.message(Command("digest_resume"))
+async def digest_resume(message: types.Message) -> None:
+    active = active_job()
+    if active is None:
+        await message.answer("Сейчас нет идущей рассылки.")
+        return
+    job, engine = active
+    await resume_job(job, engine)
+    await message.answer(f"▶️ Рассылка <code>{job.job_id}</code> продолжается.")
+
+
+@router.message(Command("digest_cancel"))
+async def digest_cancel(message: types.Message) -> None:
+    active = active_job()
+    if active is None:
+        await message.answer("Сейчас нет идущей рассылки.")
+        return
+    job, engine = active
+    cancel_job(engine)
+    await message.answer(f"⏹ Останавливаю рассылку <code>{job.job_id}</code>…")
@@ -1,34 +1,16 @@
 from __future__ import annotations
 
-import json
-from pathlib import Path
 from datetime import datetime, timedelta, timezone
 
 from aiogram import Router, types
 
 from config import Settings
+from utils.digest_store import get_store
 
 router = Router()
 
 MSK = timezone(timedelta(hours=3))
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-STORE_PATH = BASE_DIR / "data" / "weekly_digest_items.json"
-
-
-def _load_store() -> list[dict]:
-    if not STORE_PATH.exists():
-        return []
-    try:
-        return json.loads(STORE_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        return []
-
-
-def _save_store(items: list[dict]) -> None:
-    STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    STORE_PATH.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
-
 
 def _title_from_text(text: str) -> str:
     t = (text or "").strip()
@@ -62,20 +44,19 @@ async def collect_from_channel(message: types.Message, settings: Settings) -> No
         # можно хранить и медиа-посты без текста, но дайджест тогда будет пустым
         return
 
-    title = _title_from_text(text)
-    link = _post_link(settings.channel_username, message.message_id)
-    ts = datetime.now(MSK).isoformat()
-
-    store = _load_store()
+    store = get_store()
 
-    # дедуп: по message_id
-    if any(it.get("message_id") == message.message_id for it in store):
+    # дедуп: по message_id (индекс в store, O(1))
+    if message.message_id in store:
         return
 
-    store.append({
+    title = _title_from_text(text)
+    link = _post_link(settings.channel_username, message.message_id)
+    ts = int(datetime.now(MSK).timestamp())
+
+    store.add({
         "ts": ts,
         "message_id": message.message_id,
         "title": title,
         "link": link,
     })
-    _save_store(store)
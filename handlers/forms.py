@@ -1,23 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 from datetime import datetime
 from typing import Any
 
-from aiogram import Router, types, F
+from aiogram import Bot, Router, types
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from keyboards.main_menu import get_main_menu
+from handlers.menu import MenuButton, menu_action
+from keyboards.main_menu import MENU_LEAD, get_main_menu
+from keyboards.callbacks import LeadCb, LeadKind
 from keyboards.forms_menu import get_lead_contact_kb
 from config import Settings
-from utils.json_loader import load_json, save_json
+from utils.catalog import courses_index, services_index
+from utils.lead_journal import get_journal
+from utils.notify import notify_admins
+from utils.storage import run_io
 
 
 router = Router()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-LEADS_PATH = BASE_DIR / "data" / "leads.json"
+LEADS_PATH = BASE_DIR / "data" / "leads.jsonl"
+# старый формат (JSON-массив) — переносится в журнал при первом обращении
+LEGACY_LEADS_PATH = BASE_DIR / "data" / "leads.json"
 
 
 class LeadForm(StatesGroup):
@@ -35,29 +43,33 @@ CONTACT_PROMPT = (
 )
 
 
-def _append_lead(entry: dict[str, Any]) -> None:
-    data = load_json(LEADS_PATH)
-    if not isinstance(data, list):
-        data = []
-    data.append(entry)
-    save_json(LEADS_PATH, data)
+async def _append_lead(entry: dict[str, Any]) -> None:
+    journal = get_journal(LEADS_PATH, legacy_path=LEGACY_LEADS_PATH)
+    await run_io(journal.append, entry, path=LEADS_PATH)
 
 
-def _is_menu_text(text: str) -> bool:
-    t = (text or "").strip()
-    return t in {"⬅️ В меню", "В меню", "Меню"}
+async def _lead_source(data: LeadCb) -> str:
+    # номер из кнопки -> читаемый источник для журнала и админов: lead:service:<id>
+    if data.kind == LeadKind.SERVICE:
+        kind, item_id = "service", (await services_index()).id_at(data.n)
+    else:
+        kind, item_id = "course", (await courses_index()).id_at(data.n)
+    return f"lead:{kind}:{item_id or '?'}"
 
 
-def _is_lead_button(text: str) -> bool:
-    t = (text or "").strip()
-    # ловим и с эмодзи, и без
-    return t in {"📩 Оставить заявку", "Оставить заявку"}
+async def _save_lead(bot: Bot, entry: dict[str, Any], admin_text: str, admin_ids: list[int]) -> None:
+    # до ответа пользователю: заявка в журнале, уведомления админам — в outbox на диске;
+    # в фоне остаётся только доставка (её ведёт OutboxDispatcher, после рестарта — replay)
+    await asyncio.gather(
+        _append_lead(entry),
+        notify_admins(bot, admin_ids, admin_text),
+    )
 
 
 # =========================
 # START LEAD — reply button
 # =========================
-@router.message(F.text.func(_is_lead_button))
+@menu_action(MENU_LEAD)
 async def lead_start(message: types.Message, state: FSMContext) -> None:
     await state.clear()
     await state.set_state(LeadForm.contact_text)
@@ -68,8 +80,8 @@ async def lead_start(message: types.Message, state: FSMContext) -> None:
 # =========================
 # START LEAD — inline button
 # =========================
-@router.callback_query(F.data.startswith("lead:"))
-async def lead_start_inline(callback: types.CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(LeadCb.filter())
+async def lead_start_inline(callback: types.CallbackQuery, callback_data: LeadCb, state: FSMContext) -> None:
     # обязательно, иначе Telegram будет показывать "loading"
     await callback.answer()
 
@@ -77,7 +89,7 @@ async def lead_start_inline(callback: types.CallbackQuery, state: FSMContext) ->
     await state.set_state(LeadForm.contact_text)
 
     # сохраняем источник (например lead:service:support_complex)
-    await state.update_data(lead_source=callback.data)
+    await state.update_data(lead_source=await _lead_source(callback_data))
 
     await callback.message.answer(CONTACT_PROMPT, reply_markup=get_lead_contact_kb())
 
@@ -85,32 +97,41 @@ async def lead_start_inline(callback: types.CallbackQuery, state: FSMContext) ->
 # =========================
 # COLLECT CONTACT
 # =========================
+# Кнопки главного меню во время ввода — не контакт.
+# «В меню» сюда не доходит: его перехватывает handlers/menu.py в любом состоянии
+@router.message(LeadForm.contact_text, MenuButton())
+async def lead_reject_menu_button(message: types.Message, menu_action: str) -> None:
+    if menu_action == MENU_LEAD:
+        # повторное нажатие «Оставить заявку» — просто напоминаем, что ждём
+        await message.answer(CONTACT_PROMPT, reply_markup=get_lead_contact_kb())
+        return
+    await message.answer(
+        "Это кнопка меню, а не контакт. Напишите, как с вами связаться, или нажмите «⬅️ В меню».",
+        reply_markup=get_lead_contact_kb(),
+    )
+
+
 @router.message(LeadForm.contact_text)
 async def lead_get_contact_text(message: types.Message, state: FSMContext, settings: Settings) -> None:
     text = (message.text or "").strip()
 
-    if _is_menu_text(text):
-        await state.clear()
-        await message.answer("Главное меню", reply_markup=get_main_menu())
-        return
-
     data = await state.get_data()
     source = data.get("lead_source")
 
     user = message.from_user
+    name = f"{user.first_name or ''} {user.last_name or ''}".strip()
 
-    _append_lead({
+    entry = {
         "ts": datetime.now().isoformat(),
         "user_id": user.id,
         "username": user.username,
-        "name": f"{user.first_name or ''} {user.last_name or ''}".strip(),
+        "name": name,
         "contact_text": text,
         "source": source,
-    })
+    }
 
     # уведомление админу(ам) в личку
     who = []
-    name = f"{user.first_name or ''} {user.last_name or ''}".strip()
     if name:
         who.append(name)
     if user.username:
@@ -124,12 +145,8 @@ async def lead_get_contact_text(message: types.Message, state: FSMContext, setti
         f"<b>Источник:</b> {source}"
     )
 
-    for admin_id in settings.admin_ids:
-        try:
-            await message.bot.send_message(admin_id, admin_text)
-        except Exception:
-            # если админу нельзя написать (например, он не запускал бота) — не валим сценарий
-            pass
+    # «получили» говорим только после записи на диск: падение процесса заявку уже не потеряет
+    await _save_lead(message.bot, entry, admin_text, sorted(settings.admin_ids))
 
     await state.clear()
     await message.answer(
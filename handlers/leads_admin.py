@@ -4,17 +4,18 @@ from pathlib import Path
 from aiogram import Router, types
 from aiogram.filters import Command
 
-from config import Settings
-from utils.json_loader import load_json, save_json
+from utils.lead_journal import get_journal
+from utils.storage import run_io
 
 router = Router()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-LEADS_PATH = BASE_DIR / "data" / "leads.json"
+LEADS_PATH = BASE_DIR / "data" / "leads.jsonl"
+LEGACY_LEADS_PATH = BASE_DIR / "data" / "leads.json"
 
 
-def _is_admin(user_id: int, settings: Settings) -> bool:
-    return user_id in set(settings.admin_ids)
+def _journal():
+    return get_journal(LEADS_PATH, legacy_path=LEGACY_LEADS_PATH)
 
 
 def _fmt_lead(i: int, lead: dict) -> str:
@@ -46,13 +47,11 @@ def _fmt_lead(i: int, lead: dict) -> str:
 
 
 @router.message(Command("list_leads"))
-async def list_leads(message: types.Message, settings: Settings) -> None:
+async def list_leads(message: types.Message) -> None:
     """
     /list_leads — показывает последние 10 заявок
     /list_leads 20 — последние 20
     """
-    if not _is_admin(message.from_user.id, settings):
-        return
 
     args = (message.text or "").split(maxsplit=1)
     limit = 10
@@ -62,9 +61,9 @@ async def list_leads(message: types.Message, settings: Settings) -> None:
         except ValueError:
             limit = 10
 
-    data = load_json(LEADS_PATH)
-    if not isinstance(data, list) or not data:
-        await message.answer("Пока нет заявок (leads.json пуст).")
+    data = await run_io(_journal().read_all, path=LEADS_PATH)
+    if not data:
+        await message.answer("Пока нет заявок (журнал заявок пуст).")
         return
 
     last = list(reversed(data))[:limit]  # последние N
@@ -77,12 +76,10 @@ async def list_leads(message: types.Message, settings: Settings) -> None:
 
 
 @router.message(Command("clear_leads"))
-async def clear_leads(message: types.Message, settings: Settings) -> None:
+async def clear_leads(message: types.Message) -> None:
     """
-    /clear_leads — очистить leads.json (осторожно)
+    /clear_leads — очистить журнал заявок (осторожно)
     """
-    if not _is_admin(message.from_user.id, settings):
-        return
 
-    save_json(LEADS_PATH, [])
-    await message.answer("✅ Заявки очищены (leads.json теперь пуст).")
+    await run_io(_journal().clear, path=LEADS_PATH)
+    await message.answer("✅ Заявки очищены (журнал заявок теперь пуст).")
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Awaitable, Callable
+
+from aiogram import Router, types
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.filters import BaseFilter, StateFilter
+from aiogram.fsm.context import FSMContext
+
+from keyboards.main_menu import MENU_HOME, menu_texts
+
+router = Router(name="menu")
+
+_NOISE_RE = re.compile(r"[^\w\s]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_menu_text(text: str | None) -> str:
+    """
+    «⬅️ В меню» -> «в меню»: без эмодзи и знаков, пробелы схлопнуты, регистр не важен.
+    """
+    text = _NOISE_RE.sub(" ", text or "")
+    return _SPACES_RE.sub(" ", text).strip().casefold()
+
+
+# нормализованный текст кнопки -> действие (строится из keyboards/main_menu.py)
+MENU_TABLE: dict[str, str] = {
+    normalize_menu_text(text): action
+    for action, texts in menu_texts().items()
+    for text in texts
+}
+
+# действие -> хендлер раздела (регистрируется через @menu_action)
+_handlers: dict[str, CallableObject] = {}
+
+
+def menu_action_for(text: str | None) -> str | None:
+    return MENU_TABLE.get(normalize_menu_text(text))
+
+
+def menu_action(action: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    Регистрирует хендлер раздела для кнопки главного меню.
+    Хендлер получает message и любые данные апдейта по имени (state, settings, ...).
+    """
+    if action not in set(MENU_TABLE.values()):
+        raise ValueError(f"Unknown menu action: {action!r}")
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        _handlers[action] = CallableObject(func)
+        return func
+
+    return decorator
+
+
+class MenuButton(BaseFilter):
+    """
+    Один поиск в словаре вместо цепочки F.text.contains по роутерам.
+    MenuButton(MENU_HOME) — только перечисленные кнопки.
+    """
+
+    def __init__(self, *actions: str) -> None:
+        self.actions = frozenset(actions)
+
+    async def __call__(self, message: types.Message) -> bool | dict[str, Any]:
+        action = menu_action_for(message.text)
+        if action is None or action not in _handlers:
+            return False
+        if self.actions and action not in self.actions:
+            return False
+        return {"menu_action": action}
+
+
+# StateFilter(None): пока идёт форма/диалог, текст достаётся его хендлерам,
+# а не меню (контакт «про обучение» больше не открывает курсы)
+@router.message(StateFilter(None), MenuButton())
+async def dispatch_menu(message: types.Message, menu_action: str, **data: Any) -> Any:
+    return await _handlers[menu_action].call(message, **data)
+
+
+# «В меню» — выход из любой формы/диалога (и админского тоже): состояние сбрасывается,
+# а текст кнопки не попадает в ввод
+@router.message(~StateFilter(None), MenuButton(MENU_HOME))
+async def leave_to_menu(message: types.Message, state: FSMContext, menu_action: str, **data: Any) -> Any:
+    await state.clear()
+    return await _handlers[menu_action].call(message, state=state, **data)
@@ -1,32 +1,31 @@
 from __future__ import annotations
 
-from pathlib import Path
 from aiogram import Router, types, F
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
-from keyboards.main_menu import get_main_menu
-from keyboards.services_menu import build_services_root_kb, build_services_list_kb
-from utils.json_loader import load_json
+from handlers.menu import menu_action
+from keyboards.callbacks import Nav, ServiceCb, ServiceGroup, ServiceGroupCb, ServicesNavCb
+from keyboards.main_menu import MENU_SERVICES, get_main_menu
+from keyboards.services_menu import build_service_card_kb, build_services_root_kb, build_services_list_kb
+from utils.catalog import ServicesIndex, services_index
+from utils.navigation import safe_edit_or_send
+from utils.render_cache import render_cache
 
 router = Router()
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-SERVICES_PATH = BASE_DIR / "data" / "services.json"
-
 # "невидимый" расширитель строки (символ Брайля U+2800)
 WIDE_PAD = "⠀" * 60
 
-
-def _load_services() -> list[dict]:
-    data = load_json(SERVICES_PATH)
-    if isinstance(data, dict) and isinstance(data.get("services"), list):
-        return data["services"]
-    return []
-
-
-def _services_by_group(group: str) -> list[dict]:
-    services = _load_services()
-    return [s for s in services if (s.get("group") or "").strip() == group]
+# кнопка раздела -> (group в services.json, заголовок списка, текст для пустого раздела)
+GROUPS = {
+    ServiceGroup.AUDIT: ("audit", "Выберите аудит:", "В разделе «Аудиты» пока нет услуг."),
+    # ⬇️ расширяем пузырь, чтобы кнопки были как у аудитов
+    ServiceGroup.SUPPORT: (
+        "specialized_service",
+        f"Выберите формат сопровождения:\n{WIDE_PAD}",
+        "В разделе «Сопровождение» пока нет услуг.",
+    ),
+}
+GROUP_BY_NAME = {name: group for group, (name, _, _) in GROUPS.items()}
 
 
 def _render_service(service: dict) -> str:
@@ -53,103 +52,79 @@ def _render_service(service: dict) -> str:
     return "\n".join(lines)
 
 
-def _support_sort_key(svc: dict) -> tuple:
-    # Комплексное сопровождение всегда первым
-    return (0 if (svc.get("id") == "support_complex") else 1, (svc.get("name") or ""))
+def _service_card(index: ServicesIndex, service_id: str, service: dict) -> str:
+    # HTML карточки считается один раз на версию каталога
+    return render_cache.get("services", index.version, service_id, lambda: _render_service(service))
 
 
-@router.message(F.text.contains("Аудит") & F.text.contains("сопровождение"))
+async def warm_service_cards() -> None:
+    index = await services_index()
+    for service_id, service in index.by_id.items():
+        _service_card(index, service_id, service)
+
+
+@menu_action(MENU_SERVICES)
 async def open_services(message: types.Message) -> None:
     await message.answer("Выберите направление:", reply_markup=build_services_root_kb())
 
 
-@router.callback_query(F.data == "svcgrp:menu")
+@router.callback_query(ServicesNavCb.filter(F.to == Nav.MENU))
 async def services_to_menu(callback: types.CallbackQuery) -> None:
     await callback.message.answer("Главное меню 👇", reply_markup=get_main_menu())
     await callback.answer()
 
 
-@router.callback_query(F.data == "svcgrp:back")
+@router.callback_query(ServicesNavCb.filter(F.to == Nav.BACK))
 async def services_back(callback: types.CallbackQuery) -> None:
-    await callback.message.answer("Выберите направление:", reply_markup=build_services_root_kb())
     await callback.answer()
+    await safe_edit_or_send(callback, "Выберите направление:", reply_markup=build_services_root_kb())
 
 
-@router.callback_query(F.data == "svcgrp:audit")
-async def open_audits(callback: types.CallbackQuery) -> None:
-    audits = _services_by_group("audit")
-    audits = sorted(audits, key=lambda s: (s.get("name") or ""))
-
-    items = [
-        ((s.get("id") or "").strip(), (s.get("name") or "").strip())
-        for s in audits
-        if (s.get("id") or "").strip() and (s.get("name") or "").strip()
-    ]
+async def _open_group(callback: types.CallbackQuery, group: ServiceGroup) -> None:
+    # готовый отсортированный список из индекса каталога
+    index = await services_index()
+    name, title, empty = GROUPS[group]
+    items = index.groups.get(name, ())
 
     await callback.answer()
 
     if not items:
-        await callback.message.answer("В разделе «Аудиты» пока нет услуг.")
+        await safe_edit_or_send(callback, empty, reply_markup=build_services_root_kb())
         return
 
-    await callback.message.answer(
-        "Выберите аудит:",
-        reply_markup=build_services_list_kb(items),
+    await safe_edit_or_send(
+        callback,
+        title,
+        reply_markup=build_services_list_kb(items, version=index.version),
     )
 
 
-@router.callback_query(F.data == "svcgrp:support")
-async def open_support(callback: types.CallbackQuery) -> None:
-    support = _services_by_group("specialized_service")
-    support = sorted(support, key=_support_sort_key)
-
-    items = [
-        ((s.get("id") or "").strip(), (s.get("name") or "").strip())
-        for s in support
-        if (s.get("id") or "").strip() and (s.get("name") or "").strip()
-    ]
-
-    await callback.answer()
-
-    if not items:
-        await callback.message.answer("В разделе «Сопровождение» пока нет услуг.")
-        return
+@router.callback_query(ServiceGroupCb.filter(F.group == ServiceGroup.AUDIT))
+async def open_audits(callback: types.CallbackQuery) -> None:
+    await _open_group(callback, ServiceGroup.AUDIT)
 
-    # ⬇️ расширяем пузырь, чтобы кнопки были как у аудитов
-    text = f"Выберите формат сопровождения:\n{WIDE_PAD}"
 
-    await callback.message.answer(
-        text,
-        reply_markup=build_services_list_kb(items),
-    )
+@router.callback_query(ServiceGroupCb.filter(F.group == ServiceGroup.SUPPORT))
+async def open_support(callback: types.CallbackQuery) -> None:
+    await _open_group(callback, ServiceGroup.SUPPORT)
 
 
-@router.callback_query(F.data.startswith("svc:"))
-async def show_service(callback: types.CallbackQuery) -> None:
-    service_id = callback.data.split("svc:", 1)[1]
-    services = _load_services()
-    service = next((s for s in services if (s.get("id") or "").strip() == service_id), None)
+@router.callback_query(ServiceCb.filter())
+async def show_service(callback: types.CallbackQuery, callback_data: ServiceCb) -> None:
+    index = await services_index()
+    service_id = index.id_at(callback_data.n)
+    service = index.by_id.get(service_id) if service_id else None
 
     await callback.answer()
 
     if not service:
-        await callback.message.answer("Услуга не найдена.")
+        await safe_edit_or_send(callback, "Услуга не найдена.", reply_markup=build_services_root_kb())
         return
 
-    # 1️⃣ карточка услуги
-    await callback.message.answer(_render_service(service))
-
-    # 2️⃣ кнопка "Оставить заявку" с source = service:<id>
-    lead_kb = InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(
-                text="📩 Оставить заявку",
-                callback_data=f"lead:service:{service_id}",
-            )
-        ]
-    ])
-
-    await callback.message.answer(
-        "Если хотите — оставьте заявку, мы свяжемся с вами.",
-        reply_markup=lead_kb,
+    # карточка и кнопка заявки — одним сообщением, на месте списка
+    group = GROUP_BY_NAME.get((service.get("group") or "").strip())
+    await safe_edit_or_send(
+        callback,
+        _service_card(index, service_id, service),
+        reply_markup=build_service_card_kb(callback_data.n, group),
     )
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from aiogram import Router, types
+
+router = Router()
+
+# Подключается последним: сюда доходят нажатия, которые не разобрал ни один хендлер —
+# кнопки старого формата (до смены callback_data), битые payload'ы, чужие админ-кнопки.
+STALE_TEXT = "Кнопка устарела — откройте раздел заново из меню."
+
+
+@router.callback_query()
+async def stale_callback(callback: types.CallbackQuery) -> None:
+    # без ответа у пользователя крутятся «часики» на кнопке
+    await callback.answer(STALE_TEXT)
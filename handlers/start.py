@@ -1,31 +1,19 @@
 from aiogram import Router, types
 from aiogram.filters import Command
 from pathlib import Path
-import json
+
+from utils.storage import run_io
+from utils.subscribers import get_subscribers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 USERS_PATH = BASE_DIR / "data" / "users.json"
 
-def _load_users() -> dict:
-    if not USERS_PATH.exists():
-        return {"subscribers": []}
-    try:
-        return json.loads(USERS_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        return {"subscribers": []}
-
-def _save_users(data: dict) -> None:
-    USERS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    USERS_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-def add_user(user_id: int) -> None:
-    data = _load_users()
-    subs = set(data.get("subscribers", []))
-    subs.add(user_id)
-    data["subscribers"] = sorted(subs)
-    _save_users(data)
+def add_user(user_id: int) -> bool:
+    # повторный /start известного пользователя не трогает диск
+    return get_subscribers(USERS_PATH).add(user_id)
 
-from keyboards.main_menu import get_main_menu
+from handlers.menu import menu_action
+from keyboards.main_menu import MENU_HOME, get_main_menu
 
 router = Router()
 
@@ -38,7 +26,8 @@ WELCOME_TEXT = (
 
 @router.message(Command("start"))
 async def cmd_start(message: types.Message) -> None:
-    add_user(message.from_user.id)
+    # первая загрузка и запись нового ID — файловый I/O, уводим из event loop
+    await run_io(add_user, message.from_user.id, path=USERS_PATH)
     await message.answer(WELCOME_TEXT, reply_markup=get_main_menu())
 
 
@@ -48,6 +37,6 @@ async def cmd_menu(message: types.Message) -> None:
     await message.answer("Главное меню", reply_markup=get_main_menu())
 
 
-@router.message(lambda m: (m.text or "").strip() in {"⬅️ В меню", "В меню", "Меню"})
+@menu_action(MENU_HOME)
 async def back_to_menu(message: types.Message) -> None:
     await message.answer("Главное меню", reply_markup=get_main_menu())
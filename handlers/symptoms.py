@@ -1,37 +1,24 @@
 from __future__ import annotations
 
 import html
-from pathlib import Path
 
 from aiogram import Router, types, F
-from aiogram.exceptions import TelegramBadRequest
 
-from keyboards.main_menu import get_main_menu
+from handlers.menu import menu_action
+from keyboards.callbacks import Nav, SymptomCategoryCb, SymptomItemCb, SymptomsNavCb
+from keyboards.main_menu import MENU_SYMPTOMS, get_main_menu
 from keyboards.symptoms_menu import (
     build_symptoms_categories_kb,
     build_symptom_nav_kb,
-    cat_key,
 )
-from utils.json_loader import load_json
+from utils.catalog import SymptomsIndex, symptoms_index
+from utils.navigation import safe_edit_or_send
+from utils.render_cache import render_cache
 
 router = Router()
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-SYMPTOMS_PATH = BASE_DIR / "data" / "symptoms.json"
 
 
-def _load_symptoms() -> dict[str, list[dict[str, str]]]:
-    data = load_json(SYMPTOMS_PATH)
-    return data if isinstance(data, dict) else {}
-
-
-def _key_to_category(categories: list[str], key: str) -> str | None:
-    """Находим реальную категорию по короткому ключу."""
-    for c in categories:
-        if cat_key(c) == key:
-            return c
-    return None
-
 
 def _render_item(item: dict[str, str], *, index: int, total: int) -> str:
     # ✅ Экранируем HTML, чтобы не ломались сущности вроде "<30"
@@ -45,31 +32,29 @@ def _render_item(item: dict[str, str], *, index: int, total: int) -> str:
     return f"{header}\n\n{text}" if text else f"{header}\n\n—"
 
 
-async def _safe_edit_or_send(
-    callback: types.CallbackQuery,
-    text: str,
-    reply_markup: types.InlineKeyboardMarkup | None = None,
-) -> None:
-    """
-    Для навигации пытаемся редактировать сообщение.
-    Если Telegram ругается (например message is not modified / can't be edited) —
-    отправляем новое.
-    """
-    if not callback.message:
-        return
+def _item_card(index: SymptomsIndex, category: str, idx: int) -> str:
+    items = index.items[category]
+    total = len(items)
+    return render_cache.get(
+        "symptoms",
+        index.version,
+        (category, idx, total),
+        lambda: _render_item(items[idx], index=idx, total=total),
+    )
 
-    try:
-        await callback.message.edit_text(text, reply_markup=reply_markup)
-    except TelegramBadRequest:
-        await callback.message.answer(text, reply_markup=reply_markup)
 
+async def warm_symptom_cards() -> None:
+    index = await symptoms_index()
+    for category, items in index.items.items():
+        for idx in range(len(items)):
+            _item_card(index, category, idx)
 
-@router.message(F.text.contains("Симптомы") & F.text.contains("решения"))
+
+@menu_action(MENU_SYMPTOMS)
 async def open_symptoms_menu(message: types.Message) -> None:
-    data = _load_symptoms()
-    categories = sorted(data.keys())
+    index = await symptoms_index()
 
-    if not categories:
+    if not index.buttons:
         await message.answer(
             "Пока нет материалов в разделе «Симптомы и решения».",
             reply_markup=get_main_menu(),
@@ -78,41 +63,41 @@ async def open_symptoms_menu(message: types.Message) -> None:
 
     await message.answer(
         "Выберите категорию:",
-        reply_markup=build_symptoms_categories_kb(categories),
+        reply_markup=build_symptoms_categories_kb(index.buttons, version=index.version),
     )
 
 
-@router.callback_query(F.data.startswith("symcat:"))
-async def on_symptoms_category(callback: types.CallbackQuery) -> None:
-    data = _load_symptoms()
-    categories = sorted(data.keys())
+@router.callback_query(SymptomsNavCb.filter(F.to == Nav.MENU))
+async def on_symptoms_menu(callback: types.CallbackQuery) -> None:
+    await callback.answer()
+    if callback.message:
+        await callback.message.answer("Главное меню 👇", reply_markup=get_main_menu())
 
-    payload = (callback.data or "").split("symcat:", 1)[-1]
 
-    if payload == "__menu__":
-        await callback.answer()
-        if callback.message:
-            await callback.message.answer("Главное меню 👇", reply_markup=get_main_menu())
-        return
+@router.callback_query(SymptomsNavCb.filter(F.to == Nav.BACK))
+async def on_symptoms_back(callback: types.CallbackQuery) -> None:
+    index = await symptoms_index()
+    await callback.answer()
+    await safe_edit_or_send(
+        callback,
+        "Выберите категорию:",
+        reply_markup=build_symptoms_categories_kb(index.buttons, version=index.version),
+    )
 
-    if payload == "__back__":
-        await callback.answer()
-        await _safe_edit_or_send(
-            callback,
-            "Выберите категорию:",
-            reply_markup=build_symptoms_categories_kb(categories),
-        )
-        return
 
-    category = _key_to_category(categories, payload)
+@router.callback_query(SymptomCategoryCb.filter())
+async def on_symptoms_category(callback: types.CallbackQuery, callback_data: SymptomCategoryCb) -> None:
+    index = await symptoms_index()
+
+    category = index.by_id.get(callback_data.cat)
     if not category:
         await callback.answer("Категория не найдена")
         if callback.message:
             await callback.message.answer("Категория не найдена. Откройте раздел заново.")
         return
 
-    items = data.get(category, [])
-    if not isinstance(items, list) or not items:
+    items = index.items.get(category, ())
+    if not items:
         await callback.answer()
         if callback.message:
             await callback.message.answer("В этой категории пока нет карточек.")
@@ -120,50 +105,38 @@ async def on_symptoms_category(callback: types.CallbackQuery) -> None:
 
     idx = 0
     total = len(items)
-    msg = _render_item(items[idx], index=idx, total=total)
+    msg = _item_card(index, category, idx)
 
     await callback.answer()
-    await _safe_edit_or_send(
+    await safe_edit_or_send(
         callback,
         msg,
-        reply_markup=build_symptom_nav_kb(category, idx, total),
+        reply_markup=build_symptom_nav_kb(callback_data.cat, idx, total, version=index.version),
     )
 
 
-@router.callback_query(F.data.startswith("sym:item:"))
-async def on_symptom_item(callback: types.CallbackQuery) -> None:
-    data = _load_symptoms()
-    categories = sorted(data.keys())
-
-    payload = (callback.data or "").split("sym:item:", 1)[-1]
+@router.callback_query(SymptomItemCb.filter())
+async def on_symptom_item(callback: types.CallbackQuery, callback_data: SymptomItemCb) -> None:
+    index = await symptoms_index()
+    idx = callback_data.i
 
-    try:
-        cat_key_payload, index_str = payload.rsplit(":", 1)
-        idx = int(index_str)
-    except ValueError:
-        await callback.answer("Ошибка навигации")
-        return
-
-    category = _key_to_category(categories, cat_key_payload)
+    category = index.by_id.get(callback_data.cat)
     if not category:
         await callback.answer("Категория не найдена")
         return
 
-    items = data.get(category, [])
-    if not isinstance(items, list):
-        await callback.answer("Ошибка данных категории")
-        return
+    items = index.items.get(category, ())
 
     total = len(items)
-    if total == 0 or idx < 0 or idx >= total:
+    if idx >= total:
         await callback.answer("Карточка не найдена")
         return
 
-    msg = _render_item(items[idx], index=idx, total=total)
+    msg = _item_card(index, category, idx)
 
     await callback.answer()
-    await _safe_edit_or_send(
+    await safe_edit_or_send(
         callback,
         msg,
-        reply_markup=build_symptom_nav_kb(category, idx, total),
+        reply_markup=build_symptom_nav_kb(callback_data.cat, idx, total, version=index.version),
     )
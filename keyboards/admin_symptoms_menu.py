@@ -1,8 +1,19 @@
 from __future__ import annotations
 
-import hashlib
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from keyboards.callbacks import (
+    AdminAction,
+    AdminActionCb,
+    AdminCategoryCb,
+    AdminCategoryOp,
+    AdminEditField,
+    AdminFieldCb,
+)
+from utils.keyboard_cache import cached_keyboard
+
+CANCEL_CB = AdminActionCb(action=AdminAction.CANCEL).pack()
+
 
 def _short(text: str, max_len: int = 42) -> str:
     t = (text or "").strip()
@@ -11,57 +22,71 @@ def _short(text: str, max_len: int = 42) -> str:
     return t[: max_len - 1].rstrip() + "…"
 
 
-def cat_key(category: str) -> str:
-    return hashlib.md5(category.encode("utf-8")).hexdigest()[:10]
-
-
-def build_admin_categories_kb(categories: list[str]) -> InlineKeyboardMarkup:
+@cached_keyboard
+def build_admin_categories_kb(categories: list[tuple[int, str]]) -> InlineKeyboardMarkup:
     """
     Категории для /add_symptom: выбираем кнопку, чтобы не ошибиться.
     """
     rows: list[list[InlineKeyboardButton]] = []
-    for cat in categories:
+    for cat_id, cat in categories:
         rows.append([
             InlineKeyboardButton(
                 text=_short(cat),
-                callback_data=f"adm_symcat:{cat_key(cat)}",
+                callback_data=AdminCategoryCb(op=AdminCategoryOp.ADD, cat=cat_id).pack(),
             )
         ])
 
-    rows.append([InlineKeyboardButton(text="➕ Новая категория", callback_data="adm_symnew")])
-    rows.append([InlineKeyboardButton(text="❌ Отмена", callback_data="adm_symcancel")])
+    rows.append([InlineKeyboardButton(text="➕ Новая категория", callback_data=AdminActionCb(action=AdminAction.NEW_CATEGORY).pack())])
+    rows.append([InlineKeyboardButton(text="❌ Отмена", callback_data=CANCEL_CB)])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+@cached_keyboard
+def build_admin_del_categories_kb(categories: list[tuple[int, str]]) -> InlineKeyboardMarkup:
+    rows: list[list[InlineKeyboardButton]] = []
+    for cat_id, cat in categories:
+        rows.append([
+            InlineKeyboardButton(
+                text=_short(cat),
+                callback_data=AdminCategoryCb(op=AdminCategoryOp.DELETE, cat=cat_id).pack(),
+            )
+        ])
+    rows.append([InlineKeyboardButton(text="❌ Отмена", callback_data=CANCEL_CB)])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def build_admin_del_categories_kb(categories: list[str]) -> InlineKeyboardMarkup:
+@cached_keyboard
+def build_admin_edit_categories_kb(categories: list[tuple[int, str]]) -> InlineKeyboardMarkup:
     rows: list[list[InlineKeyboardButton]] = []
-    for cat in categories:
+    for cat_id, cat in categories:
         rows.append([
             InlineKeyboardButton(
                 text=_short(cat),
-                callback_data=f"adm_symdelcat:{cat_key(cat)}",
+                callback_data=AdminCategoryCb(op=AdminCategoryOp.EDIT, cat=cat_id).pack(),
             )
         ])
-    rows.append([InlineKeyboardButton(text="❌ Отмена", callback_data="adm_symcancel")])
+    rows.append([InlineKeyboardButton(text="❌ Отмена", callback_data=CANCEL_CB)])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def build_admin_edit_categories_kb(categories: list[str]) -> InlineKeyboardMarkup:
+@cached_keyboard
+def build_admin_rename_categories_kb(categories: list[tuple[int, str]]) -> InlineKeyboardMarkup:
     rows: list[list[InlineKeyboardButton]] = []
-    for cat in categories:
+    for cat_id, cat in categories:
         rows.append([
             InlineKeyboardButton(
                 text=_short(cat),
-                callback_data=f"adm_symeditcat:{cat_key(cat)}",
+                callback_data=AdminCategoryCb(op=AdminCategoryOp.RENAME, cat=cat_id).pack(),
             )
         ])
-    rows.append([InlineKeyboardButton(text="❌ Отмена", callback_data="adm_symcancel")])
+    rows.append([InlineKeyboardButton(text="❌ Отмена", callback_data=CANCEL_CB)])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@cached_keyboard
 def build_admin_edit_field_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="Заголовок", callback_data="adm_symentry:title")],
-        [InlineKeyboardButton(text="Текст", callback_data="adm_symentry:text")],
-        [InlineKeyboardButton(text="Отмена", callback_data="adm_symcancel")],
+        [InlineKeyboardButton(text="Заголовок", callback_data=AdminFieldCb(field=AdminEditField.TITLE).pack())],
+        [InlineKeyboardButton(text="Текст", callback_data=AdminFieldCb(field=AdminEditField.TEXT).pack())],
+        [InlineKeyboardButton(text="Отмена", callback_data=CANCEL_CB)],
     ])
@@ -0,0 +1,125 @@
+"""
+Все форматы callback_data бота — в одном месте.
+
+Каждая фабрика — свой короткий префикс, поля разделены «:».
+Услуги и курсы кодируются постоянным номером из индекса каталога (выводится из id),
+категории симптомов — постоянным id из symptoms.json: payload остаётся коротким
+и влезает в 64 байта, а правка каталога не перенаправляет старые кнопки.
+Разбор — CallbackData.unpack (через Factory.filter() в хендлерах): неверный префикс,
+число полей или значение (не число, неизвестный вариант, отрицательный номер)
+просто не проходит фильтр.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Annotated
+
+from aiogram.filters.callback_data import CallbackData
+from pydantic import Field
+
+# номер записи в индексе каталога / id категории
+Num = Annotated[int, Field(ge=0)]
+
+
+class Nav(str, Enum):
+    """Общие переходы раздела."""
+    MENU = "m"  # в главное меню
+    BACK = "b"  # на уровень вверх (к списку/категориям)
+
+
+# =========================
+# Услуги
+# =========================
+class ServiceGroup(str, Enum):
+    AUDIT = "a"
+    SUPPORT = "s"
+
+
+class ServicesNavCb(CallbackData, prefix="sn"):
+    to: Nav
+
+
+class ServiceGroupCb(CallbackData, prefix="sg"):
+    group: ServiceGroup
+
+
+class ServiceCb(CallbackData, prefix="sv"):
+    n: Num
+
+
+# =========================
+# Курсы
+# =========================
+class CoursesNavCb(CallbackData, prefix="cn"):
+    to: Nav
+
+
+class CourseCb(CallbackData, prefix="cr"):
+    n: Num
+
+
+# =========================
+# Симптомы
+# =========================
+class SymptomsNavCb(CallbackData, prefix="yn"):
+    to: Nav
+
+
+class SymptomCategoryCb(CallbackData, prefix="yc"):
+    cat: Num
+
+
+class SymptomItemCb(CallbackData, prefix="yi"):
+    cat: Num
+    i: Num
+
+
+# =========================
+# Заявка из карточки
+# =========================
+class LeadKind(str, Enum):
+    SERVICE = "s"
+    COURSE = "c"
+
+
+class LeadCb(CallbackData, prefix="ld"):
+    kind: LeadKind
+    n: Num
+
+
+# =========================
+# Админка симптомов
+# =========================
+class AdminAction(str, Enum):
+    CANCEL = "x"
+    NEW_CATEGORY = "n"
+
+
+class AdminCategoryOp(str, Enum):
+    ADD = "a"
+    DELETE = "d"
+    EDIT = "e"
+    RENAME = "r"
+
+
+class AdminEditField(str, Enum):
+    TITLE = "title"
+    TEXT = "text"
+
+
+class AdminActionCb(CallbackData, prefix="aa"):
+    action: AdminAction
+
+
+class AdminCategoryCb(CallbackData, prefix="ac"):
+    op: AdminCategoryOp
+    cat: Num
+
+
+class AdminFieldCb(CallbackData, prefix="af"):
+    field: AdminEditField
+
+
+# по этим префиксам AdminGate отличает попытку нажать админскую кнопку от устаревшей
+ADMIN_CALLBACK_PREFIXES = frozenset(cb.__prefix__ for cb in (AdminActionCb, AdminCategoryCb, AdminFieldCb))
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from keyboards.callbacks import CourseCb, CoursesNavCb, Nav
+from utils.keyboard_cache import cached_keyboard
+
 
 def _short_btn(text: str, max_len: int = 48) -> str:
     """
@@ -25,15 +28,17 @@ def _course_btn_text(name: str, next_dates: str | None) -> str:
     return f"{n} • {d}"
 
 
+@cached_keyboard
 def build_courses_list_kb(
     courses: list[dict],
+    numbers: dict[str, int],
     *,
-    back_cb: str = "courses:menu",
-    menu_cb: str = "main:menu",
+    back_cb: str = CoursesNavCb(to=Nav.BACK).pack(),
+    menu_cb: str = CoursesNavCb(to=Nav.MENU).pack(),
 ) -> InlineKeyboardMarkup:
     """
     Список курсов (inline).
-    callback_data: course:<course_id>
+    callback_data: CourseCb с номером курса (numbers — CoursesIndex.numbers)
     Ожидаемые ключи в course: id, name, next_dates (опционально)
     """
     rows: list[list[InlineKeyboardButton]] = []
@@ -43,7 +48,7 @@ def build_courses_list_kb(
         name = str(c.get("name", "")).strip()
         next_dates = c.get("next_dates", "")
 
-        if not course_id or not name:
+        if not course_id or not name or course_id not in numbers:
             # пропускаем битые записи, чтобы не упал бот
             continue
 
@@ -51,7 +56,7 @@ def build_courses_list_kb(
         rows.append([
             InlineKeyboardButton(
                 text=btn_text,
-                callback_data=f"course:{course_id}",
+                callback_data=CourseCb(n=numbers[course_id]).pack(),
             )
         ])
 
@@ -61,12 +66,13 @@ def build_courses_list_kb(
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@cached_keyboard
 def build_courses_root_kb() -> InlineKeyboardMarkup:
     """
     Если у тебя есть "корневое" меню курсов (например: выбрать курс / календарь / FAQ),
     можешь использовать это. Если не нужно — можно удалить.
     """
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="Выбрать курс", callback_data="courses:list")],
-        [InlineKeyboardButton(text="⬅️ В меню", callback_data="main:menu")],
+        [InlineKeyboardButton(text="Выбрать курс", callback_data=CoursesNavCb(to=Nav.BACK).pack())],
+        [InlineKeyboardButton(text="⬅️ В меню", callback_data=CoursesNavCb(to=Nav.MENU).pack())],
     ])
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 
+from utils.keyboard_cache import cached_keyboard
 
+
+@cached_keyboard
 def get_lead_contact_kb() -> ReplyKeyboardMarkup:
     """
     Клавиатура для заявки: без request_contact (чтобы Telegram не пугал предупреждением).
@@ -1,21 +1,47 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 
+from utils.keyboard_cache import cached_keyboard
 
+# действия главного меню (ключи таблицы диспетчеризации handlers/menu.py)
+MENU_HOME = "home"
+MENU_SYMPTOMS = "symptoms"
+MENU_COURSES = "courses"
+MENU_SERVICES = "services"
+MENU_LEAD = "lead"
+
+# раскладка меню: строки по 2 кнопки, (действие, текст кнопки)
+MAIN_MENU_LAYOUT: tuple[tuple[tuple[str, str], ...], ...] = (
+    ((MENU_SYMPTOMS, "Симптомы и решения"), (MENU_COURSES, "Курсы и обучение")),
+    ((MENU_SERVICES, "Аудит и сопровождение"), (MENU_LEAD, "Оставить заявку")),
+)
+
+# другие тексты, ведущие к тем же действиям (кнопки других клавиатур, старые варианты)
+MENU_ALIASES: dict[str, tuple[str, ...]] = {
+    MENU_HOME: ("⬅️ В меню", "В меню", "Меню"),
+    MENU_LEAD: ("📩 Оставить заявку",),
+}
+
+
+def menu_texts() -> dict[str, tuple[str, ...]]:
+    """
+    Действие -> все тексты, которыми его можно вызвать.
+    """
+    out: dict[str, tuple[str, ...]] = {}
+    for row in MAIN_MENU_LAYOUT:
+        for action, text in row:
+            out[action] = out.get(action, ()) + (text,)
+    for action, texts in MENU_ALIASES.items():
+        out[action] = out.get(action, ()) + texts
+    return out
+
+
+@cached_keyboard
 def get_main_menu() -> ReplyKeyboardMarkup:
     """
     Компактное главное меню (2 колонки).
     """
     return ReplyKeyboardMarkup(
-        keyboard=[
-            [
-                KeyboardButton(text="Симптомы и решения"),
-                KeyboardButton(text="Курсы и обучение"),
-            ],
-            [
-                KeyboardButton(text="Аудит и сопровождение"),
-                KeyboardButton(text="Оставить заявку"),
-            ],
-        ],
+        keyboard=[[KeyboardButton(text=text) for _, text in row] for row in MAIN_MENU_LAYOUT],
         resize_keyboard=True,
         input_field_placeholder="Выберите раздел…",
         selective=True,
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from keyboards.callbacks import LeadCb, LeadKind, Nav, ServiceCb, ServiceGroup, ServiceGroupCb, ServicesNavCb
+from utils.keyboard_cache import cached_keyboard
+
 
 def _short_btn(text: str, max_len: int = 32) -> str:
     """
@@ -14,36 +17,51 @@ def _short_btn(text: str, max_len: int = 32) -> str:
     return t[: max_len - 1].rstrip() + "…"
 
 
+@cached_keyboard
 def build_services_root_kb() -> InlineKeyboardMarkup:
     """
     Ровно 2 кнопки: Аудиты / Сопровождение
     """
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="Аудиты", callback_data="svcgrp:audit")],
-        [InlineKeyboardButton(text="Сопровождение", callback_data="svcgrp:support")],
-        [InlineKeyboardButton(text="⬅️ В меню", callback_data="svcgrp:menu")],
+        [InlineKeyboardButton(text="Аудиты", callback_data=ServiceGroupCb(group=ServiceGroup.AUDIT).pack())],
+        [InlineKeyboardButton(text="Сопровождение", callback_data=ServiceGroupCb(group=ServiceGroup.SUPPORT).pack())],
+        [InlineKeyboardButton(text="⬅️ В меню", callback_data=ServicesNavCb(to=Nav.MENU).pack())],
     ])
 
 
+@cached_keyboard
 def build_services_list_kb(
-    items: list[tuple[str, str]],
+    items: list[tuple[int, str]],
     *,
-    back_cb: str = "svcgrp:back",
+    back_cb: str = ServicesNavCb(to=Nav.BACK).pack(),
 ) -> InlineKeyboardMarkup:
     """
     Универсальный список услуг (inline, как у аудитов).
-    items: [(service_id, service_name)]
-    callback_data: svc:<service_id> (коротко и безопасно)
+    items: [(номер услуги в индексе каталога, service_name)]
+    callback_data: ServiceCb (номер вместо id — коротко при любой длине id)
     """
     rows = []
-    for service_id, name in items:
+    for num, name in items:
         rows.append([
             InlineKeyboardButton(
                 text=_short_btn(name),
-                callback_data=f"svc:{service_id}",
+                callback_data=ServiceCb(n=num).pack(),
             )
         ])
 
     rows.append([InlineKeyboardButton(text="⬅️ Назад", callback_data=back_cb)])
-    rows.append([InlineKeyboardButton(text="⬅️ В меню", callback_data="svcgrp:menu")])
+    rows.append([InlineKeyboardButton(text="⬅️ В меню", callback_data=ServicesNavCb(to=Nav.MENU).pack())])
     return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+@cached_keyboard
+def build_service_card_kb(num: int, group: ServiceGroup | None = None) -> InlineKeyboardMarkup:
+    """
+    Клавиатура карточки услуги: заявка + возврат к списку группы (или к направлениям).
+    """
+    back_cb = ServiceGroupCb(group=group).pack() if group else ServicesNavCb(to=Nav.BACK).pack()
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📩 Оставить заявку", callback_data=LeadCb(kind=LeadKind.SERVICE, n=num).pack())],
+        [InlineKeyboardButton(text="⬅️ Назад", callback_data=back_cb)],
+        [InlineKeyboardButton(text="⬅️ В меню", callback_data=ServicesNavCb(to=Nav.MENU).pack())],
+    ])
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import hashlib
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from keyboards.callbacks import Nav, SymptomCategoryCb, SymptomItemCb, SymptomsNavCb
+from utils.keyboard_cache import cached_keyboard
+
 
 def _short_btn(text: str, max_len: int = 40) -> str:
     t = (text or "").strip()
@@ -11,51 +13,46 @@ def _short_btn(text: str, max_len: int = 40) -> str:
     return t[: max_len - 1].rstrip() + "…"
 
 
-def cat_key(category: str) -> str:
-    """
-    Короткий безопасный ключ категории для callback_data (всегда ASCII и коротко).
-    """
-    return hashlib.md5(category.encode("utf-8")).hexdigest()[:8]
-
-
-def build_symptoms_categories_kb(categories: list[str]) -> InlineKeyboardMarkup:
+@cached_keyboard
+def build_symptoms_categories_kb(categories: list[tuple[int, str]]) -> InlineKeyboardMarkup:
+    # categories: ((id, name), ...) — SymptomsIndex.buttons
     rows: list[list[InlineKeyboardButton]] = []
 
-    for cat in categories:
+    for cat_id, cat in categories:
         rows.append([
             InlineKeyboardButton(
                 text=_short_btn(cat, 42),
-                callback_data=f"symcat:{cat_key(cat)}",
+                callback_data=SymptomCategoryCb(cat=cat_id).pack(),
             )
         ])
 
-    rows.append([InlineKeyboardButton(text="⬅️ В меню", callback_data="symcat:__menu__")])
+    rows.append([InlineKeyboardButton(text="⬅️ В меню", callback_data=SymptomsNavCb(to=Nav.MENU).pack())])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def build_symptom_nav_kb(category: str, index: int, total: int) -> InlineKeyboardMarkup:
+@cached_keyboard
+def build_symptom_nav_kb(cat_id: int, index: int, total: int) -> InlineKeyboardMarkup:
     rows: list[list[InlineKeyboardButton]] = []
-    key = cat_key(category)
 
     nav_row: list[InlineKeyboardButton] = []
     if index > 0:
         nav_row.append(
             InlineKeyboardButton(
                 text="◀️ Назад",
-                callback_data=f"sym:item:{key}:{index - 1}",
+                callback_data=SymptomItemCb(cat=cat_id, i=index - 1).pack(),
             )
         )
     if index < total - 1:
         nav_row.append(
             InlineKeyboardButton(
                 text="▶️ Далее",
-                callback_data=f"sym:item:{key}:{index + 1}",
+                callback_data=SymptomItemCb(cat=cat_id, i=index + 1).pack(),
             )
         )
     if nav_row:
         rows.append(nav_row)
 
-    rows.append([InlineKeyboardButton(text="Категории", callback_data="symcat:__back__")])
-    rows.append([InlineKeyboardButton(text="⬅️ В меню", callback_data="symcat:__menu__")])
+    rows.append([InlineKeyboardButton(text="Категории", callback_data=SymptomsNavCb(to=Nav.BACK).pack())])
+    rows.append([InlineKeyboardButton(text="⬅️ В меню", callback_data=SymptomsNavCb(to=Nav.MENU).pack())])
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
@@ -1,6 +1,104 @@
+import asyncio
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+from aiogram.types import Update  # noqa: E402
+
+import utils.digest_store as digest_store  # noqa: E402
+import utils.notify as notify  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_singletons(monkeypatch):
+    # общие экземпляры создаются из путей-констант при первом обращении;
+    # тесты подменяют пути, поэтому каждый начинает без готового экземпляра
+    monkeypatch.setattr(digest_store, "_store", None)
+    monkeypatch.setattr(notify, "_dispatcher", None)
+
+
+class FakeBot:
+    """
+    Вместо Telegram: send_message записывает (chat_id, text), edit_message_text — текст правки.
+    errors — chat_id -> исключения, которые выбросим по очереди; delays — задержка отправки.
+    """
+
+    def __init__(self, errors=None, delays=None, delay=0.0):
+        self.errors = {chat_id: list(excs) for chat_id, excs in (errors or {}).items()}
+        self.delays = dict(delays or {})
+        self.delay = delay
+        self.sent = []
+        self.edits = []
+        # сколько отправок идёт одновременно сейчас и максимум за всё время
+        self.active = 0
+        self.peak = 0
+
+    @property
+    def sent_to(self):
+        return [chat_id for chat_id, _ in self.sent]
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(chat_id, self.delay))
+            queue = self.errors.get(chat_id)
+            if queue:
+                raise queue.pop(0)
+            self.sent.append((chat_id, text))
+        finally:
+            self.active -= 1
+
+    async def edit_message_text(self, text, chat_id=None, message_id=None, **kwargs):
+        self.edits.append(text)
+
+
+@pytest.fixture
+def make_bot():
+    return FakeBot
+
+
+def _message_update(text, update_id=1, user_id=5):
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1760000000,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "U"},
+            "text": text,
+        },
+    })
+
+
+def _callback_update(data, update_id=1, user_id=5):
+    return Update.model_validate({
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "chat_instance": "1",
+            "from": {"id": user_id, "is_bot": False, "first_name": "U"},
+            "data": data,
+        },
+    })
+
+
+@pytest.fixture
+def message_update():
+    """
+    Фабрика апдейтов с текстовым сообщением в личке: message_update(text, update_id, user_id=...).
+    """
+    return _message_update
+
+
+@pytest.fixture
+def callback_update():
+    """
+    Фабрика апдейтов с нажатием inline-кнопки: callback_update(data, update_id, user_id=...).
+    """
+    return _callback_update
@@ -0,0 +1,32 @@
+import asyncio
+
+from aiogram import Bot
+
+import bot
+import utils.broadcast_jobs as bj
+import utils.digest_store as digest_store
+import utils.notify as notify
+from config import Settings
+
+
+def test_dispatcher_starts_and_stops(monkeypatch, tmp_path):
+    # всё, что хуки пишут на диск, — во временный каталог
+    monkeypatch.setattr(bot, "FSM_PATH", tmp_path / "fsm.sqlite3")
+    monkeypatch.setattr(bj, "JOBS_DIR", tmp_path / "broadcasts")
+    monkeypatch.setattr(notify, "OUTBOX_PATH", tmp_path / "outbox.jsonl")
+    monkeypatch.setattr(digest_store, "STORE_DIR", tmp_path / "digest")
+    monkeypatch.setattr(digest_store, "STORE_PATH", tmp_path / "weekly_digest_items.json")
+
+    settings = Settings(bot_token="42:TEST", admin_ids=frozenset({1}), digest_channel_id=0)
+    # роутеры — модульные синглтоны: build_dispatcher можно вызвать один раз на процесс
+    dp = bot.build_dispatcher(settings)
+
+    async def scenario():
+        tg = Bot("42:TEST")
+        # хуки получают те же данные, что и при start_polling / webhook
+        await dp.emit_startup(bot=tg, dispatcher=dp, **dp.workflow_data)
+        await dp.emit_shutdown(bot=tg, dispatcher=dp, **dp.workflow_data)
+        await tg.session.close()
+
+    # хуки старта и остановки отрабатывают без ошибок
+    asyncio.run(scenario())
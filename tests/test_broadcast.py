@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from utils.broadcast import BroadcastEngine, TokenBucket
+
+_METHOD = SendMessage(chat_id=1, text="x")
+
+
+def test_counts_ok_blocked_failed_separately(make_bot):
+    bot = make_bot(errors={
+        2: [TelegramForbiddenError(method=_METHOD, message="Forbidden: bot was blocked by the user")],
+        3: [TelegramBadRequest(method=_METHOD, message="Bad Request: chat not found")],
+        4: [TelegramBadRequest(method=_METHOD, message="Bad Request: message is too long")],
+    }, delay=0.005)
+    engine = BroadcastEngine(bot, rate=1000, workers=4)
+
+    result = asyncio.run(engine.run([1, 2, 3, 4, 5], "hi"))
+
+    assert (result.ok, result.blocked, result.failed) == (2, 2, 1)
+    assert sorted(bot.sent_to) == [1, 5]
+
+
+def test_retry_after_is_honored(make_bot):
+    bot = make_bot(errors={1: [TelegramRetryAfter(method=_METHOD, message="Too Many Requests", retry_after=0)]})
+    engine = BroadcastEngine(bot, rate=1000, workers=1)
+
+    result = asyncio.run(engine.run([1], "hi"))
+
+    assert result.ok == 1
+    assert bot.sent_to == [1]
+
+
+def test_workers_run_concurrently(make_bot):
+    bot = make_bot(delay=0.005)
+    engine = BroadcastEngine(bot, rate=10_000, workers=8)
+
+    result = asyncio.run(engine.run(range(40), "hi"))
+
+    assert result.ok == 40
+    assert bot.peak > 1
+
+
+def test_token_bucket_limits_rate():
+    async def scenario():
+        bucket = TokenBucket(rate=100, capacity=1)
+        started = time.monotonic()
+        for _ in range(11):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # 1 токен сразу + 10 по 10 мс
+    assert asyncio.run(scenario()) >= 0.09
+
+
+def test_pause_resume_and_cancel(make_bot):
+    bot = make_bot(delay=0.005)
+    engine = BroadcastEngine(bot, rate=10_000, workers=2)
+
+    async def scenario():
+        engine.pause()
+        task = asyncio.create_task(engine.run(range(10), "hi"))
+        await asyncio.sleep(0.05)
+        assert bot.sent == []
+
+        engine.resume()
+        while len(bot.sent) < 2:
+            await asyncio.sleep(0.001)
+        engine.cancel()
+        return await task
+
+    result = asyncio.run(scenario())
+
+    assert engine.cancelled
+    assert 2 <= result.total < 10
+    assert len(bot.sent) == result.ok
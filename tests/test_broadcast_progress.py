@@ -0,0 +1,45 @@
+import asyncio
+
+from utils.broadcast import BroadcastEngine, BroadcastResult
+from utils.broadcast_progress import BroadcastProgress
+
+
+def test_progress_counts_and_eta(make_bot):
+    progress = BroadcastProgress(
+        make_bot(), 1, 10, title="Рассылка", total=10, done=BroadcastResult(ok=2, blocked=1),
+    )
+    asyncio.run(progress.record(5, "ok"))
+    asyncio.run(progress.record(6, "failed"))
+
+    # 4 отправки за 2 секунды — 2 сообщ./с, осталось 4 -> ~2 с
+    progress._samples.extend([(0.0, 1), (2.0, 5)])
+    text = progress.render()
+
+    assert "Отправлено: 3" in text
+    assert "Не доставлено: 2" in text
+    assert "Осталось: 5 из 10" in text
+    assert "Скорость: 2.0" in text
+    assert "~2 с" in text
+
+
+def test_progress_is_throttled_and_finalized(make_bot):
+    bot = make_bot()
+    engine = BroadcastEngine(bot, rate=1000)
+    progress = BroadcastProgress(bot, 1, 10, title="Рассылка", total=100, engine=engine, interval=0.05)
+
+    async def scenario():
+        progress.start()
+        for uid in range(5):
+            await progress.record(uid, "ok")
+            await asyncio.sleep(0.001)
+        engine.pause()
+        await asyncio.sleep(0.12)
+        await progress.stop("✅ завершена")
+
+    asyncio.run(scenario())
+
+    # за ~0.12 с при интервале 0.05 — пара правок, а не по одной на отправку
+    assert 1 <= len(bot.edits) <= 4
+    assert any("на паузе" in text for text in bot.edits[:-1])
+    assert "✅ завершена" in bot.edits[-1]
+    assert "/digest_pause" not in bot.edits[-1]
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+import handlers.forms as forms
+from keyboards.callbacks import (
+    AdminCategoryCb,
+    AdminCategoryOp,
+    CourseCb,
+    CoursesNavCb,
+    LeadCb,
+    LeadKind,
+    Nav,
+    ServiceCb,
+    SymptomItemCb,
+)
+from utils.catalog import build_courses_index, build_services_index
+
+
+def test_roundtrip():
+    for cb in [
+        ServiceCb(n=12),
+        ServiceCb(n=0xFFFFFFFF),
+        CourseCb(n=0),
+        CoursesNavCb(to=Nav.BACK),
+        LeadCb(kind=LeadKind.COURSE, n=3),
+        SymptomItemCb(cat=7, i=4),
+        AdminCategoryCb(op=AdminCategoryOp.RENAME, cat=7),
+    ]:
+        packed = cb.pack()
+        assert len(packed.encode("utf-8")) <= 64
+        assert type(cb).unpack(packed) == cb
+
+
+@pytest.mark.parametrize("factory, raw", [
+    (ServiceCb, "sv:abc"),        # не число
+    (ServiceCb, "sv:-1"),         # отрицательный номер
+    (ServiceCb, "sv:1:2"),        # лишнее поле
+    (ServiceCb, "svc:audit_1"),   # старый формат
+    (LeadCb, "ld:x:1"),           # неизвестный вид заявки
+    (CourseCb, "cn:b"),           # навигация курсов не путается с карточкой
+    (CoursesNavCb, "cn:__back__"),
+])
+def test_invalid_payload_rejected(factory, raw):
+    with pytest.raises((TypeError, ValueError)):
+        factory.unpack(raw)
+
+
+def test_lead_source_resolves_number_to_id(monkeypatch):
+    services = build_services_index([{"id": "audit_a", "group": "audit", "name": "А"}])
+    courses = build_courses_index([{"id": "dpo_a", "name": "Курс"}, {"id": "dpo_b", "name": "Курс Б"}])
+
+    async def fake_services():
+        return services
+
+    async def fake_courses():
+        return courses
+
+    monkeypatch.setattr(forms, "services_index", fake_services)
+    monkeypatch.setattr(forms, "courses_index", fake_courses)
+
+    service_n = services.numbers["audit_a"]
+    course_n = courses.numbers["dpo_b"]
+    assert asyncio.run(forms._lead_source(LeadCb(kind=LeadKind.SERVICE, n=service_n))) == "lead:service:audit_a"
+    assert asyncio.run(forms._lead_source(LeadCb(kind=LeadKind.COURSE, n=course_n))) == "lead:course:dpo_b"
+    # номер из старой клавиатуры, которого уже нет в каталоге
+    assert asyncio.run(forms._lead_source(LeadCb(kind=LeadKind.COURSE, n=9))) == "lead:course:?"
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from pathlib import Path
+
+from utils.catalog import build_courses_index, build_services_index, build_symptoms_index
+from utils.content_cache import ContentCache
+from utils.symptoms_data import SymptomsDoc
+
+
+def test_services_index_groups_are_presorted():
+    services = [
+        {"id": "audit_b", "group": "audit", "name": "Б-аудит"},
+        {"id": "audit_a", "group": "audit", "name": "А-аудит"},
+        {"id": "support_x", "group": "specialized_service", "name": "А-сопровождение"},
+        {"id": "support_complex", "group": "specialized_service", "name": "Комплексное"},
+        {"id": "", "group": "audit", "name": "Без id"},
+    ]
+    index = build_services_index(services)
+
+    assert [(index.id_at(n), name) for n, name in index.groups["audit"]] == [
+        ("audit_a", "А-аудит"),
+        ("audit_b", "Б-аудит"),
+    ]
+    # комплексное сопровождение всегда первым
+    assert [index.id_at(n) for n, _ in index.groups["specialized_service"]] == ["support_complex", "support_x"]
+    assert index.by_id["audit_b"]["name"] == "Б-аудит"
+    assert set(index.ids.values()) == {"audit_b", "audit_a", "support_x", "support_complex"}
+    assert index.id_at(index.numbers["support_x"]) == "support_x"
+    assert index.id_at(4) is None
+
+
+def test_numbers_survive_insert_remove_and_reorder():
+    before = build_services_index([
+        {"id": "audit_a", "group": "audit", "name": "А"},
+        {"id": "audit_b", "group": "audit", "name": "Б"},
+        {"id": "audit_c", "group": "audit", "name": "В"},
+    ])
+    # живая перезагрузка: запись вставлена в начало, одна удалена, порядок другой
+    after = build_services_index([
+        {"id": "audit_new", "group": "audit", "name": "Новый"},
+        {"id": "audit_c", "group": "audit", "name": "В"},
+        {"id": "audit_a", "group": "audit", "name": "А"},
+    ])
+
+    # старые кнопки ведут к той же услуге или никуда — но не к чужой
+    for item_id, num in before.numbers.items():
+        assert after.id_at(num) in (item_id, None)
+    assert after.id_at(before.numbers["audit_b"]) is None
+    assert after.numbers["audit_c"] == before.numbers["audit_c"]
+
+    courses = build_courses_index([{"id": "dpo_a", "name": "А"}, {"id": "dpo_b", "name": "Б"}])
+    reordered = build_courses_index([{"id": "dpo_b", "name": "Б"}, {"id": "dpo_a", "name": "А"}])
+    assert courses.numbers == reordered.numbers
+
+
+def test_courses_index_skips_broken_entries():
+    courses = [
+        {"id": "dpo_a", "name": "Курс А"},
+        {"id": "dpo_b", "title": "Курс Б"},
+        {"id": "", "name": "Без id"},
+        {"id": "dpo_c"},
+    ]
+    index = build_courses_index(courses)
+
+    assert [c["id"] for c in index.listing] == ["dpo_a", "dpo_b"]
+    assert set(index.by_id) == {"dpo_a", "dpo_b", "dpo_c"}
+
+
+def test_symptoms_index_maps_category_ids():
+    data = {"Маститы": [{"title": "a"}], "Жвачка и ЖКТ": [], "Битая": "not a list"}
+    index = build_symptoms_index(SymptomsDoc.from_json(data))
+
+    assert index.categories == ("Битая", "Жвачка и ЖКТ", "Маститы")
+    # старый формат: id по алфавиту
+    assert index.by_id == {1: "Битая", 2: "Жвачка и ЖКТ", 3: "Маститы"}
+    assert index.ids["Маститы"] == 3
+    assert index.buttons[2] == (3, "Маститы")
+    assert index.items["Битая"] == ()
+
+
+def test_index_is_built_once_per_version(tmp_path: Path):
+    p = tmp_path / "services.json"
+    p.write_text(json.dumps({"services": [{"id": "a", "group": "audit", "name": "A"}]}), encoding="utf-8")
+    cache = ContentCache(p, lambda d: d["services"], check_interval=3600)
+    builds = []
+
+    def build(services, version):
+        builds.append(version)
+        return build_services_index(services, version)
+
+    async def scenario():
+        first = await cache.derived(build)
+        second = await cache.derived(build)
+        assert first is second
+
+        p.write_text(json.dumps({"services": []}), encoding="utf-8")
+        cache.invalidate()
+        third = await cache.derived(build)
+        assert third.by_id == {}
+
+    asyncio.run(scenario())
+    assert builds == [1, 2]
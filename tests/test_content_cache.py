@@ -0,0 +1,66 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from utils.content_cache import ContentCache
+
+
+def _counting_parse(calls: list):
+    def parse(data):
+        calls.append(1)
+        return data
+    return parse
+
+
+def test_snapshot_is_reused_until_file_changes(tmp_path: Path):
+    p = tmp_path / "services.json"
+    p.write_text(json.dumps({"v": 1}), encoding="utf-8")
+    calls: list = []
+    cache = ContentCache(p, _counting_parse(calls), check_interval=0)
+
+    assert cache.get_sync() == {"v": 1}
+    assert cache.get_sync() == {"v": 1}
+    assert len(calls) == 1
+    assert cache.version == 1
+
+    p.write_text(json.dumps({"v": 22}), encoding="utf-8")
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert cache.get_sync() == {"v": 22}
+    assert len(calls) == 2
+    assert cache.version == 2
+
+
+def test_check_interval_skips_stat(tmp_path: Path):
+    p = tmp_path / "services.json"
+    p.write_text(json.dumps({"v": 1}), encoding="utf-8")
+    cache = ContentCache(p, lambda d: d, check_interval=3600)
+
+    cache.get_sync()
+    p.write_text(json.dumps({"v": 222}), encoding="utf-8")
+
+    # в пределах интервала отдаём старый снимок
+    assert cache.get_sync() == {"v": 1}
+
+
+def test_invalidate_forces_reload(tmp_path: Path):
+    p = tmp_path / "symptoms.json"
+    p.write_text(json.dumps({"A": []}), encoding="utf-8")
+    cache = ContentCache(p, lambda d: d, check_interval=3600)
+
+    cache.get_sync()
+    p.write_text(json.dumps({"A": [], "B": []}), encoding="utf-8")
+    cache.invalidate()
+
+    assert asyncio.run(cache.get()) == {"A": [], "B": []}
+
+
+def test_missing_file_is_parsed_once(tmp_path: Path):
+    calls: list = []
+    cache = ContentCache(tmp_path / "missing.json", _counting_parse(calls), check_interval=0)
+
+    assert cache.get_sync() == {}
+    assert cache.get_sync() == {}
+    assert len(calls) == 1
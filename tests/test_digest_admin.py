@@ -0,0 +1,175 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.filters import Command
+from aiogram.methods import SendMessage
+from aiogram.types import Chat, Message
+
+import handlers.digest_admin as da
+import utils.broadcast_jobs as bj
+from config import Settings
+from utils.subscribers import get_subscribers
+from utils.update_isolation import UserEventIsolation
+
+ADMIN = 1
+
+
+class FakeBot(Bot):
+    """
+    Вместо похода в Telegram — запись вызовов; отправка подписчикам «медленная»,
+    чтобы рассылка шла, пока админ жмёт /digest_pause.
+    """
+
+    def __init__(self):
+        super().__init__("42:TEST")
+        self.calls = []
+        self.release = asyncio.Event()
+        # сколько отправок подписчикам пропустить без ожидания release
+        self.free_sends = 0
+
+    async def __call__(self, method, request_timeout=None):
+        self.calls.append(method)
+        if not isinstance(method, SendMessage):
+            return True
+        if method.chat_id != ADMIN:
+            if self.free_sends:
+                self.free_sends -= 1
+            else:
+                await self.release.wait()
+        return Message(
+            message_id=len(self.calls),
+            date=1760000000,
+            chat=Chat(id=method.chat_id, type="private"),
+            text=method.text,
+        )
+
+
+def _answers(bot):
+    return [m.text for m in bot.calls if isinstance(m, SendMessage) and m.chat_id == ADMIN]
+
+
+def test_pause_is_not_blocked_by_running_broadcast(monkeypatch, tmp_path, message_update):
+    monkeypatch.setattr(bj, "JOBS_DIR", tmp_path / "jobs")
+    monkeypatch.setattr(da, "USERS_PATH", tmp_path / "users.json")
+    monkeypatch.setattr(da, "build_digest_text", lambda: ("Дайджест", [{"text": "x"}]))
+    monkeypatch.setattr(da, "clear_store", lambda *args: None)
+    store = get_subscribers(da.USERS_PATH)
+    for uid in (10, 11, 12):
+        store.add(uid)
+
+    router = Router()
+    router.message(Command("digest_broadcast"))(da.digest_broadcast)
+    router.message(Command("digest_pause"))(da.digest_pause)
+    router.message(Command("digest_cancel"))(da.digest_cancel)
+
+    # настоящая изоляция: апдейты одного чата идут строго по очереди
+    dp = Dispatcher(events_isolation=UserEventIsolation(4))
+    dp.include_router(router)
+    settings = Settings(bot_token="42:TEST", admin_ids=frozenset({ADMIN}), digest_channel_id=0)
+
+    async def scenario():
+        bot = FakeBot()
+        await asyncio.wait_for(dp.feed_update(bot, message_update("/digest_broadcast", 1, user_id=ADMIN), settings=settings), 1)
+        while bj.active_job() is None:
+            await asyncio.sleep(0.01)
+        job, engine = bj.active_job()
+
+        await asyncio.wait_for(dp.feed_update(bot, message_update("/digest_pause", 2, user_id=ADMIN), settings=settings), 1)
+        assert engine.paused
+        assert bj.load_job(job.job_id).status == bj.STATUS_PAUSED
+
+        await asyncio.wait_for(dp.feed_update(bot, message_update("/digest_cancel", 3, user_id=ADMIN), settings=settings), 1)
+        bot.release.set()
+        await asyncio.gather(*da._broadcast_tasks)
+        await bot.session.close()
+        return bot, job
+
+    bot, job = asyncio.run(scenario())
+
+    answers = _answers(bot)
+    assert any("на паузе" in text for text in answers)
+    assert any("отменена" in text for text in answers)
+    assert bj.load_job(job.job_id).status == bj.STATUS_CANCELLED
+
+
+def test_concurrent_broadcast_commands_send_once(monkeypatch, tmp_path, message_update):
+    monkeypatch.setattr(bj, "JOBS_DIR", tmp_path / "jobs")
+    monkeypatch.setattr(da, "USERS_PATH", tmp_path / "users.json")
+    monkeypatch.setattr(da, "build_digest_text", lambda: ("Дайджест", [{"text": "x"}]))
+    monkeypatch.setattr(da, "clear_store", lambda *args: None)
+    store = get_subscribers(da.USERS_PATH)
+    for uid in (10, 11):
+        store.add(uid)
+
+    router = Router()
+    router.message(Command("digest_broadcast"))(da.digest_broadcast)
+    # без изоляции: два апдейта обрабатываются одновременно
+    dp = Dispatcher()
+    dp.include_router(router)
+    settings = Settings(bot_token="42:TEST", admin_ids=frozenset({ADMIN}), digest_channel_id=0)
+
+    async def scenario():
+        bot = FakeBot()
+        bot.release.set()
+        await asyncio.gather(
+            dp.feed_update(bot, message_update("/digest_broadcast", 1, user_id=ADMIN), settings=settings),
+            dp.feed_update(bot, message_update("/digest_broadcast", 2, user_id=ADMIN), settings=settings),
+        )
+        await asyncio.gather(*da._broadcast_tasks)
+        await bot.session.close()
+        return bot
+
+    bot = asyncio.run(scenario())
+
+    delivered = sorted(m.chat_id for m in bot.calls if isinstance(m, SendMessage) and m.chat_id != ADMIN)
+    assert delivered == [10, 11]
+    assert sum("уже идёт" in text for text in _answers(bot)) == 1
+    assert not bj.is_running(bj.digest_job_id("Дайджест"))
+
+
+def test_cancel_then_new_post_continues_the_same_job(monkeypatch, tmp_path, message_update):
+    import utils.digest_store as ds
+
+    monkeypatch.setattr(bj, "JOBS_DIR", tmp_path / "jobs")
+    monkeypatch.setattr(da, "USERS_PATH", tmp_path / "users.json")
+    monkeypatch.setattr(ds, "STORE_DIR", tmp_path / "digest")
+    monkeypatch.setattr(ds, "STORE_PATH", tmp_path / "weekly_digest_items.json")
+    store = ds.get_store()
+    store.add({"message_id": 1, "title": "Пост 1", "link": "https://t.me/c/1"})
+    store.add({"message_id": 2, "title": "Пост 2", "link": "https://t.me/c/2"})
+    subscribers = get_subscribers(da.USERS_PATH)
+    for uid in (10, 11, 12):
+        subscribers.add(uid)
+
+    router = Router()
+    router.message(Command("digest_broadcast"))(da.digest_broadcast)
+    router.message(Command("digest_cancel"))(da.digest_cancel)
+    dp = Dispatcher()
+    dp.include_router(router)
+    settings = Settings(bot_token="42:TEST", admin_ids=frozenset({ADMIN}), digest_channel_id=0)
+
+    async def scenario():
+        bot = FakeBot()
+        bot.free_sends = 1
+        await dp.feed_update(bot, message_update("/digest_broadcast", 1, user_id=ADMIN), settings=settings)
+        while bj.active_job() is None or not bj.active_job()[0].delivered():
+            await asyncio.sleep(0.01)
+        await dp.feed_update(bot, message_update("/digest_cancel", 2, user_id=ADMIN), settings=settings)
+        bot.release.set()
+        await asyncio.gather(*da._broadcast_tasks)
+
+        # после отмены в канале вышел новый пост
+        store.add({"message_id": 3, "title": "Пост 3", "link": "https://t.me/c/3"})
+        await dp.feed_update(bot, message_update("/digest_broadcast", 3, user_id=ADMIN), settings=settings)
+        await asyncio.gather(*da._broadcast_tasks)
+        await bot.session.close()
+        return bot
+
+    bot = asyncio.run(scenario())
+
+    sent = [m for m in bot.calls if isinstance(m, SendMessage) and m.chat_id != ADMIN]
+    # каждому подписчику — ровно один раз и тот же текст, что при первом запуске
+    assert sorted(m.chat_id for m in sent) == [10, 11, 12]
+    assert all("Пост 3" not in m.text for m in sent)
+    # разосланные пункты убраны, новый ждёт следующего дайджеста
+    assert [it["message_id"] for it in store.items()] == [3]
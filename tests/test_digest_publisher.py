@@ -10,11 +10,13 @@ MSK = timezone(timedelta(hours=3))
 def test_build_digest_empty(monkeypatch, tmp_path):
     # импорт внутри теста, чтобы monkeypatch сработал
     import utils.digest_publisher as dp
+    import utils.digest_store as ds
 
     store = tmp_path / "weekly_digest_items.json"
     store.write_text("[]", encoding="utf-8")
 
-    monkeypatch.setattr(dp, "STORE_PATH", store)
+    monkeypatch.setattr(ds, "STORE_PATH", store)
+    monkeypatch.setattr(ds, "STORE_DIR", tmp_path / "digest")
 
     text, items = dp.build_digest_text()
     assert "Дайджест недели" in text
@@ -24,6 +26,7 @@ def test_build_digest_empty(monkeypatch, tmp_path):
 
 def test_build_digest_with_items(monkeypatch, tmp_path):
     import utils.digest_publisher as dp
+    import utils.digest_store as ds
 
     store = tmp_path / "weekly_digest_items.json"
     now = datetime.now(MSK)
@@ -44,7 +47,8 @@ def test_build_digest_with_items(monkeypatch, tmp_path):
     ]
     store.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
 
-    monkeypatch.setattr(dp, "STORE_PATH", store)
+    monkeypatch.setattr(ds, "STORE_PATH", store)
+    monkeypatch.setattr(ds, "STORE_DIR", tmp_path / "digest")
 
     text, items = dp.build_digest_text()
     assert "1) Новость 1" in text
@@ -54,6 +58,7 @@ def test_build_digest_with_items(monkeypatch, tmp_path):
 
 def test_build_digest_filters_old(monkeypatch, tmp_path):
     import utils.digest_publisher as dp
+    import utils.digest_store as ds
 
     store = tmp_path / "weekly_digest_items.json"
     now = datetime.now(MSK)
@@ -67,7 +72,8 @@ def test_build_digest_filters_old(monkeypatch, tmp_path):
         }
     ]
     store.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
-    monkeypatch.setattr(dp, "STORE_PATH", store)
+    monkeypatch.setattr(ds, "STORE_PATH", store)
+    monkeypatch.setattr(ds, "STORE_DIR", tmp_path / "digest")
 
     text, items = dp.build_digest_text()
     assert items == []
@@ -76,10 +82,101 @@ def test_build_digest_filters_old(monkeypatch, tmp_path):
 
 def test_clear_store(monkeypatch, tmp_path):
     import utils.digest_publisher as dp
+    import utils.digest_store as ds
 
     store = tmp_path / "weekly_digest_items.json"
-    store.write_text('[{"x":1}]', encoding="utf-8")
-    monkeypatch.setattr(dp, "STORE_PATH", store)
+    now = datetime.now(MSK)
+    store.write_text(
+        json.dumps([{"ts": now.isoformat(), "message_id": 1, "title": "x"}]),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(ds, "STORE_PATH", store)
+    monkeypatch.setattr(ds, "STORE_DIR", tmp_path / "digest")
 
     dp.clear_store()
-    assert store.read_text(encoding="utf-8").strip() == "[]"
+    _, items = dp.build_digest_text()
+    assert items == []
+    assert list((tmp_path / "digest").glob("*.json")) == []
+
+
+def test_store_dedups_by_message_id(tmp_path):
+    import utils.digest_store as ds
+
+    store = ds.DigestStore(tmp_path / "digest")
+    assert store.add({"message_id": 10, "title": "A"}) is True
+    assert store.add({"message_id": 10, "title": "A again"}) is False
+    assert 10 in store
+
+    saved = [x for p in (tmp_path / "digest").glob("*.json") for x in json.loads(p.read_text(encoding="utf-8"))]
+    assert [x["title"] for x in saved] == ["A"]
+    assert isinstance(saved[0]["ts"], int)
+
+
+def test_store_write_behind_inside_event_loop(tmp_path):
+    import asyncio
+
+    import utils.digest_store as ds
+
+    root = tmp_path / "digest"
+    store = ds.DigestStore(root, flush_delay=0.01)
+
+    async def scenario():
+        store.add({"message_id": 1, "title": "A"})
+        store.add({"message_id": 2, "title": "B"})
+        # внутри loop запись отложена
+        assert not root.exists()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert len(ds.DigestStore(root).items()) == 2
+
+
+def test_store_partitions_by_day_and_bisects_window(tmp_path):
+    import utils.digest_store as ds
+
+    now = datetime.now(MSK)
+    store = ds.DigestStore(tmp_path / "digest")
+    for days, mid in [(1, 3), (9, 1), (3, 2)]:
+        store.add({"ts": int((now - timedelta(days=days)).timestamp()), "message_id": mid})
+
+    assert len(list((tmp_path / "digest").glob("*.json"))) == 3
+    # по возрастанию времени, независимо от порядка добавления
+    assert [x["message_id"] for x in store.items()] == [1, 2, 3]
+
+    since = int((now - timedelta(days=7)).timestamp())
+    assert [x["message_id"] for x in store.since(since)] == [2, 3]
+    assert store.count_since(since) == 2
+
+
+def test_store_archives_old_partitions(tmp_path):
+    import utils.digest_store as ds
+
+    now = datetime.now(MSK)
+    root = tmp_path / "digest"
+    store = ds.DigestStore(root, retention_days=14)
+    old_ts = int((now - timedelta(days=30)).timestamp())
+
+    store.add({"ts": old_ts, "message_id": 1, "title": "old"})
+    store.add({"message_id": 2, "title": "fresh"})
+
+    assert [x["message_id"] for x in store.items()] == [2]
+    assert len(list(root.glob("*.json"))) == 1
+
+    archived = [json.loads(line) for p in (root / "archive").glob("*.jsonl") for line in p.read_text(encoding="utf-8").splitlines()]
+    assert [x["message_id"] for x in archived] == [1]
+
+
+def test_legacy_file_migrates_once(tmp_path):
+    import utils.digest_store as ds
+
+    now = datetime.now(MSK)
+    legacy = tmp_path / "weekly_digest_items.json"
+    legacy.write_text(
+        json.dumps([{"ts": (now - timedelta(days=1)).isoformat(), "message_id": 5, "title": "A"}]),
+        encoding="utf-8",
+    )
+
+    store = ds.DigestStore(tmp_path / "digest", legacy_path=legacy)
+    assert 5 in store
+    assert not legacy.exists()
+    assert ds.DigestStore(tmp_path / "digest", legacy_path=legacy).items()[0]["message_id"] == 5
@@ -0,0 +1,49 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+import handlers.forms as forms
+import utils.notify as notify
+from config import Settings
+from utils.jsonl_journal import JsonlJournal
+from utils.lead_journal import LeadJournal
+
+
+def test_lead_is_on_disk_before_user_is_acknowledged(monkeypatch, tmp_path, make_bot):
+    monkeypatch.setattr(forms, "LEADS_PATH", tmp_path / "leads.jsonl")
+    monkeypatch.setattr(forms, "LEGACY_LEADS_PATH", tmp_path / "leads.json")
+    monkeypatch.setattr(notify, "OUTBOX_PATH", tmp_path / "outbox.jsonl")
+
+    bot = make_bot()
+    seen_on_ack = {}
+
+    async def answer(text, **kwargs):
+        # «падение» сразу после ответа: читаем то, что уже лежит в файлах
+        seen_on_ack["leads"] = LeadJournal(forms.LEADS_PATH).read_all()
+        seen_on_ack["outbox"] = JsonlJournal(notify.OUTBOX_PATH).read_all()
+
+    message = SimpleNamespace(
+        text="+7 900 000-00-00",
+        bot=bot,
+        from_user=SimpleNamespace(id=5, first_name="Иван", last_name=None, username="ivan"),
+        answer=answer,
+    )
+    settings = Settings(bot_token="42:TEST", admin_ids=frozenset({1, 2}), digest_channel_id=0)
+
+    async def scenario():
+        state = FSMContext(MemoryStorage(), StorageKey(bot_id=1, chat_id=5, user_id=5))
+        await state.set_state(forms.LeadForm.contact_text)
+        await state.update_data(lead_source="lead:service:audit_a")
+        await forms.lead_get_contact_text(message, state, settings)
+        await notify.get_dispatcher(bot).wait_idle()
+        await notify.close_outbox()
+
+    asyncio.run(scenario())
+
+    assert [e["contact_text"] for e in seen_on_ack["leads"]] == ["+7 900 000-00-00"]
+    # доставка могла уже начаться, но записи put есть для каждого админа
+    assert sorted(e["chat_id"] for e in seen_on_ack["outbox"] if e["op"] == "put") == [1, 2]
+    assert sorted(bot.sent_to) == [1, 2]
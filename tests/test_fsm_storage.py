@@ -0,0 +1,153 @@
+import asyncio
+import sqlite3
+import time
+
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+
+from utils.fsm_storage import SQLiteStorage
+
+
+class Form(StatesGroup):
+    contact = State()
+
+
+KEY = StorageKey(bot_id=1, chat_id=10, user_id=10)
+OTHER = StorageKey(bot_id=1, chat_id=20, user_id=20)
+
+
+def test_state_and_data_survive_restart(tmp_path):
+    path = tmp_path / "fsm.sqlite3"
+
+    async def first():
+        storage = SQLiteStorage(path)
+        await storage.set_state(KEY, Form.contact)
+        await storage.update_data(KEY, {"lead_source": "lead:service:x"})
+        await storage.close()
+
+    async def second():
+        storage = SQLiteStorage(path)
+        try:
+            return await storage.get_state(KEY), await storage.get_data(KEY), await storage.get_state(OTHER)
+        finally:
+            await storage.close()
+
+    asyncio.run(first())
+    state, data, other = asyncio.run(second())
+
+    assert state == "Form:contact"
+    assert data == {"lead_source": "lead:service:x"}
+    assert other is None
+
+
+def test_hot_reads_come_from_cache_and_writes_are_batched(tmp_path):
+    storage = SQLiteStorage(tmp_path / "fsm.sqlite3", flush_delay=0.05)
+    reads, batches = [], []
+    read_row, write_batch = storage._read_row, storage._write_batch
+    storage._read_row = lambda key: reads.append(key) or read_row(key)
+    storage._write_batch = lambda items: batches.append(len(items)) or write_batch(items)
+
+    async def scenario():
+        for uid in range(10):
+            key = StorageKey(bot_id=1, chat_id=uid, user_id=uid)
+            await storage.set_state(key, Form.contact)
+            await storage.set_data(key, {"n": uid})
+            await storage.get_state(key)
+        await asyncio.sleep(0.1)
+        await storage.close()
+
+    asyncio.run(scenario())
+
+    # каждый ключ читался с диска один раз (первое обращение), дальше — кэш
+    assert len(reads) == 10
+    # 20 изменений ушли на диск одной транзакцией
+    assert batches == [10]
+
+
+def test_clearing_state_deletes_row(tmp_path):
+    path = tmp_path / "fsm.sqlite3"
+
+    async def scenario():
+        storage = SQLiteStorage(path)
+        await storage.set_state(KEY, Form.contact)
+        await storage.flush()
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+        await storage.close()
+
+    asyncio.run(scenario())
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM fsm").fetchone()[0] == 0
+
+
+def test_two_processes_share_state(tmp_path):
+    path = tmp_path / "fsm.sqlite3"
+
+    async def scenario():
+        worker_a = SQLiteStorage(path)
+        worker_b = SQLiteStorage(path)
+
+        await worker_a.set_state(KEY, Form.contact)
+        await worker_a.flush()
+        assert await worker_b.get_state(KEY) == "Form:contact"
+
+        # b закэшировал сессию; a её меняет — b должен увидеть новое значение
+        await worker_a.set_state(KEY, None)
+        await worker_a.flush()
+        assert await worker_b.get_state(KEY) is None
+
+        await worker_a.close()
+        await worker_b.close()
+
+    asyncio.run(scenario())
+
+
+class Admin(StatesGroup):
+    title = State()
+
+
+def test_expired_session_reads_as_empty(tmp_path):
+    clock = {"now": 1_000_000.0}
+    storage = SQLiteStorage(tmp_path / "fsm.sqlite3", state_ttls={Form: 60}, time_func=lambda: clock["now"])
+
+    async def scenario():
+        await storage.set_state(KEY, Form.contact)
+        await storage.update_data(KEY, {"lead_source": "x"})
+        fresh = await storage.get_state(KEY)
+        # сессию бросили: прошёл час
+        clock["now"] += 3600
+
+        result = await storage.get_state(KEY), await storage.get_data(KEY)
+        await storage.close()
+        return fresh, result
+
+    fresh, result = asyncio.run(scenario())
+    assert fresh == Form.contact.state
+    assert result == (None, {})
+    assert storage.expired_total == 1
+
+
+def test_sweeper_removes_by_state_ttl_and_reports_metrics(tmp_path):
+    storage = SQLiteStorage(tmp_path / "fsm.sqlite3", state_ttls={Form.contact: 60, "Admin": 600})
+    lead_keys = [StorageKey(bot_id=1, chat_id=i, user_id=i) for i in range(3)]
+    admin_key = StorageKey(bot_id=1, chat_id=99, user_id=99)
+
+    async def scenario():
+        for key in lead_keys:
+            await storage.set_state(key, Form.contact)
+        await storage.set_state(admin_key, Admin.title)
+        await storage.set_data(StorageKey(bot_id=1, chat_id=7, user_id=7), {"note": 1})
+        await storage.flush()
+
+        before = await storage.sessions_by_state()
+        # через 5 минут: формы заявок (TTL 60 с) истекли, админская (600 с) — нет
+        removed = await storage.sweep(now=time.time() + 300)
+        after = await storage.sessions_by_state()
+        await storage.close()
+        return before, removed, after
+
+    before, removed, after = asyncio.run(scenario())
+
+    assert before == {"Form:contact": 3, "Admin:title": 1, "—": 1}
+    assert removed == 3
+    assert after == {"Admin:title": 1, "—": 1}
+    assert storage.expired_total == 3
@@ -1,15 +1,21 @@
 import pytest
 
+from keyboards.callbacks import (
+    AdminCategoryCb,
+    AdminEditField,
+    AdminFieldCb,
+    ServiceCb,
+    SymptomCategoryCb,
+    SymptomItemCb,
+)
 from keyboards.services_menu import build_services_root_kb, build_services_list_kb
 from keyboards.courses_menu import build_courses_list_kb, build_courses_root_kb
 from keyboards.symptoms_menu import (
     build_symptoms_categories_kb,
     build_symptom_nav_kb,
-    cat_key as sym_cat_key,
 )
 
 from keyboards.admin_symptoms_menu import (
-    cat_key as adm_cat_key,
     build_admin_categories_kb,
     build_admin_del_categories_kb,
     build_admin_edit_categories_kb,
@@ -40,15 +46,15 @@ def test_services_root_kb():
 
 def test_services_list_kb_callbacks():
     items = [
-        ("audit_1", "Очень длинное название услуги, которое должно обрезаться красиво и не ломать кнопку"),
-        ("audit_2", "Коротко"),
+        (0, "Очень длинное название услуги, которое должно обрезаться красиво и не ломать кнопку"),
+        (1, "Коротко"),
     ]
     kb = build_services_list_kb(items)
     _assert_callback_ok(kb)
 
     callbacks = [b.callback_data for b in _iter_inline_buttons(kb) if b.callback_data]
-    assert "svc:audit_1" in callbacks
-    assert "svc:audit_2" in callbacks
+    assert ServiceCb(n=0).pack() in callbacks
+    assert ServiceCb(n=1).pack() in callbacks
 
 
 def test_courses_root_kb():
@@ -62,7 +68,7 @@ def test_courses_list_kb_includes_dates_in_text():
         {"id": "dpo_agronomy", "name": "Курс по агрономии", "next_dates": "11–13 февраля 2026"},
         {"id": "dpo_econ", "name": "Экономика поля и фермы", "next_dates": ""},
     ]
-    kb = build_courses_list_kb(courses)
+    kb = build_courses_list_kb(courses, {"dpo_agronomy": 0, "dpo_econ": 1})
     _assert_callback_ok(kb)
 
     texts = [b.text for b in _iter_inline_buttons(kb)]
@@ -70,20 +76,18 @@ def test_courses_list_kb_includes_dates_in_text():
     assert any(t.startswith("Курс по агрономии") for t in texts)
 
 
-def test_symptoms_categories_kb_callback_keys_short_ascii():
-    categories = ["Жвачка и ЖКТ", "Маститы", "Отёлы"]
+def test_symptoms_categories_kb_uses_category_ids():
+    categories = [(3, "Жвачка и ЖКТ"), (1, "Маститы"), (12, "Отёлы")]
     kb = build_symptoms_categories_kb(categories)
     _assert_callback_ok(kb)
 
-    # ключи всегда 8 hex символов
-    for c in categories:
-        k = sym_cat_key(c)
-        assert len(k) == 8
-        assert all(ch in "0123456789abcdef" for ch in k)
+    callbacks = [b.callback_data for b in _iter_inline_buttons(kb) if b.callback_data]
+    for cat_id, _ in categories:
+        assert SymptomCategoryCb(cat=cat_id).pack() in callbacks
 
 
 def test_symptoms_nav_kb_buttons_by_index():
-    cat = "Жвачка и ЖКТ"
+    cat = 4
     total = 5
 
     kb_first = build_symptom_nav_kb(cat, index=0, total=total)
@@ -104,12 +108,15 @@ def test_symptoms_nav_kb_buttons_by_index():
     _assert_callback_ok(kb_first)
     _assert_callback_ok(kb_mid)
     _assert_callback_ok(kb_last)
+    callbacks = [b.callback_data for b in _iter_inline_buttons(kb_mid) if b.callback_data]
+    assert SymptomItemCb(cat=cat, i=1).pack() in callbacks
+    assert SymptomItemCb(cat=cat, i=3).pack() in callbacks
 
 
-def test_admin_symptoms_menus_callback_keys_short_ascii():
+def test_admin_symptoms_menus_use_category_ids():
     categories = [
-        "Жвачка и ЖКТ",
-        "Очень-очень длинная категория симптомов, чтобы проверить обрезку и ключи",
+        (1, "Жвачка и ЖКТ"),
+        (2, "Очень-очень длинная категория симптомов, чтобы проверить обрезку и ключи"),
     ]
 
     kb_add = build_admin_categories_kb(categories)
@@ -120,16 +127,47 @@ def test_admin_symptoms_menus_callback_keys_short_ascii():
     _assert_callback_ok(kb_del)
     _assert_callback_ok(kb_edit)
 
-    # admin cat_key 10 hex символов
-    for c in categories:
-        k = adm_cat_key(c)
-        assert len(k) == 10
-        assert all(ch in "0123456789abcdef" for ch in k)
+    # у пользователя и в админке — один и тот же id категории
+    for kb in (kb_add, kb_del, kb_edit):
+        ids = [AdminCategoryCb.unpack(b.callback_data).cat
+               for b in _iter_inline_buttons(kb) if b.callback_data.startswith("ac:")]
+        assert ids == [1, 2]
 
 
 def test_admin_edit_field_kb_callbacks():
     kb = build_admin_edit_field_kb()
     _assert_callback_ok(kb)
     callbacks = [b.callback_data for b in _iter_inline_buttons(kb) if b.callback_data]
-    assert "adm_symentry:title" in callbacks
-    assert "adm_symentry:text" in callbacks
+    assert AdminFieldCb(field=AdminEditField.TITLE).pack() in callbacks
+    assert AdminFieldCb(field=AdminEditField.TEXT).pack() in callbacks
+
+
+def test_keyboard_builders_are_memoized():
+    from keyboards.main_menu import get_main_menu
+    from utils.keyboard_cache import keyboard_cache
+
+    before = keyboard_cache.stats()
+    first = build_symptom_nav_kb(1, 1, 3, version=7)
+    second = build_symptom_nav_kb(1, 1, 3, version=7)
+    assert first is second
+    assert get_main_menu() is get_main_menu()
+
+    after = keyboard_cache.stats()
+    assert after["hits"] - before["hits"] >= 2
+
+    # другая версия контента — другая клавиатура
+    assert build_symptom_nav_kb(1, 1, 3, version=8) is not first
+
+
+def test_keyboard_cache_is_lru_bounded():
+    from utils.keyboard_cache import KeyboardCache
+
+    cache = KeyboardCache(maxsize=2)
+    cache.get_or_build("a", lambda: "A")
+    cache.get_or_build("b", lambda: "B")
+    cache.get_or_build("a", lambda: "A2")  # освежаем "a"
+    cache.get_or_build("c", lambda: "C")   # вытесняет "b"
+
+    assert cache.get_or_build("a", lambda: "new") == "A"
+    assert cache.get_or_build("b", lambda: "B2") == "B2"
+    assert cache.stats() == {"hits": 2, "misses": 4, "size": 2}
@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+
+import utils.lead_journal as lj
+
+
+def test_append_and_read_roundtrip(tmp_path: Path):
+    journal = lj.LeadJournal(tmp_path / "leads.jsonl")
+
+    journal.append({"user_id": 1, "contact_text": "@one"})
+    journal.append({"user_id": 2, "contact_text": "+7 900 000-00-00"})
+
+    assert journal.read_all() == [
+        {"user_id": 1, "contact_text": "@one"},
+        {"user_id": 2, "contact_text": "+7 900 000-00-00"},
+    ]
+    # одна строка на заявку
+    lines = (tmp_path / "leads.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+
+
+def test_fsync_is_batched(monkeypatch, tmp_path: Path):
+    calls = []
+    monkeypatch.setattr(lj.os, "fsync", lambda fd: calls.append(fd))
+
+    journal = lj.LeadJournal(tmp_path / "leads.jsonl", fsync_every=3)
+    for i in range(7):
+        journal.append({"i": i})
+
+    assert len(calls) == 2
+
+    journal.close()
+    assert len(calls) == 3
+
+
+def test_migrates_legacy_array_once(tmp_path: Path):
+    legacy = tmp_path / "leads.json"
+    legacy.write_text(json.dumps([{"user_id": 1}, {"user_id": 2}]), encoding="utf-8")
+
+    journal = lj.LeadJournal(tmp_path / "leads.jsonl", legacy_path=legacy)
+    journal.append({"user_id": 3})
+
+    assert [x["user_id"] for x in journal.read_all()] == [1, 2, 3]
+    assert not legacy.exists()
+    assert (tmp_path / "leads.json.migrated").exists()
+
+
+def test_torn_last_line_is_skipped(tmp_path: Path):
+    path = tmp_path / "leads.jsonl"
+    path.write_text('{"user_id": 1}\n{"user_id": 2, "con', encoding="utf-8")
+
+    journal = lj.LeadJournal(path)
+    assert journal.read_all() == [{"user_id": 1}]
+
+
+def test_clear(tmp_path: Path):
+    journal = lj.LeadJournal(tmp_path / "leads.jsonl")
+    journal.append({"user_id": 1})
+    journal.clear()
+
+    assert journal.read_all() == []
+    journal.append({"user_id": 2})
+    assert journal.read_all() == [{"user_id": 2}]
+
+
+def test_append_after_torn_line_starts_new_line(tmp_path: Path):
+    path = tmp_path / "leads.jsonl"
+    path.write_text('{"user_id": 1}\n{"user_id": 2, "con', encoding="utf-8")
+
+    journal = lj.LeadJournal(path)
+    journal.append({"user_id": 3})
+    assert journal.read_all() == [{"user_id": 1}, {"user_id": 3}]
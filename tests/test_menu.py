@@ -0,0 +1,119 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.filters import StateFilter
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.types import Message
+
+import handlers.menu as menu
+from handlers.forms import LeadForm
+from keyboards.main_menu import MENU_COURSES, MENU_HOME, MENU_LEAD, get_main_menu
+
+
+def test_table_covers_every_main_menu_button():
+    buttons = [b.text for row in get_main_menu().keyboard for b in row]
+    assert all(menu.menu_action_for(text) for text in buttons)
+    assert menu.menu_action_for("⬅️ В меню") == MENU_HOME
+    assert menu.menu_action_for("  КУРСЫ   и обучение ") == MENU_COURSES
+    assert menu.menu_action_for("📩 Оставить заявку") == MENU_LEAD
+    # только точное совпадение, а не подстрока
+    assert menu.menu_action_for("хочу на обучение по курсу") is None
+
+
+def test_every_menu_action_has_a_handler():
+    import bot  # noqa: F401 — регистрирует хендлеры разделов
+
+    assert set(menu.MENU_TABLE.values()) <= set(menu._handlers)
+
+
+def test_menu_buttons_are_not_lead_contact(monkeypatch, message_update):
+    import handlers.forms as forms
+
+    calls = []
+    answers = []
+    saved = []
+
+    async def fake_courses(message):
+        calls.append(message.text)
+
+    async def fake_answer(self, text, **kwargs):
+        answers.append(text)
+
+    async def fake_save_lead(*args):
+        saved.append(args)
+
+    monkeypatch.setitem(menu._handlers, MENU_COURSES, CallableObject(fake_courses))
+    monkeypatch.setattr(Message, "answer", fake_answer)
+    monkeypatch.setattr(forms, "_save_lead", fake_save_lead)
+
+    # те же фильтры и хендлеры, что у menu.router и forms.router (сами роутеры уже могут быть подключены)
+    router = Router()
+    router.message(StateFilter(None), menu.MenuButton())(menu.dispatch_menu)
+    router.message(LeadForm.contact_text, menu.MenuButton())(forms.lead_reject_menu_button)
+    router.message(LeadForm.contact_text)(forms.lead_get_contact_text)
+    dp = Dispatcher()
+    dp.include_router(router)
+    bot = Bot("42:TEST")
+    key = StorageKey(bot_id=bot.id, chat_id=5, user_id=5)
+
+    async def scenario():
+        await dp.feed_update(bot, message_update("Курсы и обучение", 1))
+        # пользователь заполняет заявку: кнопка раздела — не контакт и не переход в раздел
+        await dp.storage.set_state(key, LeadForm.contact_text)
+        await dp.feed_update(bot, message_update("Курсы и обучение", 2))
+        assert await dp.storage.get_state(key) == LeadForm.contact_text.state
+        await bot.session.close()
+
+    asyncio.run(scenario())
+
+    assert calls == ["Курсы и обучение"]
+    assert saved == []
+    assert len(answers) == 1 and "кнопка меню" in answers[0]
+
+
+def test_menu_buttons_are_not_admin_input(monkeypatch, message_update):
+    import handlers.admin_symptoms as admin_symptoms
+
+    home = []
+    answers = []
+
+    async def fake_home(message):
+        home.append(message.text)
+
+    async def fake_answer(self, text, **kwargs):
+        answers.append(text)
+
+    monkeypatch.setitem(menu._handlers, MENU_HOME, CallableObject(fake_home))
+    monkeypatch.setattr(Message, "answer", fake_answer)
+
+    # те же фильтры и хендлеры, что в menu.router и admin_symptoms.router
+    menu_router = Router()
+    menu_router.message(~StateFilter(None), menu.MenuButton(MENU_HOME))(menu.leave_to_menu)
+    admin = Router()
+    admin.message(
+        StateFilter(admin_symptoms.AddSymptom, admin_symptoms.RenameCategory), menu.MenuButton()
+    )(admin_symptoms.reject_menu_button)
+    admin.message(admin_symptoms.AddSymptom.category)(admin_symptoms.add_symptom_category_text)
+
+    dp = Dispatcher()
+    dp.include_router(menu_router)
+    dp.include_router(admin)
+    bot = Bot("42:TEST")
+    key = StorageKey(bot_id=bot.id, chat_id=5, user_id=5)
+
+    async def scenario():
+        await dp.storage.set_state(key, admin_symptoms.AddSymptom.category)
+        await dp.feed_update(bot, message_update("Симптомы и решения", 1))
+        # кнопка раздела не стала названием категории
+        assert await dp.storage.get_state(key) == admin_symptoms.AddSymptom.category.state
+        assert await dp.storage.get_data(key) == {}
+
+        await dp.feed_update(bot, message_update("⬅️ В меню", 2))
+        assert await dp.storage.get_state(key) is None
+        await bot.session.close()
+
+    asyncio.run(scenario())
+
+    assert home == ["⬅️ В меню"]
+    assert len(answers) == 1 and "/cancel" in answers[0]
@@ -0,0 +1,104 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageText
+
+import handlers.courses as courses
+import handlers.services as services
+from keyboards.callbacks import CourseCb, LeadCb, LeadKind, ServiceCb, ServiceGroup, ServiceGroupCb
+from utils.catalog import build_courses_index, build_services_index
+from utils.navigation import safe_edit_or_send
+
+
+class FakeMessage:
+    def __init__(self, edit_error=None):
+        self.calls = []
+        self.edit_error = edit_error
+
+    async def edit_text(self, text, reply_markup=None):
+        self.calls.append(("edit", text, reply_markup))
+        if self.edit_error:
+            raise TelegramBadRequest(EditMessageText(text=text), self.edit_error)
+
+    async def answer(self, text, reply_markup=None):
+        self.calls.append(("send", text, reply_markup))
+
+
+def _callback(message):
+    async def answer(*args, **kwargs):
+        pass
+
+    return SimpleNamespace(message=message, answer=answer)
+
+
+def _callbacks(markup):
+    return [b.callback_data for row in markup.inline_keyboard for b in row]
+
+
+def test_edit_in_place():
+    msg = FakeMessage()
+    asyncio.run(safe_edit_or_send(_callback(msg), "текст"))
+    assert [c[0] for c in msg.calls] == ["edit"]
+
+
+def test_not_modified_sends_nothing():
+    msg = FakeMessage("Bad Request: message is not modified")
+    asyncio.run(safe_edit_or_send(_callback(msg), "текст"))
+    assert [c[0] for c in msg.calls] == ["edit"]
+
+
+def test_falls_back_to_send_when_edit_impossible():
+    msg = FakeMessage("Bad Request: message can't be edited")
+    asyncio.run(safe_edit_or_send(_callback(msg), "текст"))
+    assert [c[0] for c in msg.calls] == ["edit", "send"]
+
+
+def test_service_card_is_one_edit_with_lead_button(monkeypatch):
+    index = build_services_index([
+        {"id": "audit_a", "group": "audit", "name": "Аудит А"},
+        {"id": "support_complex", "group": "specialized_service", "name": "Комплексное"},
+    ])
+
+    async def fake_index():
+        return index
+
+    monkeypatch.setattr(services, "services_index", fake_index)
+    msg = FakeMessage()
+
+    num = index.numbers["audit_a"]
+    asyncio.run(services.show_service(_callback(msg), ServiceCb(n=num)))
+
+    assert len(msg.calls) == 1
+    kind, text, markup = msg.calls[0]
+    assert kind == "edit"
+    assert "Аудит А" in text
+    cbs = _callbacks(markup)
+    assert LeadCb(kind=LeadKind.SERVICE, n=num).pack() in cbs
+    # «Назад» ведёт к списку той же группы
+    assert ServiceGroupCb(group=ServiceGroup.AUDIT).pack() in cbs
+
+
+def test_group_list_and_course_card_edit_in_place(monkeypatch):
+    s_index = build_services_index([{"id": "audit_a", "group": "audit", "name": "Аудит А"}])
+    c_index = build_courses_index([{"id": "dpo_a", "name": "Курс А"}])
+
+    async def fake_services():
+        return s_index
+
+    async def fake_courses():
+        return c_index
+
+    monkeypatch.setattr(services, "services_index", fake_services)
+    monkeypatch.setattr(courses, "courses_index", fake_courses)
+    msg = FakeMessage()
+
+    async def scenario():
+        await services.open_audits(_callback(msg))
+        await courses.show_course(_callback(msg), CourseCb(n=c_index.numbers["dpo_a"]))
+        await courses.courses_back(_callback(msg))
+
+    asyncio.run(scenario())
+
+    assert [c[0] for c in msg.calls] == ["edit", "edit", "edit"]
+    assert LeadCb(kind=LeadKind.COURSE, n=c_index.numbers["dpo_a"]).pack() in _callbacks(msg.calls[1][2])
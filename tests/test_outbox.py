@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.methods import SendMessage
+
+import utils.notify as notify
+from utils.outbox import Outbox, OutboxDispatcher, backoff_delay
+
+_METHOD = SendMessage(chat_id=1, text="x")
+
+
+_DOWN = ConnectionError("telegram is down")
+_CHAT_NOT_FOUND = TelegramBadRequest(method=_METHOD, message="Bad Request: chat not found")
+
+
+def test_entries_are_recorded_before_send_and_replayed(tmp_path, make_bot):
+    path = tmp_path / "outbox.jsonl"
+    outbox = Outbox(path)
+    outbox.put(1, "lead A")
+    outbox.put(2, "lead B")
+    outbox.close()
+
+    # «рестарт»: новый экземпляр видит недоставленное
+    bot = make_bot()
+    reopened = Outbox(path)
+    assert [e["text"] for e in reopened.pending()] == ["lead A", "lead B"]
+
+    async def scenario():
+        dispatcher = OutboxDispatcher(bot, reopened)
+        assert await dispatcher.replay() == 2
+        await dispatcher.wait_idle()
+
+    asyncio.run(scenario())
+    assert sorted(bot.sent) == [(1, "lead A"), (2, "lead B")]
+    assert Outbox(path).pending() == []
+
+
+def test_retries_with_backoff_then_delivers(tmp_path, make_bot):
+    bot = make_bot(errors={1: [_DOWN, _DOWN]})
+    outbox = Outbox(tmp_path / "outbox.jsonl")
+
+    async def scenario():
+        dispatcher = OutboxDispatcher(bot, outbox, base_delay=0.01)
+        await dispatcher.enqueue(1, "hello")
+        await dispatcher.wait_idle()
+
+    asyncio.run(scenario())
+    assert bot.sent == [(1, "hello")]
+    assert outbox.pending() == []
+
+
+def test_gives_up_and_drops_permanent_failures(tmp_path, make_bot):
+    bot = make_bot(errors={1: [_DOWN] * 100, -1: [_CHAT_NOT_FOUND]})
+    outbox = Outbox(tmp_path / "outbox.jsonl")
+
+    async def scenario():
+        dispatcher = OutboxDispatcher(bot, outbox, base_delay=0.001, max_attempts=3)
+        await dispatcher.enqueue(1, "retry me")
+        await dispatcher.enqueue(-1, "bad chat")
+        await dispatcher.wait_idle()
+
+    asyncio.run(scenario())
+    assert bot.sent == []
+    assert outbox.pending() == []
+
+
+def test_forbidden_is_dropped_without_retries(tmp_path, make_bot):
+    blocked = TelegramForbiddenError(method=_METHOD, message="Forbidden: bot was blocked by the user")
+    # ошибка одна: повторная попытка прошла бы и попала в bot.sent
+    bot = make_bot(errors={1: [blocked]})
+
+    path = tmp_path / "outbox.jsonl"
+    outbox = Outbox(path)
+
+    async def scenario():
+        # с обычным backoff'ом тест ждал бы секунды
+        dispatcher = OutboxDispatcher(bot, outbox, base_delay=10, max_attempts=10)
+        await dispatcher.enqueue(1, "lead")
+        await asyncio.wait_for(dispatcher.wait_idle(), 1)
+
+    asyncio.run(scenario())
+    assert bot.sent == []
+    assert Outbox(path).pending() == []
+
+
+def test_compaction_keeps_only_pending(tmp_path):
+    path = tmp_path / "outbox.jsonl"
+    outbox = Outbox(path, compact_every=2)
+    a = outbox.put(1, "a")
+    b = outbox.put(2, "b")
+    outbox.put(3, "c")
+    outbox.mark_done(a["id"])
+    outbox.mark_dropped(b["id"], "nope")
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    assert [e["chat_id"] for e in Outbox(path).pending()] == [3]
+
+
+def test_backoff_grows_and_is_capped():
+    assert 1.0 <= backoff_delay(1) < 1.2
+    assert 8.0 <= backoff_delay(4) < 8.9
+    assert backoff_delay(50, cap=30) < 34
+
+
+def test_notify_admins_is_concurrent_and_durable(monkeypatch, tmp_path, make_bot):
+    monkeypatch.setattr(notify, "OUTBOX_PATH", tmp_path / "outbox.jsonl")
+    bot = make_bot(delays={1: 0.2, 2: 0.2, 3: 0.2})
+
+    async def scenario():
+        started = time.monotonic()
+        ids = await notify.notify_admins(bot, [1, 2, 3], "lead")
+        # запись на диск есть ещё до отправки
+        assert len(Outbox(notify.OUTBOX_PATH).pending()) == 3
+        await notify.get_dispatcher(bot).wait_idle()
+        await notify.close_outbox()
+        return ids, time.monotonic() - started
+
+    ids, elapsed = asyncio.run(scenario())
+
+    assert len(ids) == 3
+    assert sorted(bot.sent_to) == [1, 2, 3]
+    # параллельно, а не сумма задержек
+    assert elapsed < 0.5
+    assert Outbox(notify.OUTBOX_PATH).pending() == []
+
+
+def test_notify_admins_is_one_fsync_for_any_number_of_admins(monkeypatch, tmp_path, make_bot):
+    monkeypatch.setattr(notify, "OUTBOX_PATH", tmp_path / "outbox.jsonl")
+    syncs = []
+    monkeypatch.setattr("utils.jsonl_journal.os.fsync", lambda fd: syncs.append(fd))
+    bot = make_bot()
+
+    async def scenario():
+        dispatcher = notify.get_dispatcher(bot)
+        ids = await notify.notify_admins(bot, range(1, 11), "lead")
+        synced_before_delivery = len(syncs)
+        await dispatcher.wait_idle()
+        await notify.close_outbox()
+        return ids, synced_before_delivery
+
+    ids, synced = asyncio.run(scenario())
+
+    assert len(ids) == 10
+    # ответ пользователю ждёт один fsync, а не по одному на админа
+    assert synced == 1
@@ -0,0 +1,96 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.filters import Command
+from aiogram.types import CallbackQuery
+
+from config import _parse_admin_ids
+from handlers.stale import stale_callback
+from keyboards.callbacks import ADMIN_CALLBACK_PREFIXES
+from utils.permissions import AdminGate
+
+ADMIN = 1
+USER = 2
+
+
+def _setup():
+    calls = []
+    gate = AdminGate(_parse_admin_ids(str(ADMIN)), callback_prefixes={"aa"})
+
+    admin = Router()
+
+    @admin.message(Command("cancel"))
+    async def admin_cancel(message):
+        calls.append(("admin", message.from_user.id))
+
+    @admin.callback_query(F.data == "aa:x")
+    async def admin_cb(callback):
+        calls.append(("admin_cb", callback.from_user.id))
+
+    # общий фильтр вешается на родительский роутер — один раз на всю админку
+    area = gate.attach(Router())
+    area.include_router(admin)
+
+    tail = Router()
+
+    @tail.message()
+    async def fallback(message):
+        calls.append(("tail", message.from_user.id))
+
+    # тот же хендлер, что у handlers.stale.router (сам роутер подключается в bot.py)
+    tail.callback_query()(stale_callback)
+
+    dp = Dispatcher()
+    dp.include_router(area)
+    dp.include_router(tail)
+    return dp, gate, calls
+
+
+def test_admin_prefixes_come_from_admin_factories():
+    assert ADMIN_CALLBACK_PREFIXES == {"aa", "ac", "af"}
+
+
+def test_parse_admin_ids_returns_frozenset():
+    assert _parse_admin_ids(" 1, 2,,3 ") == frozenset({1, 2, 3})
+    assert _parse_admin_ids("") == frozenset()
+
+
+def test_gate_passes_admin_and_rejects_others(message_update):
+    dp, gate, calls = _setup()
+    bot = Bot("42:TEST")
+
+    async def scenario():
+        await dp.feed_update(bot, message_update("/cancel", 1, user_id=ADMIN))
+        await dp.feed_update(bot, message_update("/cancel", 2, user_id=USER))
+        await dp.feed_update(bot, message_update("привет", 3, user_id=USER))
+
+    asyncio.run(scenario())
+
+    # команда админа дошла до хендлера; апдейты пользователя прошли мимо админки дальше
+    assert calls == [("admin", ADMIN), ("tail", USER), ("tail", USER)]
+    # обычный текст — не попытка попасть в админку
+    assert gate.rejected == {"command": 1}
+    assert gate.rejected_total == 1
+
+
+def test_rejected_callback_is_answered_as_stale(monkeypatch, callback_update):
+    dp, gate, calls = _setup()
+    bot = Bot("42:TEST")
+    answered = []
+
+    async def fake_answer(self, *args, **kwargs):
+        answered.append(self.from_user.id)
+
+    monkeypatch.setattr(CallbackQuery, "answer", fake_answer)
+
+    async def scenario():
+        await dp.feed_update(bot, callback_update("aa:x", 1, user_id=USER))
+        await dp.feed_update(bot, callback_update("aa:x", 2, user_id=ADMIN))
+        # устаревшая пользовательская кнопка — тоже мимо админки, но не попытка
+        await dp.feed_update(bot, callback_update("svc:audit_a", 3, user_id=USER))
+
+    asyncio.run(scenario())
+
+    assert calls == [("admin_cb", ADMIN)]
+    assert answered == [USER, USER]
+    assert gate.rejected == {"callback": 1}
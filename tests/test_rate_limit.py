@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+
+from utils.rate_limit import (
+    PRIORITY_BROADCAST,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NOTIFY,
+    PriorityBucket,
+    RateLimitMiddleware,
+    current_priority,
+    request_priority,
+)
+
+
+def test_priority_context_is_scoped():
+    assert current_priority() == PRIORITY_INTERACTIVE
+    with request_priority(PRIORITY_BROADCAST):
+        assert current_priority() == PRIORITY_BROADCAST
+    assert current_priority() == PRIORITY_INTERACTIVE
+
+
+def test_bucket_serves_higher_priority_first():
+    bucket = PriorityBucket(rate=50, capacity=1)
+    order = []
+
+    async def take(name, priority):
+        await bucket.acquire(priority)
+        order.append(name)
+
+    async def scenario():
+        await bucket.acquire()  # выбираем запас
+        tasks = [asyncio.create_task(take(f"b{i}", PRIORITY_BROADCAST)) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(take("notify", PRIORITY_NOTIFY)))
+        tasks.append(asyncio.create_task(take("user", PRIORITY_INTERACTIVE)))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order[:2] == ["user", "notify"]
+    assert order[2:] == ["b0", "b1", "b2"]
+
+
+async def _make_request(bot, method):
+    return method
+
+
+def test_per_chat_limit_and_passthrough():
+    middleware = RateLimitMiddleware(rate=1000, per_chat_rate=10, per_chat_burst=1)
+
+    async def scenario():
+        started = time.monotonic()
+        for _ in range(4):
+            await middleware(_make_request, None, SendMessage(chat_id=1, text="x"))
+        per_chat = time.monotonic() - started
+
+        started = time.monotonic()
+        for _ in range(20):
+            await middleware(_make_request, None, AnswerCallbackQuery(callback_query_id="1"))
+        passthrough = time.monotonic() - started
+        return per_chat, passthrough
+
+    per_chat, passthrough = asyncio.run(scenario())
+    # 1 сразу + 3 по 0.1 с
+    assert per_chat >= 0.25
+    assert passthrough < 0.05
+
+
+def test_retry_after_pauses_global_bucket():
+    middleware = RateLimitMiddleware(rate=1000)
+    method = SendMessage(chat_id=1, text="x")
+
+    async def limited(bot, m):
+        raise TelegramRetryAfter(method=m, message="Too Many Requests", retry_after=1)
+
+    async def scenario():
+        try:
+            await middleware(limited, None, method)
+        except TelegramRetryAfter:
+            pass
+        started = time.monotonic()
+        await middleware(_make_request, None, SendMessage(chat_id=2, text="x"))
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.9
@@ -0,0 +1,32 @@
+from utils.render_cache import RenderCache
+
+
+def test_render_once_per_version_and_key():
+    cache = RenderCache()
+    calls = []
+
+    def render():
+        calls.append(1)
+        return "<b>card</b>"
+
+    assert cache.get("services", 1, "audit_a", render) == "<b>card</b>"
+    assert cache.get("services", 1, "audit_a", render) == "<b>card</b>"
+    assert len(calls) == 1
+
+
+def test_new_version_drops_previous_cards():
+    cache = RenderCache()
+    cache.get("services", 1, "a", lambda: "old a")
+    cache.get("services", 1, "b", lambda: "old b")
+
+    assert cache.get("services", 2, "a", lambda: "new a") == "new a"
+    assert cache.size("services") == 1
+
+
+def test_namespaces_are_independent():
+    cache = RenderCache()
+    cache.get("services", 1, "x", lambda: "service")
+    cache.get("courses", 5, "x", lambda: "course")
+
+    assert cache.get("services", 1, "x", lambda: "other") == "service"
+    assert cache.get("courses", 5, "x", lambda: "other") == "course"
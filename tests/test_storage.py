@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import utils.storage as storage
+
+
+def test_async_save_and_load_roundtrip(tmp_path: Path):
+    p = tmp_path / "data.json"
+    payload = {"a": 1, "b": ["x", "y"]}
+
+    async def scenario():
+        await storage.save_json(p, payload)
+        return await storage.load_json(p)
+
+    assert asyncio.run(scenario()) == payload
+    assert not p.with_suffix(".json.tmp").exists()
+
+
+def test_run_io_uses_worker_thread():
+    async def scenario():
+        return await storage.run_io(threading.get_ident)
+
+    assert asyncio.run(scenario()) != threading.get_ident()
+
+
+def test_writers_to_same_file_are_serialized(tmp_path: Path):
+    p = tmp_path / "data.json"
+    active = 0
+    peak = 0
+    guard = threading.Lock()
+
+    def slow_write() -> None:
+        nonlocal active, peak
+        with guard:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with guard:
+            active -= 1
+
+    async def scenario():
+        await asyncio.gather(*(storage.run_io(slow_write, path=p) for _ in range(4)))
+
+    asyncio.run(scenario())
+    assert peak == 1
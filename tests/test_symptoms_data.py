@@ -0,0 +1,76 @@
+import json
+
+from utils.catalog import build_symptoms_index
+from utils.symptoms_data import SymptomsDoc
+
+
+def test_legacy_format_gets_ids_by_name():
+    doc = SymptomsDoc.from_json({"Маститы": [{"title": "a"}], "Жвачка": [], "Битая": "not a list"})
+
+    assert doc.buttons() == ((1, "Битая"), (2, "Жвачка"), (3, "Маститы"))
+    assert doc.items["Битая"] == []
+    assert doc.next_id == 4
+    # одинаково в любом процессе до первого сохранения
+    assert SymptomsDoc.from_json({"Жвачка": [], "Маститы": [], "Битая": []}).buttons() == doc.buttons()
+
+
+def test_roundtrip_keeps_ids():
+    doc = SymptomsDoc.from_json({"Б": [], "А": [{"title": "x", "text": "y"}]})
+    raw = json.loads(json.dumps(doc.to_json(), ensure_ascii=False))
+
+    again = SymptomsDoc.from_json(raw)
+    assert again.buttons() == doc.buttons()
+    assert again.items["А"] == [{"title": "x", "text": "y"}]
+    assert again.next_id == doc.next_id
+
+
+def test_new_category_gets_next_id_regardless_of_name_order():
+    doc = SymptomsDoc.from_json({"Маститы": [], "Отёлы": []})
+    assert doc.add_category("Аборты") == 3
+    # повторное добавление — тот же id
+    assert doc.add_category("Аборты") == 3
+    assert doc.id_of("Маститы") == 1
+    assert doc.buttons()[0] == (3, "Аборты")
+
+
+def test_rename_keeps_id_and_items():
+    doc = SymptomsDoc.from_json({"Маститы": [{"title": "a"}], "Отёлы": []})
+    cat_id = doc.id_of("Маститы")
+
+    assert doc.rename_category(cat_id, "Маститы и вымя") == "Маститы"
+    assert doc.name_of(cat_id) == "Маститы и вымя"
+    assert doc.items["Маститы и вымя"] == [{"title": "a"}]
+    assert doc.id_of("Маститы") is None
+
+    index = build_symptoms_index(SymptomsDoc.from_json(doc.to_json()))
+    assert index.by_id[cat_id] == "Маститы и вымя"
+
+
+def test_rename_to_existing_name_is_rejected():
+    doc = SymptomsDoc.from_json({"А": [], "Б": []})
+    try:
+        doc.rename_category(doc.id_of("А"), "Б")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    assert doc.name_of(1) == "А"
+
+
+def test_ids_are_not_reused_and_broken_ids_are_reassigned():
+    raw = {
+        "next_id": 10,
+        "categories": [
+            {"id": 4, "name": "А", "items": []},
+            {"id": 4, "name": "Б", "items": []},       # повтор id
+            {"id": "x", "name": "В", "items": []},     # битый id
+            {"id": 15, "name": "Г", "items": []},      # больше next_id
+            {"id": 2, "name": "А", "items": []},       # повтор названия — пропускаем
+        ],
+    }
+    doc = SymptomsDoc.from_json(raw)
+
+    assert doc.id_of("А") == 4
+    assert doc.id_of("Г") == 15
+    assert {doc.id_of("Б"), doc.id_of("В")} == {16, 17}
+    assert doc.next_id == 18
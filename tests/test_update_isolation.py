@@ -0,0 +1,97 @@
+import asyncio
+
+from aiogram.fsm.storage.base import StorageKey
+
+from utils.update_isolation import UserEventIsolation
+
+
+def _key(user_id):
+    return StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+
+
+def test_same_user_is_sequential_and_global_limit_holds():
+    isolation = UserEventIsolation(limit=3)
+    log = []
+    peak = {"running": 0}
+
+    async def update(user_id, n):
+        async with isolation.lock(_key(user_id)):
+            peak["running"] = max(peak["running"], isolation.running)
+            log.append((user_id, n, "start"))
+            await asyncio.sleep(0.01)
+            log.append((user_id, n, "end"))
+
+    async def scenario():
+        tasks = [asyncio.create_task(update(uid, n)) for n in range(3) for uid in range(6)]
+        await asyncio.sleep(0.001)
+        snapshot = isolation.stats()
+        await asyncio.gather(*tasks)
+        return snapshot
+
+    snapshot = asyncio.run(scenario())
+
+    assert peak["running"] == 3
+    assert snapshot["running"] == 3
+    assert snapshot["queued"] == 15
+    # у каждого пользователя шаги не перекрываются и идут в порядке поступления
+    for uid in range(6):
+        own = [(n, phase) for u, n, phase in log if u == uid]
+        assert own == [(0, "start"), (0, "end"), (1, "start"), (1, "end"), (2, "start"), (2, "end")]
+
+    stats = isolation.stats()
+    assert (stats["queued"], stats["running"], stats["processed"]) == (0, 0, 18)
+    # lock'и отработавших пользователей не копятся
+    assert stats["users"] == 0
+
+
+def test_cancelled_waiter_is_not_counted():
+    isolation = UserEventIsolation(limit=1)
+
+    async def hold():
+        async with isolation.lock(_key(1)):
+            await asyncio.sleep(0.05)
+
+    async def wait():
+        async with isolation.lock(_key(2)):
+            pass
+
+    async def scenario():
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(wait())
+        await asyncio.sleep(0.01)
+        assert isolation.stats()["queued"] == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await holder
+
+    asyncio.run(scenario())
+    stats = isolation.stats()
+    assert (stats["queued"], stats["running"], stats["users"]) == (0, 0, 0)
+
+
+def test_polling_is_limited_by_update_concurrency(monkeypatch):
+    from aiogram import Dispatcher
+
+    import bot
+    from config import Settings
+
+    settings = Settings(bot_token="42:TEST", admin_ids=frozenset(), digest_channel_id=0, update_concurrency=7)
+    polled = {}
+
+    class FakeBot:
+        async def delete_webhook(self):
+            pass
+
+    async def fake_start_polling(self, *bots, **kwargs):
+        polled.update(kwargs)
+
+    monkeypatch.setattr(bot, "load_settings", lambda: settings)
+    monkeypatch.setattr(bot, "build_bot", lambda s: FakeBot())
+    monkeypatch.setattr(bot, "build_dispatcher", lambda s: Dispatcher())
+    monkeypatch.setattr(Dispatcher, "start_polling", fake_start_polling)
+
+    asyncio.run(bot.main())
+
+    # лимит задач у самого polling — он покрывает и апдейты без пользователя (channel_post)
+    assert polled["tasks_concurrency_limit"] == 7
@@ -4,6 +4,13 @@ from pathlib import Path
 import pytest
 
 import handlers.start as start_mod
+from utils.subscribers import SubscriberStore, get_subscribers
+
+
+def _snapshot(users_path: Path) -> dict:
+    # новые ID сначала попадают в users.log, в users.json — при компакции
+    get_subscribers(users_path).compact()
+    return json.loads(users_path.read_text(encoding="utf-8"))
 
 
 def test_add_user_creates_file(monkeypatch, tmp_path: Path):
@@ -12,8 +19,8 @@ def test_add_user_creates_file(monkeypatch, tmp_path: Path):
 
     start_mod.add_user(111)
 
+    data = _snapshot(users_path)
     assert users_path.exists()
-    data = json.loads(users_path.read_text(encoding="utf-8"))
     assert data["subscribers"] == [111]
 
 
@@ -25,7 +32,7 @@ def test_add_user_no_duplicates(monkeypatch, tmp_path: Path):
     start_mod.add_user(111)
     start_mod.add_user(111)
 
-    data = json.loads(users_path.read_text(encoding="utf-8"))
+    data = _snapshot(users_path)
     assert data["subscribers"] == [111]
 
 
@@ -37,5 +44,84 @@ def test_add_user_sorts(monkeypatch, tmp_path: Path):
     start_mod.add_user(100)
     start_mod.add_user(200)
 
-    data = json.loads(users_path.read_text(encoding="utf-8"))
+    data = _snapshot(users_path)
     assert data["subscribers"] == [100, 200, 300]
+
+
+def test_known_user_does_not_write(tmp_path: Path):
+    store = SubscriberStore(tmp_path / "users.json")
+
+    assert store.add(111) is True
+    size = store.log_path.stat().st_size
+
+    assert store.add(111) is False
+    assert store.log_path.stat().st_size == size
+    assert 111 in store
+
+
+def test_reload_merges_snapshot_and_log(tmp_path: Path):
+    users_path = tmp_path / "users.json"
+    users_path.write_text(json.dumps({"subscribers": [1, 2]}), encoding="utf-8")
+
+    store = SubscriberStore(users_path)
+    store.add(3)
+
+    reopened = SubscriberStore(users_path)
+    assert reopened.all() == [1, 2, 3]
+    assert len(reopened) == 3
+
+
+def test_log_is_compacted_in_batches(tmp_path: Path):
+    users_path = tmp_path / "users.json"
+    store = SubscriberStore(users_path, compact_every=3)
+
+    store.add(1)
+    store.add(2)
+    assert not users_path.exists()
+
+    store.add(3)
+    assert json.loads(users_path.read_text(encoding="utf-8"))["subscribers"] == [1, 2, 3]
+    assert not store.log_path.exists()
+
+
+def test_deactivate_excludes_from_active(tmp_path: Path):
+    users_path = tmp_path / "users.json"
+    store = SubscriberStore(users_path)
+    for uid in (1, 2, 3):
+        store.add(uid)
+
+    assert store.deactivate(2, now=1000) is True
+    assert store.deactivate(2, now=2000) is False
+    assert store.active() == [1, 3]
+    assert store.counts() == (2, 3)
+
+    reopened = SubscriberStore(users_path)
+    assert reopened.active() == [1, 3]
+    assert reopened.all() == [1, 2, 3]
+
+
+def test_start_reactivates_user(tmp_path: Path):
+    store = SubscriberStore(tmp_path / "users.json")
+    store.add(1)
+    store.deactivate(1, now=1000)
+
+    assert store.add(1) is True
+    assert store.active() == [1]
+
+
+def test_purge_inactive_after_retention(tmp_path: Path):
+    users_path = tmp_path / "users.json"
+    store = SubscriberStore(users_path)
+    for uid in (1, 2, 3):
+        store.add(uid)
+    store.deactivate(1, now=1000)
+    store.deactivate(2, now=5000)
+
+    assert store.purge_inactive(3000, now=6000) == 1
+    assert store.all() == [2, 3]
+
+    store.compact()
+    data = json.loads(users_path.read_text(encoding="utf-8"))
+    assert data["subscribers"] == [2, 3]
+    assert data["inactive"] == {"2": 5000}
+    assert SubscriberStore(users_path).active() == [3]
@@ -0,0 +1,144 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, Router, types
+from aiogram.filters import CommandStart
+from aiohttp.test_utils import TestClient, TestServer
+
+from config import Settings
+from utils.webhook import build_webhook_app
+
+SECRET = "s3cret_token"
+
+# апдейт в том виде, в каком его присылает Telegram
+RECORDED_UPDATE = {
+    "update_id": 100500,
+    "message": {
+        "message_id": 7,
+        "date": 1760000000,
+        "chat": {"id": 111, "type": "private", "first_name": "Анна"},
+        "from": {"id": 111, "is_bot": False, "first_name": "Анна"},
+        "text": "/start",
+        "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+    },
+}
+
+
+def _settings(**overrides) -> Settings:
+    return Settings(
+        bot_token="42:TEST",
+        admin_ids=frozenset(),
+        digest_channel_id=-1,
+        bot_mode="webhook",
+        webhook_url="https://bot.example.com",
+        webhook_path="/tg/webhook",
+        webhook_secret=SECRET,
+        **overrides,
+    )
+
+
+def _run(scenario):
+    seen = []
+    router = Router()
+
+    @router.message(CommandStart())
+    async def on_start(message: types.Message) -> None:
+        seen.append((message.from_user.id, message.text))
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    app = build_webhook_app(Bot("42:TEST"), dp, _settings(), handle_in_background=False)
+
+    async def main():
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+
+    return asyncio.run(main()), seen
+
+
+def test_recorded_update_reaches_handler():
+    async def scenario(client):
+        resp = await client.post(
+            "/tg/webhook",
+            json=RECORDED_UPDATE,
+            headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+        )
+        return resp.status
+
+    status, seen = _run(scenario)
+    assert status == 200
+    assert seen == [(111, "/start")]
+
+
+def test_wrong_secret_is_rejected():
+    async def scenario(client):
+        missing = await client.post("/tg/webhook", json=RECORDED_UPDATE)
+        wrong = await client.post(
+            "/tg/webhook",
+            json=RECORDED_UPDATE,
+            headers={"X-Telegram-Bot-Api-Secret-Token": "nope"},
+        )
+        return missing.status, wrong.status
+
+    statuses, seen = _run(scenario)
+    assert statuses == (401, 401)
+    assert seen == []
+
+
+def test_health_route():
+    async def scenario(client):
+        resp = await client.get("/healthz")
+        return resp.status, await resp.json()
+
+    (status, body), _ = _run(scenario)
+    assert status == 200
+    assert body == {"status": "ok"}
+
+
+def test_background_updates_are_bounded_by_update_concurrency():
+    running = 0
+    peak = 0
+    release = asyncio.Event()
+    router = Router()
+
+    # channel_post — без пользователя: UserEventIsolation его не ограничивает
+    @router.channel_post()
+    async def on_post(message: types.Message) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    app = build_webhook_app(Bot("42:TEST"), dp, _settings(update_concurrency=2))
+
+    def post(client, update_id):
+        update = {
+            "update_id": update_id,
+            "channel_post": {
+                "message_id": update_id,
+                "date": 1760000000,
+                "chat": {"id": -100, "type": "channel", "title": "News"},
+                "text": "post",
+            },
+        }
+        return client.post("/tg/webhook", json=update, headers={"X-Telegram-Bot-Api-Secret-Token": SECRET})
+
+    async def main():
+        async with TestClient(TestServer(app)) as client:
+            requests = [asyncio.ensure_future(post(client, i)) for i in range(1, 4)]
+            while running < 2:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+            # третий апдейт ждёт слота: ни задачи, ни ответа Telegram
+            assert running == 2
+            assert sum(r.done() for r in requests) == 2
+            release.set()
+            responses = await asyncio.gather(*requests)
+            while running:
+                await asyncio.sleep(0.01)
+            return [r.status for r in responses]
+
+    assert asyncio.run(main()) == [200, 200, 200]
+    assert peak == 2
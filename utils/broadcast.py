@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+
+from utils.rate_limit import PRIORITY_BROADCAST, request_priority
+
+logger = logging.getLogger(__name__)
+
+# глобальный лимит Telegram — около 30 сообщений в секунду на бота
+GLOBAL_RATE = 30.0
+# сколько отправок идёт параллельно
+WORKERS = 16
+# сколько раз повторяем отправку после RetryAfter
+MAX_RETRIES = 3
+
+STATUS_OK = "ok"
+STATUS_BLOCKED = "blocked"
+STATUS_FAILED = "failed"
+
+# «чат недоступен навсегда» приходит как BadRequest с таким текстом
+_GONE_MARKERS = ("chat not found", "user is deactivated", "peer_id_invalid")
+
+
+class TokenBucket:
+    """
+    Token bucket: rate токенов в секунду, запас не больше capacity.
+    pause() останавливает выдачу токенов всем (например, по RetryAfter).
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        # lock — чтобы ожидающие получали токены по очереди
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class BroadcastResult:
+    ok: int = 0
+    blocked: int = 0
+    failed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.ok + self.blocked + self.failed
+
+    def add(self, status: str) -> None:
+        if status == STATUS_OK:
+            self.ok += 1
+        elif status == STATUS_BLOCKED:
+            self.blocked += 1
+        else:
+            self.failed += 1
+
+
+def _is_gone(exc: TelegramBadRequest) -> bool:
+    text = (exc.message or "").lower()
+    return any(marker in text for marker in _GONE_MARKERS)
+
+
+class BroadcastEngine:
+    """
+    Рассылка одного текста списку пользователей.
+
+    Параллельно работают workers отправителей, общий темп ограничен token bucket.
+    TelegramRetryAfter ставит на паузу всех и повторяет отправку,
+    заблокировавшие бота считаются отдельно от прочих ошибок.
+
+    pause()/resume()/cancel() управляют уже идущей рассылкой:
+    workers проверяют состояние перед каждым следующим получателем.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        rate: float = GLOBAL_RATE,
+        workers: int = WORKERS,
+        max_retries: int = MAX_RETRIES,
+        bucket: TokenBucket | None = None,
+    ) -> None:
+        self.bot = bot
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        # capacity=1 — ровный темп без всплесков в начале рассылки
+        self.bucket = bucket or TokenBucket(rate, capacity=1)
+        # выставлен — можно слать; снят — пауза
+        self._gate = asyncio.Event()
+        self._gate.set()
+        self._cancelled = False
+
+    @property
+    def paused(self) -> bool:
+        return not self._gate.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def pause(self) -> None:
+        self._gate.clear()
+
+    def resume(self) -> None:
+        self._gate.set()
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        # отпускаем стоящих на паузе, чтобы они увидели отмену и вышли
+        self._gate.set()
+
+    async def send_one(self, chat_id: int, text: str, **kwargs: Any) -> str:
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            try:
+                # рассылка уступает ответам пользователям и уведомлениям админам
+                with request_priority(PRIORITY_BROADCAST):
+                    await self.bot.send_message(chat_id, text, **kwargs)
+                return STATUS_OK
+            except TelegramRetryAfter as e:
+                # лимит превышен — тормозим всю рассылку, не только этот worker
+                self.bucket.pause(e.retry_after)
+                attempt += 1
+                if attempt > self.max_retries:
+                    return STATUS_FAILED
+            except TelegramForbiddenError:
+                return STATUS_BLOCKED
+            except TelegramBadRequest as e:
+                return STATUS_BLOCKED if _is_gone(e) else STATUS_FAILED
+            except Exception:
+                logger.exception("broadcast: send to %s failed", chat_id)
+                return STATUS_FAILED
+
+    async def run(
+        self,
+        user_ids: Iterable[int],
+        text: str,
+        *,
+        on_result: Callable[[int, str], Awaitable[None]] | None = None,
+        **kwargs: Any,
+    ) -> BroadcastResult:
+        """
+        on_result(uid, status) вызывается после каждой отправки (например, для журнала доставки).
+        """
+        result = BroadcastResult()
+        pending = iter(user_ids)
+
+        async def worker() -> None:
+            # итератор общий: каждый worker берёт следующего получателя
+            for uid in pending:
+                await self._gate.wait()
+                if self._cancelled:
+                    return
+                status = await self.send_one(uid, text, **kwargs)
+                result.add(status)
+                if on_result is not None:
+                    await on_result(uid, status)
+
+        await asyncio.gather(*(worker() for _ in range(self.workers)))
+        return result
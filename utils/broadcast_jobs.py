@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable
+
+from utils.broadcast import STATUS_BLOCKED, STATUS_OK, BroadcastEngine, BroadcastResult
+from utils.json_loader import load_json, save_json
+from utils.jsonl_journal import JsonlJournal
+from utils.storage import run_io
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+JOBS_DIR = BASE_DIR / "data" / "broadcasts"
+
+# fsync журнала доставки — раз в N отправок
+CHECKPOINT_EVERY = 50
+# сколько храним файлы завершённой рассылки (защита от повторного запуска того же дайджеста)
+FINISHED_RETENTION = 7 * 86400
+
+# окончательные статусы: таким получателям больше не шлём; failed — пробуем снова
+FINAL_STATUSES = (STATUS_OK, STATUS_BLOCKED)
+
+STATUS_RUNNING = "running"
+STATUS_PAUSED = "paused"
+STATUS_CANCELLED = "cancelled"
+STATUS_DONE = "done"
+
+
+def digest_job_id(text: str, items: Iterable[dict[str, Any]] = ()) -> str:
+    """
+    Один и тот же набор пунктов — один и тот же job: повторный запуск не шлёт дубли.
+    Ключ — message_id пунктов, а не текст: период в заголовке меняется каждый день.
+    Дайджест без пунктов (только заголовок) идентифицируется текстом.
+    """
+    ids = sorted(str(it["message_id"]) for it in items if it.get("message_id") is not None)
+    key = ",".join(ids) if ids else text
+    return "digest-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class BroadcastJob:
+    """
+    Рассылка как задание: снимок получателей + журнал доставки (ledger).
+
+    Метаданные — <job_id>.json, журнал — <job_id>.ledger.jsonl
+    (строка {"id": uid, "s": status} на каждую попытку, последняя — актуальная).
+    После рестарта досылаем тем, у кого в журнале нет окончательного статуса.
+    """
+
+    job_id: str
+    text: str
+    recipients: list[int]
+    status: str = STATUS_RUNNING
+    created_ts: int = 0
+    finished_ts: int | None = None
+    # куда отправить отчёт, если рассылку доведёт до конца уже перезапущенный бот
+    report_chat_id: int | None = None
+    meta: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def path(self) -> Path:
+        return JOBS_DIR / f"{self.job_id}.json"
+
+    @property
+    def ledger(self) -> JsonlJournal:
+        return JsonlJournal(self.ledger_path, fsync_every=CHECKPOINT_EVERY)
+
+    @property
+    def ledger_path(self) -> Path:
+        return JOBS_DIR / f"{self.job_id}.ledger.jsonl"
+
+    def save(self) -> None:
+        save_json(self.path, asdict(self))
+
+    def statuses(self) -> dict[int, str]:
+        # по последней попытке: failed, доставленный при повторе, становится ok
+        return {int(x["id"]): x.get("s", "") for x in self.ledger.read_all() if "id" in x}
+
+    def delivered(self) -> dict[int, str]:
+        return {uid: s for uid, s in self.statuses().items() if s in FINAL_STATUSES}
+
+    def remaining(self) -> list[int]:
+        done = self.delivered()
+        return [uid for uid in self.recipients if uid not in done]
+
+    def result(self, *, final_only: bool = False) -> BroadcastResult:
+        result = BroadcastResult()
+        for status in (self.delivered() if final_only else self.statuses()).values():
+            result.add(status)
+        return result
+
+    def remove(self) -> None:
+        for p in (self.ledger_path, self.path):
+            p.unlink(missing_ok=True)
+
+
+def load_job(job_id: str) -> BroadcastJob | None:
+    data = load_json(JOBS_DIR / f"{job_id}.json")
+    if not isinstance(data, dict) or not data.get("job_id"):
+        return None
+    return BroadcastJob(**data)
+
+
+def load_or_create_job(
+    job_id: str,
+    text: str,
+    recipients: list[int],
+    *,
+    report_chat_id: int | None = None,
+    meta: dict[str, Any] | None = None,
+) -> tuple[BroadcastJob, bool]:
+    """
+    Возвращает (job, created). Существующий job не пересоздаётся —
+    получатели берутся из его снимка.
+    """
+    job = load_job(job_id)
+    if job is not None:
+        return job, False
+
+    job = BroadcastJob(
+        job_id=job_id,
+        text=text,
+        recipients=list(recipients),
+        created_ts=int(time.time()),
+        report_chat_id=report_chat_id,
+        meta=dict(meta or {}),
+    )
+    job.save()
+    return job, True
+
+
+def pending_jobs() -> list[BroadcastJob]:
+    if not JOBS_DIR.exists():
+        return []
+    jobs = []
+    for p in sorted(JOBS_DIR.glob("*.json")):
+        job = load_job(p.stem)
+        # отменённые не досылаем; на паузе — поднимаем, но не шлём до /digest_resume
+        if job is not None and job.status not in (STATUS_DONE, STATUS_CANCELLED):
+            jobs.append(job)
+    return jobs
+
+
+def unfinished_job() -> BroadcastJob | None:
+    """
+    Последняя недоведённая рассылка (идёт, на паузе или отменена): /digest_broadcast
+    досылает её, а не заводит новую с другим текстом для тех же получателей.
+    """
+    if not JOBS_DIR.exists():
+        return None
+    jobs = [load_job(p.stem) for p in JOBS_DIR.glob("*.json")]
+    unfinished = [job for job in jobs if job is not None and job.status != STATUS_DONE]
+    return max(unfinished, key=lambda job: job.created_ts, default=None)
+
+
+def prune_finished_jobs(max_age: int = FINISHED_RETENTION) -> int:
+    """
+    Удаляет файлы рассылок, завершённых больше max_age секунд назад. Возвращает число удалённых.
+    """
+    if not JOBS_DIR.exists():
+        return 0
+    cutoff = int(time.time()) - max_age
+    removed = 0
+    for p in JOBS_DIR.glob("*.json"):
+        job = load_job(p.stem)
+        if job is None or job.status != STATUS_DONE or (job.finished_ts or 0) > cutoff:
+            continue
+        job.remove()
+        removed += 1
+    return removed
+
+
+# job_id -> задача, которая сейчас шлёт (в этом процессе)
+_running: dict[str, asyncio.Task] = {}
+# job_id -> (job, engine) — для /digest_pause, /digest_resume, /digest_cancel
+_active: dict[str, tuple[BroadcastJob, BroadcastEngine]] = {}
+
+
+# job_id, занятые claim_job, пока run_job ещё не стартовал
+_claimed: set[str] = set()
+
+
+def is_running(job_id: str) -> bool:
+    if job_id in _claimed:
+        return True
+    task = _running.get(job_id)
+    return task is not None and not task.done()
+
+
+def claim_job(job_id: str) -> bool:
+    """
+    Проверка и захват job без await между ними: второй /digest_broadcast увидит
+    рассылку идущей, даже пока первый ещё готовит получателей.
+    Захват снимает release_job — тот, кто занял, после завершения рассылки.
+    """
+    if is_running(job_id):
+        return False
+    _claimed.add(job_id)
+    return True
+
+
+def release_job(job_id: str) -> None:
+    _claimed.discard(job_id)
+
+
+def active_job(job_id: str | None = None) -> tuple[BroadcastJob, BroadcastEngine] | None:
+    """
+    Идущая рассылка по id; без id — последняя запущенная.
+    """
+    if job_id is not None:
+        return _active.get(job_id)
+    if not _active:
+        return None
+    return next(reversed(_active.values()))
+
+
+async def _set_status(job: BroadcastJob, status: str) -> None:
+    job.status = status
+    await run_io(job.save, path=job.path)
+
+
+async def pause_job(job: BroadcastJob, engine: BroadcastEngine) -> None:
+    # статус сохраняем: после рестарта job поднимется, но останется на паузе
+    engine.pause()
+    await _set_status(job, STATUS_PAUSED)
+
+
+async def resume_job(job: BroadcastJob, engine: BroadcastEngine) -> None:
+    engine.resume()
+    await _set_status(job, STATUS_RUNNING)
+
+
+def cancel_job(engine: BroadcastEngine) -> None:
+    # статус CANCELLED выставит сам run_job, когда workers остановятся
+    engine.cancel()
+
+
+OnResult = Callable[[int, str], Awaitable[None]]
+
+
+async def _execute(job: BroadcastJob, engine: BroadcastEngine, on_result: OnResult | None) -> BroadcastResult:
+    ledger = job.ledger
+    remaining = await run_io(job.remaining, path=ledger.path)
+
+    async def record(uid: int, status: str) -> None:
+        await run_io(ledger.append, {"id": uid, "s": status}, path=ledger.path)
+        if on_result is not None:
+            await on_result(uid, status)
+
+    if job.status == STATUS_PAUSED:
+        engine.pause()
+    elif job.status != STATUS_RUNNING:
+        # явный повторный запуск отменённой рассылки
+        await _set_status(job, STATUS_RUNNING)
+
+    try:
+        await engine.run(remaining, job.text, on_result=record)
+    finally:
+        await run_io(ledger.close, path=ledger.path)
+
+    job.status = STATUS_CANCELLED if engine.cancelled else STATUS_DONE
+    job.finished_ts = int(time.time())
+    await run_io(job.save, path=job.path)
+    return await run_io(job.result, path=ledger.path)
+
+
+async def run_job(
+    job: BroadcastJob,
+    engine: BroadcastEngine,
+    *,
+    on_result: OnResult | None = None,
+) -> BroadcastResult:
+    """
+    Досылает job до конца (или до отмены). Итог считается по всему журналу
+    (включая прошлые запуски). on_result(uid, status) вызывается после записи в журнал.
+    """
+    task = asyncio.ensure_future(_execute(job, engine, on_result))
+    _running[job.job_id] = task
+    _active[job.job_id] = (job, engine)
+    try:
+        return await task
+    finally:
+        _running.pop(job.job_id, None)
+        _active.pop(job.job_id, None)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from utils.broadcast import STATUS_OK, BroadcastEngine, BroadcastResult
+from utils.rate_limit import PRIORITY_NOTIFY, request_priority
+
+logger = logging.getLogger(__name__)
+
+# как часто обновляем сообщение с прогрессом (edit_message_text)
+PROGRESS_INTERVAL = 2.0
+# окно, по которому считаем текущую скорость (в тиках)
+RATE_WINDOW = 5
+
+
+def _fmt_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "—"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600} ч {seconds % 3600 // 60} мин"
+    if seconds >= 60:
+        return f"{seconds // 60} мин {seconds % 60} с"
+    return f"{seconds} с"
+
+
+class BroadcastProgress:
+    """
+    Одно сообщение с прогрессом рассылки, обновляется не чаще раза в interval секунд.
+
+    record(uid, status) подключается как on_result рассылки — только считает,
+    в Telegram ходит отдельная фоновая задача (start/stop).
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        chat_id: int,
+        message_id: int,
+        *,
+        title: str,
+        total: int,
+        done: BroadcastResult | None = None,
+        engine: BroadcastEngine | None = None,
+        interval: float = PROGRESS_INTERVAL,
+    ) -> None:
+        self.bot = bot
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.title = title
+        self.total = total
+        self.engine = engine
+        self.interval = interval
+
+        # уже доставленные в прошлых запусках тоже учитываем
+        done = done or BroadcastResult()
+        self.sent = done.ok
+        self.failed = done.blocked + done.failed
+
+        self._samples: deque[tuple[float, int]] = deque(maxlen=RATE_WINDOW + 1)
+        self._last_text = ""
+        self._final_state: str | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.total - self.processed)
+
+    async def record(self, uid: int, status: str) -> None:
+        if status == STATUS_OK:
+            self.sent += 1
+        else:
+            self.failed += 1
+
+    def rate(self) -> float:
+        """
+        Текущая скорость (сообщений в секунду) по последним замерам.
+        """
+        if len(self._samples) < 2:
+            return 0.0
+        (t0, n0), (t1, n1) = self._samples[0], self._samples[-1]
+        if t1 <= t0:
+            return 0.0
+        return (n1 - n0) / (t1 - t0)
+
+    def render(self) -> str:
+        rate = self.rate()
+        eta = self.remaining / rate if rate > 0 else None
+        if self._final_state is not None:
+            state = self._final_state
+            eta = None
+        elif self.engine is not None and self.engine.cancelled:
+            state = "⏹ отменяется"
+        elif self.engine is not None and self.engine.paused:
+            state = "⏸ на паузе"
+            eta = None
+        else:
+            state = "🚀 идёт"
+        return (
+            f"{self.title}\n"
+            f"Статус: {state}\n"
+            f"Отправлено: {self.sent}\n"
+            f"Не доставлено: {self.failed}\n"
+            f"Осталось: {self.remaining} из {self.total}\n"
+            f"Скорость: {rate:.1f} сообщ./с\n"
+            f"Осталось времени: ~{_fmt_eta(eta)}"
+            + ("" if self._final_state else "\n\n/digest_pause · /digest_resume · /digest_cancel")
+        )
+
+    def _sample(self) -> None:
+        self._samples.append((time.monotonic(), self.processed))
+
+    async def refresh(self) -> None:
+        self._sample()
+        text = self.render()
+        if text == self._last_text:
+            return
+        try:
+            with request_priority(PRIORITY_NOTIFY):
+                await self.bot.edit_message_text(text, chat_id=self.chat_id, message_id=self.message_id)
+            self._last_text = text
+        except TelegramRetryAfter as e:
+            # прогресс не важнее самой рассылки — просто пропускаем тики
+            await asyncio.sleep(e.retry_after)
+        except TelegramBadRequest:
+            # "message is not modified" и т.п.
+            pass
+        except Exception:
+            logger.exception("broadcast progress: edit failed")
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.refresh()
+
+    def start(self) -> None:
+        self._sample()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self, final_state: str) -> None:
+        """
+        Останавливает обновления и в последний раз правит сообщение с итоговым статусом.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._final_state = final_state
+        await self.refresh()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from utils.content_cache import ContentCache
+from utils.symptoms_data import SymptomsDoc
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SERVICES_PATH = BASE_DIR / "data" / "services.json"
+COURSES_PATH = BASE_DIR / "data" / "courses.json"
+SYMPTOMS_PATH = BASE_DIR / "data" / "symptoms.json"
+
+
+def _parse_services(data: Any) -> list[dict]:
+    if isinstance(data, dict) and isinstance(data.get("services"), list):
+        return data["services"]
+    return []
+
+
+def _parse_courses(data: Any) -> list[dict]:
+    if isinstance(data, dict) and isinstance(data.get("courses"), list):
+        return data["courses"]
+    if isinstance(data, list):
+        return data
+    return []
+
+
+def _parse_symptoms(data: Any) -> SymptomsDoc:
+    return SymptomsDoc.from_json(data)
+
+
+services_cache: ContentCache[list[dict]] = ContentCache(SERVICES_PATH, _parse_services)
+courses_cache: ContentCache[list[dict]] = ContentCache(COURSES_PATH, _parse_courses)
+symptoms_cache: ContentCache[SymptomsDoc] = ContentCache(SYMPTOMS_PATH, _parse_symptoms)
+
+
+# =========================
+# Индексы: строятся один раз на версию контента
+# =========================
+def _str(d: dict, *keys: str) -> str:
+    for k in keys:
+        v = (d.get(k) or "").strip()
+        if v:
+            return v
+    return ""
+
+
+def _stable_numbers(ids: list[str]) -> dict[str, int]:
+    """
+    Номер для callback_data выводится из самого id (crc32), а не из позиции в файле:
+    вставка, удаление и перестановка записей не меняют номера остальных,
+    и кнопки, уже отправленные в чаты, ведут туда же. Совпадение crc32
+    (на десятках записей — практически невозможно) разводим следующим свободным номером.
+    """
+    numbers: dict[str, int] = {}
+    taken: set[int] = set()
+    for item_id in sorted(ids):
+        num = zlib.crc32(item_id.encode("utf-8"))
+        while num in taken:
+            num = (num + 1) & 0xFFFFFFFF
+        taken.add(num)
+        numbers[item_id] = num
+    return numbers
+
+
+def _support_sort_key(svc: dict) -> tuple:
+    # Комплексное сопровождение всегда первым
+    return (0 if (svc.get("id") == "support_complex") else 1, (svc.get("name") or ""))
+
+
+def _name_sort_key(svc: dict) -> str:
+    return svc.get("name") or ""
+
+
+# как сортировать списки услуг внутри группы (по умолчанию — по названию)
+GROUP_SORT_KEYS = {
+    "specialized_service": _support_sort_key,
+}
+
+
+@dataclass(frozen=True)
+class ServicesIndex:
+    version: int
+    by_id: dict[str, dict]
+    # group -> ((номер, name), ...) — уже отсортировано для списка кнопок
+    groups: dict[str, tuple[tuple[int, str], ...]]
+    # номер для callback_data <-> service_id (постоянный, см. _stable_numbers)
+    ids: dict[int, str] = field(default_factory=dict)
+    numbers: dict[str, int] = field(default_factory=dict)
+
+    def id_at(self, num: int) -> str | None:
+        return self.ids.get(num)
+
+
+@dataclass(frozen=True)
+class CoursesIndex:
+    version: int
+    by_id: dict[str, dict]
+    # курсы с id и названием, в порядке файла
+    listing: tuple[dict, ...]
+    # ((номер, name), ...) — для списка кнопок
+    buttons: tuple[tuple[int, str], ...]
+    # номер для callback_data <-> course_id (постоянный, см. _stable_numbers)
+    ids: dict[int, str] = field(default_factory=dict)
+    numbers: dict[str, int] = field(default_factory=dict)
+
+    def id_at(self, num: int) -> str | None:
+        return self.ids.get(num)
+
+
+@dataclass(frozen=True)
+class SymptomsIndex:
+    version: int
+    categories: tuple[str, ...]
+    items: dict[str, tuple[dict[str, str], ...]]
+    # постоянный id категории (callback_data) <-> название
+    by_id: dict[int, str]
+    ids: dict[str, int]
+    # ((id, name), ...) по алфавиту — для кнопок
+    buttons: tuple[tuple[int, str], ...]
+
+
+def build_services_index(services: list[dict], version: int = 0) -> ServicesIndex:
+    by_id: dict[str, dict] = {}
+    grouped: dict[str, list[dict]] = {}
+    for s in services:
+        sid = _str(s, "id")
+        if sid:
+            by_id.setdefault(sid, s)
+        grouped.setdefault(_str(s, "group"), []).append(s)
+
+    numbers = _stable_numbers(list(by_id))
+
+    groups: dict[str, tuple[tuple[int, str], ...]] = {}
+    for group, items in grouped.items():
+        items = sorted(items, key=GROUP_SORT_KEYS.get(group, _name_sort_key))
+        groups[group] = tuple(
+            (numbers[_str(s, "id")], _str(s, "name"))
+            for s in items
+            if _str(s, "id") and _str(s, "name")
+        )
+    return ServicesIndex(
+        version=version,
+        by_id=by_id,
+        groups=groups,
+        ids={num: sid for sid, num in numbers.items()},
+        numbers=numbers,
+    )
+
+
+def build_courses_index(courses: list[dict], version: int = 0) -> CoursesIndex:
+    by_id: dict[str, dict] = {}
+    listing: list[dict] = []
+    for c in courses:
+        cid = _str(c, "id")
+        if not cid:
+            continue
+        by_id.setdefault(cid, c)
+        if _str(c, "name", "title"):
+            listing.append(c)
+    numbers = _stable_numbers(list(by_id))
+    return CoursesIndex(
+        version=version,
+        by_id=by_id,
+        listing=tuple(listing),
+        buttons=tuple((numbers[_str(c, "id")], _str(c, "name", "title")) for c in listing),
+        ids={num: cid for cid, num in numbers.items()},
+        numbers=numbers,
+    )
+
+
+def build_symptoms_index(doc: SymptomsDoc, version: int = 0) -> SymptomsIndex:
+    buttons = doc.buttons()
+    return SymptomsIndex(
+        version=version,
+        categories=tuple(name for _, name in buttons),
+        items={name: tuple(doc.items[name]) for _, name in buttons},
+        by_id={cat_id: name for cat_id, name in buttons},
+        ids={name: cat_id for cat_id, name in buttons},
+        buttons=buttons,
+    )
+
+
+async def services_index() -> ServicesIndex:
+    return await services_cache.derived(build_services_index)
+
+
+async def courses_index() -> CoursesIndex:
+    return await courses_cache.derived(build_courses_index)
+
+
+async def symptoms_index() -> SymptomsIndex:
+    return await symptoms_cache.derived(build_symptoms_index)
+
+
+async def warm_catalogs() -> None:
+    await services_index()
+    await courses_index()
+    await symptoms_index()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Generic, TypeVar
+
+from utils.json_loader import load_json
+from utils.storage import run_io
+
+T = TypeVar("T")
+D = TypeVar("D")
+
+# как часто (сек) сверяем mtime/size файла; между проверками отдаём снимок как есть
+CHECK_INTERVAL = 1.0
+
+
+class ContentCache(Generic[T]):
+    """
+    Разобранный снимок JSON-файла контента (услуги, курсы, симптомы).
+
+    Читатели получают готовый объект из памяти. Файл перечитывается, только если
+    изменились mtime/size (проверка — один stat не чаще check_interval)
+    или после явного invalidate() — например, после правки из админки.
+    version растёт при каждой перезагрузке; derived() строит производные данные
+    (индексы и т.п.) один раз на версию.
+
+    Снимок общий: вызывающий код не должен его менять.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        parse: Callable[[Any], T],
+        *,
+        check_interval: float = CHECK_INTERVAL,
+    ) -> None:
+        self.path = Path(path)
+        self.parse = parse
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._loaded = False
+        # (version, snapshot) меняем одним присваиванием — читатели не видят их вразнобой
+        self._state: tuple[int, T | None] = (0, None)
+        self._signature: tuple[int, int] | None = None
+        self._checked_at = 0.0
+        self._derived: dict[Callable[[Any], Any], tuple[int, Any]] = {}
+
+    @property
+    def version(self) -> int:
+        return self._state[0]
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def is_stale(self) -> bool:
+        if not self._loaded:
+            return True
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return self._stat() != self._signature
+
+    def reload(self) -> T:
+        with self._lock:
+            signature = self._stat()
+            snapshot = self.parse(load_json(self.path))
+            self._state = (self._state[0] + 1, snapshot)
+            self._signature = signature
+            self._checked_at = time.monotonic()
+            self._loaded = True
+            return snapshot
+
+    def get_sync(self) -> T:
+        if self.is_stale():
+            return self.reload()
+        return self._state[1]  # type: ignore[return-value]
+
+    async def get(self) -> T:
+        # перечитываем (редко) в пуле потоков, event loop не парсит JSON
+        if self.is_stale():
+            return await run_io(self.reload, path=self.path)
+        return self._state[1]  # type: ignore[return-value]
+
+    async def derived(self, build: Callable[[T, int], D]) -> D:
+        """
+        Результат build(snapshot, version), посчитанный один раз на версию контента.
+        """
+        await self.get()
+        version, snapshot = self._state
+        entry = self._derived.get(build)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        value = build(snapshot, version)  # type: ignore[arg-type]
+        self._derived[build] = (version, value)
+        return value
+
+    def invalidate(self) -> None:
+        self._loaded = False
@@ -1,31 +1,21 @@
 from __future__ import annotations
 
-import json
-from pathlib import Path
 from datetime import datetime, timedelta, timezone
+from typing import Iterable
 
-MSK = timezone(timedelta(hours=3))
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-STORE_PATH = BASE_DIR / "data" / "weekly_digest_items.json"
-
-
-def _load_store() -> list[dict]:
-    if not STORE_PATH.exists():
-        return []
-    try:
-        return json.loads(STORE_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        return []
+from utils.digest_store import get_store
 
-
-def _save_store(items: list[dict]) -> None:
-    STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    STORE_PATH.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+MSK = timezone(timedelta(hours=3))
 
 
-def clear_store() -> None:
-    _save_store([])
+def clear_store(message_ids: Iterable[int] | None = None) -> None:
+    """
+    Убирает из store разосланные пункты; без списка — все.
+    """
+    if message_ids is None:
+        get_store().clear()
+    else:
+        get_store().remove(message_ids)
 
 
 def _week_range_str(now: datetime) -> str:
@@ -34,26 +24,26 @@ def _week_range_str(now: datetime) -> str:
     return f"{start.strftime('%d.%m')}–{end.strftime('%d.%m')}"
 
 
+def _week_since_ts(now: datetime) -> int:
+    return int((now - timedelta(days=7)).timestamp())
+
+
+def count_week_items() -> int:
+    """
+    Сколько пунктов накопилось за 7 дней (без сборки текста).
+    """
+    return get_store().count_since(_week_since_ts(datetime.now(MSK)))
+
+
 def build_digest_text(max_items: int = 20) -> tuple[str, list[dict]]:
     """
     Возвращает (text, items_used) для последних 7 дней.
     """
     now = datetime.now(MSK)
-    since = now - timedelta(days=7)
     period = _week_range_str(now)
 
-    store = _load_store()
-
-    week_items: list[dict] = []
-    for it in store:
-        ts = it.get("ts", "")
-        try:
-            dt = datetime.fromisoformat(ts)
-        except Exception:
-            dt = now
-
-        if dt >= since:
-            week_items.append(it)
+    # окно находим бинарным поиском по epoch-ts в store; свежие — первыми
+    week_items = get_store().since(_week_since_ts(now))[::-1]
 
     if not week_items:
         text = (
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+from utils.json_loader import save_json
+from utils.storage import run_io
+
+MSK = timezone(timedelta(hours=3))
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+# партиции по дням: data/digest/YYYY-MM-DD.json, архив по неделям: data/digest/archive/YYYY-Www.jsonl
+STORE_DIR = BASE_DIR / "data" / "digest"
+# старый плоский файл — переносится в партиции при первом обращении
+STORE_PATH = BASE_DIR / "data" / "weekly_digest_items.json"
+
+# через сколько секунд после изменения сбрасываем store на диск
+FLUSH_DELAY = 2.0
+# сколько дней партиция живёт в store, потом уезжает в архив
+RETENTION_DAYS = 28
+
+
+def _day_key(ts: int) -> str:
+    return datetime.fromtimestamp(ts, MSK).strftime("%Y-%m-%d")
+
+
+def _week_key(day_key: str) -> str:
+    year, week, _ = datetime.strptime(day_key, "%Y-%m-%d").isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _to_epoch(raw: Any, default: int) -> int:
+    """
+    ts в store — epoch (int). Старые записи хранили ISO-строку.
+    """
+    if isinstance(raw, (int, float)):
+        return int(raw)
+    try:
+        dt = datetime.fromisoformat(str(raw))
+    except (TypeError, ValueError):
+        return default
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=MSK)
+    return int(dt.timestamp())
+
+
+def _ts_of(item: dict[str, Any]) -> int:
+    return item["ts"]
+
+
+class DigestStore:
+    """
+    Пункты дайджеста из канала.
+
+    Хранятся дневными партициями, внутри — по возрастанию ts (epoch).
+    В памяти держим общий отсортированный список ts, поэтому окно
+    «последние N дней» находится бинарным поиском, без разбора всех записей.
+    Дедуп по message_id — через dict (O(1)).
+    На диск пишем отложенно (write-behind), атомарно и только изменённые партиции.
+    Партиции старше retention_days автоматически уходят в недельный архив.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        legacy_path: str | Path | None = None,
+        retention_days: int = RETENTION_DAYS,
+        flush_delay: float = FLUSH_DELAY,
+    ) -> None:
+        self.root = Path(root)
+        self.archive_dir = self.root / "archive"
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.retention_days = retention_days
+        self.flush_delay = flush_delay
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._loaded = False
+
+        self._partitions: dict[str, list[dict[str, Any]]] = {}
+        self._ts: list[int] = []
+        self._items: list[dict[str, Any]] = []
+        self._by_id: dict[Any, dict[str, Any]] = {}
+
+        self._dirty_keys: set[str] = set()
+        self._archived: dict[str, list[dict[str, Any]]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    # -------------------------
+    # in-memory index
+    # -------------------------
+    def _partition_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _insert(self, item: dict[str, Any]) -> str:
+        ts = item["ts"]
+        i = bisect_right(self._ts, ts)
+        self._ts.insert(i, ts)
+        self._items.insert(i, item)
+
+        key = _day_key(ts)
+        insort(self._partitions.setdefault(key, []), item, key=_ts_of)
+
+        message_id = item.get("message_id")
+        if message_id is not None:
+            self._by_id[message_id] = item
+        return key
+
+    def _archive_old(self, now_ts: int) -> None:
+        """
+        Старые партиции — всегда префикс общего списка, поэтому срезаем с начала.
+        """
+        cutoff = _day_key(now_ts - self.retention_days * 86400)
+        if not self._ts or _day_key(self._ts[0]) >= cutoff:
+            return
+
+        for key in sorted(self._partitions):
+            if key >= cutoff:
+                break
+            items = self._partitions.pop(key)
+            del self._ts[: len(items)]
+            del self._items[: len(items)]
+            for it in items:
+                self._by_id.pop(it.get("message_id"), None)
+            self._archived.setdefault(key, []).extend(items)
+            self._dirty_keys.add(key)
+
+    # -------------------------
+    # load
+    # -------------------------
+    def _migrate_legacy(self) -> None:
+        legacy = self.legacy_path
+        if legacy is None or not legacy.exists():
+            return
+
+        try:
+            data = json.loads(legacy.read_text(encoding="utf-8"))
+        except Exception:
+            data = []
+
+        now_ts = int(datetime.now(MSK).timestamp())
+        touched: set[str] = set()
+        for it in data if isinstance(data, list) else []:
+            if not isinstance(it, dict):
+                continue
+            if it.get("message_id") is not None and it["message_id"] in self._by_id:
+                continue
+            item = dict(it, ts=_to_epoch(it.get("ts"), now_ts))
+            touched.add(self._insert(item))
+
+        # сначала пишем партиции, потом убираем старый файл — чтобы не потерять данные
+        for key in touched:
+            save_json(self._partition_path(key), self._partitions[key], indent=None)
+        legacy.replace(legacy.with_suffix(legacy.suffix + ".migrated"))
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if self.root.exists():
+            for p in sorted(self.root.glob("*.json")):
+                try:
+                    data = json.loads(p.read_text(encoding="utf-8"))
+                except Exception:
+                    continue
+                for it in data if isinstance(data, list) else []:
+                    if isinstance(it, dict) and isinstance(it.get("ts"), int):
+                        self._insert(it)
+
+        self._migrate_legacy()
+        self._archive_old(int(datetime.now(MSK).timestamp()))
+
+    # -------------------------
+    # write-behind
+    # -------------------------
+    def _schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # вне event loop (скрипты, тесты) — пишем сразу
+            self.flush()
+            return
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_delay, self._flush_in_background)
+
+    def _flush_in_background(self) -> None:
+        # сама запись — в пуле потоков, event loop не ждёт диск
+        self._flush_task = asyncio.ensure_future(run_io(self.flush, path=self.root))
+
+    def _append_archive(self, key: str, items: list[dict[str, Any]]) -> None:
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        path = self.archive_dir / f"{_week_key(key)}.jsonl"
+        with path.open("a", encoding="utf-8") as f:
+            for it in items:
+                f.write(json.dumps(it, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def flush(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                self._flush_handle = None
+                writes = {k: list(self._partitions.get(k, [])) for k in self._dirty_keys}
+                archived = self._archived
+                self._dirty_keys = set()
+                self._archived = {}
+
+            for key, items in sorted(archived.items()):
+                self._append_archive(key, items)
+            for key, items in writes.items():
+                path = self._partition_path(key)
+                if items:
+                    save_json(path, items, indent=None)
+                else:
+                    path.unlink(missing_ok=True)
+
+    # -------------------------
+    # public API
+    # -------------------------
+    def add(self, item: dict[str, Any]) -> bool:
+        """
+        Добавляет пункт. False — если такой message_id уже есть.
+        """
+        now_ts = int(datetime.now(MSK).timestamp())
+        item = dict(item, ts=_to_epoch(item.get("ts"), now_ts))
+        message_id = item.get("message_id")
+
+        with self._lock:
+            self._ensure_loaded()
+            if message_id is not None and message_id in self._by_id:
+                return False
+            self._dirty_keys.add(self._insert(item))
+            self._archive_old(now_ts)
+        self._schedule_flush()
+        return True
+
+    def __contains__(self, message_id: object) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            return message_id in self._by_id
+
+    def items(self) -> list[dict[str, Any]]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._items)
+
+    def since(self, ts: int) -> list[dict[str, Any]]:
+        """
+        Пункты с ts >= заданного, по возрастанию времени.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._items[bisect_left(self._ts, ts):]
+
+    def count_since(self, ts: int) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._ts) - bisect_left(self._ts, ts)
+
+    def remove(self, message_ids: Iterable[Any]) -> int:
+        """
+        Убирает пункты с указанными message_id (например, уже разосланные). Возвращает сколько убрано.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            gone = [self._by_id.pop(mid) for mid in set(message_ids) if mid in self._by_id]
+            if not gone:
+                return 0
+            gone_refs = {id(it) for it in gone}
+            kept = [(ts, it) for ts, it in zip(self._ts, self._items) if id(it) not in gone_refs]
+            self._ts = [ts for ts, _ in kept]
+            self._items = [it for _, it in kept]
+            for key in {_day_key(it["ts"]) for it in gone}:
+                partition = [it for it in self._partitions.get(key, []) if id(it) not in gone_refs]
+                if partition:
+                    self._partitions[key] = partition
+                else:
+                    self._partitions.pop(key, None)
+                self._dirty_keys.add(key)
+        self._schedule_flush()
+        return len(gone)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            self._dirty_keys.update(self._partitions)
+            self._partitions = {}
+            self._ts = []
+            self._items = []
+            self._by_id = {}
+        self._schedule_flush()
+
+
+_store: DigestStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> DigestStore:
+    """
+    Общий store для коллектора, публикатора и админ-команд (создаётся при первом обращении).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DigestStore(STORE_DIR, legacy_path=STORE_PATH)
+        return _store
+
+
+def flush_store() -> None:
+    if _store is not None:
+        _store.flush()
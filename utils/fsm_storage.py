@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from utils.storage import run_io
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+FSM_PATH = BASE_DIR / "data" / "fsm.sqlite3"
+
+# сколько сессий держим в памяти (LRU)
+CACHE_SIZE = 10_000
+# запись на диск — пачкой, не позже чем через FLUSH_DELAY секунд после изменения
+FLUSH_DELAY = 0.05
+# ...или сразу, если накопилось столько изменённых сессий
+FLUSH_BATCH = 200
+# как часто фоновая задача удаляет просроченные сессии
+SWEEP_INTERVAL = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fsm (
+    key     TEXT PRIMARY KEY,
+    state   TEXT,
+    data    TEXT NOT NULL DEFAULT '{}',
+    updated REAL NOT NULL
+)
+"""
+
+# (state, data, updated — epoch последнего изменения)
+Entry = tuple[str | None, dict[str, Any], float]
+_EMPTY: Entry = (None, {}, 0.0)
+
+# ключ TTL: состояние, группа состояний или их строковые имена ("LeadForm:contact_text", "LeadForm")
+TTLKey = str | State | type[StatesGroup]
+
+
+def _key(key: StorageKey) -> str:
+    return ":".join(
+        str(part) if part is not None else ""
+        for part in (
+            key.bot_id,
+            key.chat_id,
+            key.user_id,
+            key.thread_id,
+            key.business_connection_id,
+            key.destiny,
+        )
+    )
+
+
+def _state_name(state: StateType) -> str | None:
+    return state.state if isinstance(state, State) else state
+
+
+def _ttl_name(key: TTLKey) -> str:
+    if isinstance(key, State):
+        return key.state
+    if isinstance(key, type) and issubclass(key, StatesGroup):
+        return key.__full_group_name__
+    return str(key)
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    FSM-хранилище aiogram на SQLite (WAL) с LRU-кэшем в памяти.
+
+    - чтение горячих сессий — из кэша, без диска;
+    - запись — сначала в кэш, на диск пачкой (write-behind, одна транзакция);
+    - несколько процессов бота могут работать с одним файлом: перед чтением из кэша
+      проверяем PRAGMA data_version и сбрасываем кэш, если файл менял кто-то другой.
+
+    TTL: state_ttls задаёт время жизни сессии по состоянию (или группе состояний),
+    default_ttl — для остальных. Просроченная сессия читается как пустая
+    (брошенная форма больше не перехватывает сообщения), а фоновая задача
+    (start_sweeper) удаляет такие сессии с диска.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = FSM_PATH,
+        *,
+        cache_size: int = CACHE_SIZE,
+        flush_delay: float = FLUSH_DELAY,
+        flush_batch: int = FLUSH_BATCH,
+        state_ttls: Mapping[TTLKey, float] | None = None,
+        default_ttl: float | None = None,
+        time_func: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        # часы для отметок updated и проверки TTL (в тестах — подменяемые)
+        self.time_func = time_func
+        self.cache_size = max(1, cache_size)
+        self.flush_delay = flush_delay
+        self.flush_batch = max(1, flush_batch)
+        self.state_ttls = {_ttl_name(k): float(v) for k, v in (state_ttls or {}).items()}
+        self.default_ttl = default_ttl
+        self.expired_total = 0
+        self._sweeper: asyncio.Task | None = None
+
+        self._db_lock = threading.Lock()
+        self._conn = self._connect()
+        self._data_version = self._read_data_version()
+
+        self._cache: OrderedDict[str, Entry] = OrderedDict()
+        # изменения, ещё не записанные на диск (читаются раньше кэша)
+        self._dirty: dict[str, Entry] = {}
+        # пачка, которая прямо сейчас пишется на диск
+        self._writing: dict[str, Entry] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._closed = False
+
+    # -------------------------
+    # sqlite
+    # -------------------------
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # одно соединение на хранилище; доступ из потоков пула — под _db_lock
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        return conn
+
+    def _read_data_version(self) -> int:
+        with self._db_lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_row(self, key: str) -> Entry:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT state, data, updated FROM fsm WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return _EMPTY
+        try:
+            data = json.loads(row[1] or "{}")
+        except ValueError:
+            data = {}
+        return row[0], data, row[2]
+
+    def _write_batch(self, items: list[tuple[str, Entry]]) -> None:
+        upserts = []
+        deletes = []
+        for key, (state, data, updated) in items:
+            if state is None and not data:
+                deletes.append((key,))
+            else:
+                upserts.append((key, state, json.dumps(data, ensure_ascii=False), updated))
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if deletes:
+                    self._conn.executemany("DELETE FROM fsm WHERE key = ?", deletes)
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT INTO fsm (key, state, data, updated) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET "
+                        "state = excluded.state, data = excluded.data, updated = excluded.updated",
+                        upserts,
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # -------------------------
+    # ttl
+    # -------------------------
+    def ttl_for(self, state: str | None) -> float | None:
+        if state is not None:
+            ttl = self.state_ttls.get(state)
+            if ttl is None:
+                ttl = self.state_ttls.get(state.split(":", 1)[0])
+            if ttl is not None:
+                return ttl
+        return self.default_ttl
+
+    def _is_expired(self, state: str | None, updated: float, now: float) -> bool:
+        ttl = self.ttl_for(state)
+        return ttl is not None and updated > 0 and now - updated >= ttl
+
+    def _select_expired(self, now: float) -> list[tuple[str, float]]:
+        with self._db_lock:
+            rows = self._conn.execute("SELECT key, state, updated FROM fsm").fetchall()
+        return [(key, updated) for key, state, updated in rows if self._is_expired(state, updated, now)]
+
+    def _delete_expired(self, expired: list[tuple[str, float]]) -> int:
+        # updated в условии: если сессию успел обновить другой процесс — не трогаем
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._conn.executemany("DELETE FROM fsm WHERE key = ? AND updated = ?", expired)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cur.rowcount
+
+    async def sweep(self, now: float | None = None) -> int:
+        """
+        Удаляет просроченные сессии с диска и из кэша. Возвращает число удалённых.
+        """
+        now = self.time_func() if now is None else now
+        await self.flush()
+        expired = await run_io(self._select_expired, now, path=self.path)
+        expired = [(key, updated) for key, updated in expired if key not in self._dirty]
+        if not expired:
+            return 0
+        removed = await run_io(self._delete_expired, expired, path=self.path)
+        for key, _ in expired:
+            self._cache.pop(key, None)
+        self.expired_total += removed
+        return removed
+
+    async def _sweep_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.sweep()
+                if removed:
+                    live = await self.sessions_by_state()
+                    logger.info("fsm storage: %s expired sessions removed, live: %s", removed, live)
+            except Exception:
+                logger.exception("fsm storage: sweep failed")
+
+    async def start_sweeper(self, interval: float = SWEEP_INTERVAL) -> None:
+        # async: хук dp.startup синхронные функции запускает в потоке, где нет event loop
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop(interval))
+
+    def _count_by_state(self, now: float) -> dict[str, int]:
+        with self._db_lock:
+            rows = self._conn.execute("SELECT state, updated FROM fsm").fetchall()
+        counts: dict[str, int] = {}
+        for state, updated in rows:
+            if self._is_expired(state, updated, now):
+                continue
+            name = state or "—"
+            counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    async def sessions_by_state(self) -> dict[str, int]:
+        """
+        Живые (не просроченные) сессии по состояниям; "—" — сессии только с данными.
+        """
+        await self.flush()
+        return await run_io(self._count_by_state, self.time_func(), path=self.path)
+
+    # -------------------------
+    # cache
+    # -------------------------
+    def _revalidate(self) -> None:
+        # data_version меняется только от коммитов других соединений (процессов).
+        # Если соединение занято нашей же записью — не ждём её в event loop, проверим в следующий раз.
+        if not self._db_lock.acquire(blocking=False):
+            return
+        try:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            self._db_lock.release()
+        if version != self._data_version:
+            self._data_version = version
+            self._cache.clear()
+
+    def _remember(self, key: str, entry: Entry) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _load(self, key: str) -> Entry:
+        entry = self._dirty.get(key) or self._writing.get(key)
+        if entry is not None:
+            return entry
+        self._revalidate()
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry
+        entry = await run_io(self._read_row, key)
+        # пока читали, сессию могли изменить — свежая запись важнее
+        if key in self._dirty:
+            return self._dirty[key]
+        self._remember(key, entry)
+        return entry
+
+    async def _get(self, key: str) -> Entry:
+        entry = await self._load(key)
+        state, data, updated = entry
+        if (state is not None or data) and self._is_expired(state, updated, self.time_func()):
+            # брошенная сессия: читаем как пустую и удаляем при ближайшей записи
+            self.expired_total += 1
+            self._put(key, None, {})
+            return _EMPTY
+        return entry
+
+    def _put(self, key: str, state: str | None, data: dict[str, Any]) -> None:
+        entry: Entry = (state, data, self.time_func())
+        self._dirty[key] = entry
+        self._remember(key, entry)
+        self._schedule_flush()
+
+    # -------------------------
+    # write-behind
+    # -------------------------
+    def _schedule_flush(self) -> None:
+        if len(self._dirty) >= self.flush_batch:
+            self._start_flush()
+            return
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.flush_delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> None:
+        while self._dirty:
+            self._writing = self._dirty
+            self._dirty = {}
+            try:
+                await run_io(self._write_batch, list(self._writing.items()), path=self.path)
+            except Exception:
+                # не теряем изменения: вернём их в очередь (более новые не перетираем)
+                for key, entry in self._writing.items():
+                    self._dirty.setdefault(key, entry)
+                logger.exception("fsm storage: flush failed")
+                raise
+            finally:
+                self._writing = {}
+
+    # -------------------------
+    # BaseStorage
+    # -------------------------
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        k = _key(key)
+        _, data, _ = await self._get(k)
+        self._put(k, _state_name(state), data)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        state, _, _ = await self._get(_key(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        k = _key(key)
+        state, _, _ = await self._get(k)
+        self._put(k, state, dict(data))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, data, _ = await self._get(_key(key))
+        # копия: хендлер может менять dict, не трогая кэш
+        return dict(data)
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is not None:
+            try:
+                await self._flush_task
+            except Exception:
+                pass
+        await self.flush()
+        with self._db_lock:
+            self._conn.close()
@@ -13,10 +13,10 @@ def load_json(path: str | Path) -> Any:
         return json.load(f)
 
 
-def save_json(path: str | Path, data: Any) -> None:
+def save_json(path: str | Path, data: Any, *, indent: int | None = 2) -> None:
     p = Path(path)
     p.parent.mkdir(parents=True, exist_ok=True)
     tmp = p.with_suffix(p.suffix + ".tmp")
     with tmp.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        json.dump(data, f, ensure_ascii=False, indent=indent)
     tmp.replace(p)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable, TextIO
+
+# fsync делаем пачками: раз в N записей (и при flush/close)
+FSYNC_EVERY = 20
+
+
+def dumps_line(entry: Any) -> str:
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+class JsonlJournal:
+    """
+    Append-only JSONL: одна JSON-строка на запись.
+    Запись — O(1) (дописываем строку в конец), fsync — раз в fsync_every записей;
+    недописанная после падения строка при чтении пропускается.
+    На нём построены журнал заявок, outbox и журналы доставки рассылок.
+    """
+
+    def __init__(self, path: str | Path, *, fsync_every: int = FSYNC_EVERY) -> None:
+        self.path = Path(path)
+        self.fsync_every = max(1, fsync_every)
+
+        self._lock = threading.Lock()
+        self._fh: TextIO | None = None
+        self._unsynced = 0
+
+    def _prepare(self) -> None:
+        # вызывается под lock перед любым обращением к файлу (для миграций в наследниках)
+        pass
+
+    # -------------------------
+    # write
+    # -------------------------
+    def _handle(self) -> TextIO:
+        if self._fh is None or self._fh.closed:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = self.path.open("a", encoding="utf-8")
+            # хвост после падения мог остаться без \n — не склеиваем с ним новую запись
+            if self._fh.tell() > 0:
+                with self.path.open("rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._fh.write("\n")
+        return self._fh
+
+    def _sync(self) -> None:
+        if self._fh is not None and not self._fh.closed and self._unsynced:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+        self._unsynced = 0
+
+    def append(self, entry: dict[str, Any]) -> None:
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[dict[str, Any]]) -> None:
+        """
+        Несколько записей одной операцией: одна запись в файл и не больше одного fsync.
+        """
+        with self._lock:
+            self._prepare()
+            lines = [dumps_line(entry) + "\n" for entry in entries]
+            if not lines:
+                return
+            fh = self._handle()
+            fh.write("".join(lines))
+            # до ОС доходит сразу (читатели видят запись), на диск — пачкой
+            fh.flush()
+            self._unsynced += len(lines)
+            if self._unsynced >= self.fsync_every:
+                self._sync()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._prepare()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            self._unsynced = 0
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text("", encoding="utf-8")
+            tmp.replace(self.path)
+
+    # -------------------------
+    # read
+    # -------------------------
+    def read_all(self) -> list[dict[str, Any]]:
+        with self._lock:
+            self._prepare()
+            if not self.path.exists():
+                return []
+
+            out: list[dict[str, Any]] = []
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        out.append(json.loads(line))
+                    except ValueError:
+                        # недописанная строка после падения — пропускаем
+                        continue
+            return out
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+# сколько готовых клавиатур держим (LRU)
+MAXSIZE = 512
+
+
+def _freeze(value: Any) -> Hashable:
+    """
+    Приводит аргументы билдера к хешируемому виду (списки -> кортежи и т.п.).
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(x) for x in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(x) for x in value)
+    return value
+
+
+class KeyboardCache:
+    """
+    LRU-кэш готовых InlineKeyboardMarkup/ReplyKeyboardMarkup.
+
+    Модели aiogram заморожены (frozen pydantic), поэтому один объект
+    можно безопасно отдавать во все ответы. Вложенные списки кнопок не трогаем.
+    """
+
+    def __init__(self, maxsize: int = MAXSIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], T]) -> T:
+        with self._lock:
+            markup = self._entries.get(key)
+            if markup is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return markup
+            self.misses += 1
+
+        markup = build()
+        with self._lock:
+            self._entries[key] = markup
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return markup
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+keyboard_cache = KeyboardCache()
+
+
+def cached_keyboard(builder: Callable[..., T]) -> Callable[..., T]:
+    """
+    Декоратор билдера клавиатуры: ключ — (билдер, аргументы, version).
+    version — версия контента каталога; передаётся необязательным keyword-аргументом.
+    """
+    name = f"{builder.__module__}.{builder.__qualname__}"
+
+    @functools.wraps(builder)
+    def wrapper(*args: Any, version: int | None = None, **kwargs: Any) -> T:
+        key = (name, _freeze(args), _freeze(kwargs), version)
+        return keyboard_cache.get_or_build(key, lambda: builder(*args, **kwargs))
+
+    return wrapper
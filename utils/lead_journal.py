@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+from utils.json_loader import load_json
+from utils.jsonl_journal import FSYNC_EVERY, JsonlJournal, dumps_line
+
+
+class LeadJournal(JsonlJournal):
+    """
+    Append-only журнал заявок: одна JSON-строка на заявку.
+    Чтение отдаёт тот же list[dict], что раньше лежал в leads.json;
+    сам leads.json переносится в журнал при первом обращении.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        legacy_path: str | Path | None = None,
+        fsync_every: int = FSYNC_EVERY,
+    ) -> None:
+        super().__init__(path, fsync_every=fsync_every)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._migrated = False
+
+    def _prepare(self) -> None:
+        """
+        Разовый перенос старого leads.json (JSON-массив) в журнал.
+        После переноса старый файл переименовывается в *.migrated.
+        """
+        if self._migrated:
+            return
+
+        legacy = self.legacy_path
+        if legacy is not None and legacy.exists() and not self.path.exists():
+            data = load_json(legacy)
+            entries = data if isinstance(data, list) else []
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(dumps_line(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            tmp.replace(self.path)
+            legacy.replace(legacy.with_suffix(legacy.suffix + ".migrated"))
+
+        self._migrated = True
+
+
+_journals: dict[Path, LeadJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(path: str | Path, *, legacy_path: str | Path | None = None) -> LeadJournal:
+    """
+    Один экземпляр журнала на файл (forms и leads_admin пишут/читают через него).
+    """
+    p = Path(path)
+    with _journals_lock:
+        journal = _journals.get(p)
+        if journal is None:
+            journal = LeadJournal(p, legacy_path=legacy_path)
+            _journals[p] = journal
+        return journal
+
+
+def close_journals() -> None:
+    with _journals_lock:
+        journals = list(_journals.values())
+    for journal in journals:
+        journal.close()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from aiogram import types
+from aiogram.exceptions import TelegramBadRequest
+
+
+def _not_modified(error: TelegramBadRequest) -> bool:
+    return "message is not modified" in str(error).lower()
+
+
+async def safe_edit_or_send(
+    callback: types.CallbackQuery,
+    text: str,
+    reply_markup: types.InlineKeyboardMarkup | None = None,
+) -> None:
+    """
+    Навигация по inline-кнопкам: редактируем сообщение с кнопкой (один вызов API).
+    Повторное нажатие на тот же экран («message is not modified») — ничего не шлём.
+    Если сообщение отредактировать нельзя (старое, с фото и т.п.) — отправляем новое.
+    """
+    if not callback.message:
+        return
+
+    try:
+        await callback.message.edit_text(text, reply_markup=reply_markup)
+    except TelegramBadRequest as e:
+        if _not_modified(e):
+            return
+        await callback.message.answer(text, reply_markup=reply_markup)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Iterable
+
+from aiogram import Bot
+
+from utils.outbox import Outbox, OutboxDispatcher
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+OUTBOX_PATH = BASE_DIR / "data" / "outbox.jsonl"
+
+_dispatcher: OutboxDispatcher | None = None
+
+
+def get_dispatcher(bot: Bot) -> OutboxDispatcher:
+    """
+    Один диспетчер на процесс: создаётся при первом обращении, сбрасывается close_outbox.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = OutboxDispatcher(bot, Outbox(OUTBOX_PATH))
+    return _dispatcher
+
+
+async def notify_admins(bot: Bot, admin_ids: Iterable[int], text: str) -> list[str]:
+    """
+    Ставит уведомления всем админам в outbox одной записью на диск (один fsync
+    на любое число админов) и запускает доставку; отправки идут параллельно в фоне,
+    их не ждём. Возвращает id записей.
+    """
+    return await get_dispatcher(bot).enqueue_many(admin_ids, text)
+
+
+async def start_outbox(bot: Bot) -> None:
+    # на старте досылаем то, что не ушло до падения/рестарта
+    replayed = await get_dispatcher(bot).replay()
+    if replayed:
+        logger.info("outbox: replaying %s undelivered notifications", replayed)
+
+
+async def close_outbox() -> None:
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.close()
+        _dispatcher = None
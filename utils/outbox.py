@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Iterable
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+
+from utils.jsonl_journal import JsonlJournal
+from utils.rate_limit import PRIORITY_NOTIFY, request_priority
+from utils.storage import run_io
+
+logger = logging.getLogger(__name__)
+
+# сколько ждём одну отправку
+SEND_TIMEOUT = 10.0
+# повторы: 1, 2, 4, ... секунд, но не больше MAX_DELAY; после MAX_ATTEMPTS — сдаёмся
+BASE_DELAY = 1.0
+MAX_DELAY = 300.0
+MAX_ATTEMPTS = 10
+# переписываем файл, когда в нём накопилось столько закрытых записей
+COMPACT_EVERY = 200
+
+OP_PUT = "put"
+OP_DONE = "done"
+OP_DROP = "drop"
+
+
+class Outbox:
+    """
+    Надёжная очередь исходящих сообщений: append-only JSONL.
+
+    {"op": "put", "id", "chat_id", "text", "ts"} — пишется (с fsync) до отправки,
+    {"op": "done", "id"} / {"op": "drop", "id", "error"} — после.
+    Всё, у чего нет done/drop, после рестарта отправляется заново.
+    """
+
+    def __init__(self, path: str | Path, *, compact_every: int = COMPACT_EVERY) -> None:
+        self.path = Path(path)
+        self.compact_every = max(1, compact_every)
+        # fsync на каждую запись: outbox пишется редко, зато ничего не теряем
+        self._journal = JsonlJournal(self.path, fsync_every=1)
+        self._lock = threading.Lock()
+        self._pending: dict[str, dict[str, Any]] | None = None
+        self._closed_records = 0
+
+    def _ensure_loaded(self) -> dict[str, dict[str, Any]]:
+        if self._pending is None:
+            pending: dict[str, dict[str, Any]] = {}
+            closed = 0
+            for record in self._journal.read_all():
+                entry_id = record.get("id")
+                if record.get("op") == OP_PUT and entry_id:
+                    pending[entry_id] = record
+                elif entry_id in pending:
+                    pending.pop(entry_id)
+                    closed += 1
+            self._pending = pending
+            self._closed_records = closed
+        return self._pending
+
+    def put(self, chat_id: int, text: str) -> dict[str, Any]:
+        return self.put_many([chat_id], text)[0]
+
+    def put_many(self, chat_ids: Iterable[int], text: str) -> list[dict[str, Any]]:
+        """
+        Один текст нескольким получателям: все записи put — одной дозаписью и одним fsync.
+        """
+        ts = int(time.time())
+        entries = [
+            {"op": OP_PUT, "id": uuid.uuid4().hex[:16], "chat_id": int(chat_id), "text": text, "ts": ts}
+            for chat_id in chat_ids
+        ]
+        with self._lock:
+            pending = self._ensure_loaded()
+            self._journal.append_many(entries)
+            for entry in entries:
+                pending[entry["id"]] = entry
+        return entries
+
+    def _close_entry(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            pending = self._ensure_loaded()
+            if pending.pop(record["id"], None) is None:
+                return
+            self._journal.append(record)
+            self._closed_records += 1
+            if self._closed_records >= self.compact_every:
+                self._compact()
+
+    def mark_done(self, entry_id: str) -> None:
+        self._close_entry({"op": OP_DONE, "id": entry_id})
+
+    def mark_dropped(self, entry_id: str, error: str) -> None:
+        self._close_entry({"op": OP_DROP, "id": entry_id, "error": error})
+
+    def pending(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return sorted(self._ensure_loaded().values(), key=lambda e: e["ts"])
+
+    def _compact(self) -> None:
+        # в файле остаются только недоставленные put
+        pending = self._ensure_loaded()
+        self._journal.close()
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for entry in sorted(pending.values(), key=lambda e: e["ts"]):
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.path)
+        self._closed_records = 0
+
+    def close(self) -> None:
+        self._journal.close()
+
+
+def backoff_delay(attempt: int, *, base: float = BASE_DELAY, cap: float = MAX_DELAY) -> float:
+    """
+    Экспоненциальная задержка перед попыткой attempt (1, 2, ...) с небольшим разбросом.
+    """
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay + random.uniform(0, delay * 0.1)
+
+
+class OutboxDispatcher:
+    """
+    Доставляет записи Outbox: каждая — в своей задаче, повторы с экспоненциальной паузой.
+    TelegramBadRequest (например, битая разметка) и TelegramForbiddenError (админ заблокировал бота)
+    не лечатся повтором — запись отбрасывается.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        outbox: Outbox,
+        *,
+        timeout: float = SEND_TIMEOUT,
+        max_attempts: int = MAX_ATTEMPTS,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+    ) -> None:
+        self.bot = bot
+        self.outbox = outbox
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._tasks: set[asyncio.Task] = set()
+        # id записей, которые уже доставляются (чтобы replay не запускал дубль)
+        self._inflight: set[str] = set()
+
+    async def enqueue(self, chat_id: int, text: str) -> str:
+        return (await self.enqueue_many([chat_id], text))[0]
+
+    async def enqueue_many(self, chat_ids: Iterable[int], text: str) -> list[str]:
+        """
+        Записывает все сообщения на диск одним fsync и запускает их доставку параллельно.
+        """
+        entries = await run_io(self.outbox.put_many, list(chat_ids), text, path=self.outbox.path)
+        for entry in entries:
+            self._spawn(entry)
+        return [entry["id"] for entry in entries]
+
+    async def replay(self) -> int:
+        """
+        Запускает доставку всего, что осталось недоставленным (например, после рестарта).
+        """
+        pending = await run_io(self.outbox.pending, path=self.outbox.path)
+        for entry in pending:
+            self._spawn(entry)
+        return len(pending)
+
+    def _spawn(self, entry: dict[str, Any]) -> None:
+        if entry["id"] in self._inflight:
+            return
+        self._inflight.add(entry["id"])
+        task = asyncio.create_task(self._deliver(entry))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _deliver(self, entry: dict[str, Any]) -> None:
+        entry_id = entry["id"]
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    with request_priority(PRIORITY_NOTIFY):
+                        await asyncio.wait_for(
+                            self.bot.send_message(entry["chat_id"], entry["text"]),
+                            self.timeout,
+                        )
+                except TelegramRetryAfter as e:
+                    delay = float(e.retry_after)
+                    error = "retry after"
+                except (TelegramBadRequest, TelegramForbiddenError) as e:
+                    # битая разметка, бот заблокирован или выгнан из чата — повтор не поможет
+                    await run_io(self.outbox.mark_dropped, entry_id, str(e), path=self.outbox.path)
+                    logger.warning("outbox %s: dropped (%s)", entry_id, e)
+                    return
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    delay = backoff_delay(attempt, base=self.base_delay, cap=self.max_delay)
+                    error = repr(e)
+                else:
+                    await run_io(self.outbox.mark_done, entry_id, path=self.outbox.path)
+                    return
+
+                if attempt >= self.max_attempts:
+                    await run_io(self.outbox.mark_dropped, entry_id, error, path=self.outbox.path)
+                    logger.warning("outbox %s: giving up after %s attempts (%s)", entry_id, attempt, error)
+                    return
+                logger.info("outbox %s: attempt %s failed (%s), retry in %.1fs", entry_id, attempt, error, delay)
+                await asyncio.sleep(delay)
+        finally:
+            self._inflight.discard(entry_id)
+
+    async def wait_idle(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def close(self) -> None:
+        """
+        Останавливает доставку. Недоставленное остаётся в файле и уйдёт после рестарта.
+        """
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        await run_io(self.outbox.close, path=self.outbox.path)
@@ -1,11 +1,62 @@
 from __future__ import annotations
 
+from collections import Counter
 from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import CallbackQuery, Message, TelegramObject, User
 
 
 @dataclass(frozen=True)
 class Access:
-    admin_ids: set[int]
+    admin_ids: frozenset[int]
 
     def is_admin(self, user_id: int | None) -> bool:
         return user_id is not None and user_id in self.admin_ids
+
+
+class AdminGate(BaseMiddleware):
+    """
+    Outer middleware админского роутера: апдейты не от админов отсекаются
+    до подбора хендлеров (роутер для них как будто пуст).
+
+    В rejected считаются только попытки попасть в админку: команды и нажатия
+    админских кнопок (callback_prefixes). Обычный текст и устаревшие кнопки
+    тоже проходят мимо, но попытками не считаются.
+    """
+
+    def __init__(self, admin_ids: Iterable[int], *, callback_prefixes: Iterable[str] = ()) -> None:
+        self.access = Access(frozenset(admin_ids))
+        self.callback_prefixes = frozenset(callback_prefixes)
+        # "command" / "callback" -> сколько отсечено
+        self.rejected: Counter[str] = Counter()
+
+    @property
+    def rejected_total(self) -> int:
+        return sum(self.rejected.values())
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user: User | None = data.get("event_from_user")
+        if self.access.is_admin(user.id if user else None):
+            return await handler(event, data)
+
+        if isinstance(event, CallbackQuery):
+            # на нажатие ответит общий обработчик устаревших кнопок (handlers/stale.py)
+            if (event.data or "").split(":", 1)[0] in self.callback_prefixes:
+                self.rejected["callback"] += 1
+        elif isinstance(event, Message) and (event.text or "").startswith("/"):
+            self.rejected["command"] += 1
+        # дальше по дереву роутеров апдейт идёт как необработанный
+        return UNHANDLED
+
+    def attach(self, router: Router) -> Router:
+        router.message.outer_middleware(self)
+        router.callback_query.outer_middleware(self)
+        return router
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Iterator
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods.base import TelegramType
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import Response, TelegramMethod
+
+# лимиты Telegram: ~30 сообщений/с на бота, ~1/с в один чат, ~20/мин в группу
+GLOBAL_RATE = 30.0
+PER_CHAT_RATE = 1.0
+PER_CHAT_BURST = 3
+GROUP_RATE = 20 / 60
+# сколько per-chat bucket'ов держим (LRU)
+MAX_CHATS = 10_000
+
+# классы приоритета: меньше — важнее
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NOTIFY = 1
+PRIORITY_BROADCAST = 2
+
+_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(level: int) -> Iterator[None]:
+    """
+    Все запросы к Bot API внутри блока идут с этим приоритетом.
+    По умолчанию — интерактивный (ответы пользователям из хендлеров).
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class PriorityBucket:
+    """
+    Token bucket с очередью по приоритету: освободившийся токен
+    получает самый важный из ожидающих (при равенстве — кто раньше встал).
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump_task: asyncio.Task | None = None
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> None:
+        now = time.monotonic()
+        if not self._waiters and now >= self._blocked_until:
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        if self._pump_task is None or self._pump_task.done() or self._pump_task.get_loop() is not loop:
+            self._pump_task = loop.create_task(self._pump())
+        await fut
+
+    async def _pump(self) -> None:
+        # раздаёт токены ожидающим по мере пополнения
+        while self._waiters:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            self._refill(now)
+            while self._tokens >= 1 and self._waiters:
+                _, _, fut = heapq.heappop(self._waiters)
+                if fut.done():
+                    # ожидающего отменили — токен не тратим
+                    continue
+                fut.set_result(None)
+                self._tokens -= 1
+            if self._waiters:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Middleware сессии бота: все исходящие запросы с chat_id проходят
+    через per-chat и глобальный token bucket.
+
+    Глобальный bucket раздаёт токены по приоритету (request_priority):
+    ответы пользователям > уведомления админам > рассылка.
+    TelegramRetryAfter ставит на паузу весь глобальный поток.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = GLOBAL_RATE,
+        per_chat_rate: float = PER_CHAT_RATE,
+        per_chat_burst: int = PER_CHAT_BURST,
+        group_rate: float = GROUP_RATE,
+        max_chats: int = MAX_CHATS,
+    ) -> None:
+        self.global_bucket = PriorityBucket(rate, capacity=rate)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.group_rate = group_rate
+        self.max_chats = max_chats
+        self._chats: OrderedDict[int | str, PriorityBucket] = OrderedDict()
+
+    def _chat_bucket(self, chat_id: int | str) -> PriorityBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # отрицательные id и @username — группы/каналы, у них лимит строже
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            if is_group:
+                bucket = PriorityBucket(self.group_rate, capacity=self.per_chat_burst)
+            else:
+                bucket = PriorityBucket(self.per_chat_rate, capacity=self.per_chat_burst)
+            self._chats[chat_id] = bucket
+            while len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            # getUpdates, answerCallbackQuery и т.п. — не сообщения, лимиты не касаются
+            return await make_request(bot, method)
+
+        priority = current_priority()
+        # сначала чат, потом глобальный: не держим глобальный токен, пока ждём чат
+        await self._chat_bucket(chat_id).acquire(priority)
+        await self.global_bucket.acquire(priority)
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter as e:
+            self.global_bucket.pause(e.retry_after)
+            raise
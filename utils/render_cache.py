@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Callable, Hashable
+
+
+class RenderCache:
+    """
+    Готовый HTML карточек (услуги, курсы, симптомы).
+
+    Ключ — (namespace, версия контента, key). Когда версия в namespace меняется,
+    все карточки прошлой версии выбрасываются разом — отдельной инвалидации не нужно.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[int, dict[Hashable, str]]] = {}
+
+    def get(self, namespace: str, version: int, key: Hashable, render: Callable[[], str]) -> str:
+        entry = self._entries.get(namespace)
+        if entry is None or entry[0] != version:
+            entry = (version, {})
+            self._entries[namespace] = entry
+
+        cards = entry[1]
+        html = cards.get(key)
+        if html is None:
+            html = render()
+            cards[key] = html
+        return html
+
+    def size(self, namespace: str) -> int:
+        entry = self._entries.get(namespace)
+        return len(entry[1]) if entry else 0
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+render_cache = RenderCache()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from utils import json_loader
+
+T = TypeVar("T")
+
+# сколько потоков отдаём под файловый I/O (чтение/запись JSON, журналы)
+IO_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="storage-io")
+
+# asyncio.Lock привязан к своему loop, поэтому храним блокировки по loop'ам
+_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[Path, asyncio.Lock]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _lock_for(path: str | Path) -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    per_loop = _locks.setdefault(loop, {})
+    key = Path(path)
+    lock = per_loop.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        per_loop[key] = lock
+    return lock
+
+
+async def run_io(func: Callable[..., T], *args: Any, path: str | Path | None = None, **kwargs: Any) -> T:
+    """
+    Выполняет блокирующую функцию в пуле потоков, не занимая event loop.
+    Если передан path — вызовы для одного файла идут строго по очереди.
+    """
+    loop = asyncio.get_running_loop()
+    call = partial(func, *args, **kwargs)
+    if path is None:
+        return await loop.run_in_executor(_executor, call)
+    async with _lock_for(path):
+        return await loop.run_in_executor(_executor, call)
+
+
+async def load_json(path: str | Path) -> Any:
+    # save_json пишет через tmp + replace, поэтому чтение не ждёт писателей
+    return await run_io(json_loader.load_json, path)
+
+
+async def save_json(path: str | Path, data: Any, *, indent: int | None = 2) -> None:
+    await run_io(json_loader.save_json, path, data, indent=indent, path=path)
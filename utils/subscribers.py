@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, TextIO
+
+from utils.json_loader import save_json
+
+# после стольких дописанных в лог записей сворачиваем лог в users.json
+COMPACT_EVERY = 500
+
+
+class SubscriberStore:
+    """
+    Подписчики бота (нажимали /start).
+
+    В памяти — set для O(1) проверки. На диске:
+    - users.json — снимок {"subscribers": [...], "inactive": {id: ts}};
+    - users.log — изменения, по одному JSON на строку, дописываются в конец:
+      {"id": N} — подписан/вернулся, {"id": N, "inactive": ts} — заблокировал бота,
+      {"id": N, "removed": true} — удалён после окна хранения.
+    Известный активный пользователь не вызывает записи вовсе.
+    """
+
+    def __init__(self, path: str | Path, *, compact_every: int = COMPACT_EVERY) -> None:
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix(".log")
+        self.compact_every = max(1, compact_every)
+
+        self._lock = threading.Lock()
+        self._ids: set[int] | None = None
+        # id -> когда (epoch) пользователь стал недоступен
+        self._inactive: dict[int, int] = {}
+        self._log: TextIO | None = None
+        self._log_lines = 0
+
+    # -------------------------
+    # load
+    # -------------------------
+    def _read_snapshot(self) -> tuple[set[int], dict[int, int]]:
+        if not self.path.exists():
+            return set(), {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            ids = {int(x) for x in data.get("subscribers", [])}
+            inactive = {int(k): int(v) for k, v in (data.get("inactive") or {}).items()}
+            return ids, inactive
+        except Exception:
+            return set(), {}
+
+    def _read_log(self) -> list[dict[str, Any]]:
+        if not self.log_path.exists():
+            return []
+        out: list[dict[str, Any]] = []
+        with self.log_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    record["id"] = int(record["id"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                out.append(record)
+        return out
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        user_id = record["id"]
+        if record.get("removed"):
+            self._ids.discard(user_id)  # type: ignore[union-attr]
+            self._inactive.pop(user_id, None)
+        elif record.get("inactive") is not None:
+            self._ids.add(user_id)  # type: ignore[union-attr]
+            self._inactive[user_id] = int(record["inactive"])
+        else:
+            self._ids.add(user_id)  # type: ignore[union-attr]
+            self._inactive.pop(user_id, None)
+
+    def _ensure_loaded(self) -> set[int]:
+        if self._ids is None:
+            self._ids, self._inactive = self._read_snapshot()
+            logged = self._read_log()
+            for record in logged:
+                self._apply(record)
+            self._log_lines = len(logged)
+        return self._ids
+
+    # -------------------------
+    # write
+    # -------------------------
+    def _close_log(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _write(self, record: dict[str, Any]) -> None:
+        self._apply(record)
+        if self._log is None or self._log.closed:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log = self.log_path.open("a", encoding="utf-8")
+        self._log.write(json.dumps(record) + "\n")
+        self._log.flush()
+        self._log_lines += 1
+        if self._log_lines >= self.compact_every:
+            self._compact()
+
+    def _compact(self) -> None:
+        ids = self._ensure_loaded()
+        save_json(self.path, {
+            "subscribers": sorted(ids),
+            "inactive": {str(k): v for k, v in sorted(self._inactive.items())},
+        })
+        self._close_log()
+        self.log_path.unlink(missing_ok=True)
+        self._log_lines = 0
+
+    def add(self, user_id: int) -> bool:
+        """
+        Возвращает True, если пользователь новый или вернулся после блокировки (и был записан).
+        """
+        user_id = int(user_id)
+        with self._lock:
+            ids = self._ensure_loaded()
+            if user_id in ids and user_id not in self._inactive:
+                return False
+            self._write({"id": user_id})
+            return True
+
+    def deactivate(self, user_id: int, *, now: int | None = None) -> bool:
+        """
+        Пользователь заблокировал бота / удалил аккаунт: больше не шлём ему рассылки.
+        """
+        user_id = int(user_id)
+        with self._lock:
+            ids = self._ensure_loaded()
+            if user_id not in ids or user_id in self._inactive:
+                return False
+            self._write({"id": user_id, "inactive": int(now if now is not None else time.time())})
+            return True
+
+    def purge_inactive(self, retention_seconds: int, *, now: int | None = None) -> int:
+        """
+        Удаляет тех, кто неактивен дольше retention_seconds. Возвращает число удалённых.
+        """
+        now = int(now if now is not None else time.time())
+        with self._lock:
+            self._ensure_loaded()
+            expired = [uid for uid, ts in self._inactive.items() if now - ts >= retention_seconds]
+            for uid in expired:
+                self._write({"id": uid, "removed": True})
+            return len(expired)
+
+    def compact(self) -> None:
+        with self._lock:
+            self._compact()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log_lines:
+                self._compact()
+            self._close_log()
+
+    # -------------------------
+    # read
+    # -------------------------
+    def __contains__(self, user_id: object) -> bool:
+        with self._lock:
+            return user_id in self._ensure_loaded()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ensure_loaded())
+
+    def all(self) -> list[int]:
+        with self._lock:
+            return sorted(self._ensure_loaded())
+
+    def active(self) -> list[int]:
+        with self._lock:
+            ids = self._ensure_loaded()
+            return sorted(uid for uid in ids if uid not in self._inactive)
+
+    def counts(self) -> tuple[int, int]:
+        """
+        (активные, всего).
+        """
+        with self._lock:
+            ids = self._ensure_loaded()
+            return len(ids) - len(self._inactive), len(ids)
+
+
+_stores: dict[Path, SubscriberStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_subscribers(path: str | Path) -> SubscriberStore:
+    """
+    Один экземпляр на файл: /start и рассылка работают с одним и тем же set.
+    """
+    p = Path(path)
+    with _stores_lock:
+        store = _stores.get(p)
+        if store is None:
+            store = SubscriberStore(p)
+            _stores[p] = store
+        return store
+
+
+def close_subscribers() -> None:
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.close()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import Any
+
+Item = dict[str, str]
+
+
+class SymptomsDoc:
+    """
+    Содержимое symptoms.json: категории с постоянными числовыми id.
+
+    Формат файла:
+        {"next_id": 3, "categories": [{"id": 1, "name": "Маститы", "items": [...]}, ...]}
+
+    id выдаётся при создании категории, не меняется при переименовании
+    и не переиспользуется после удаления — кнопки, уже отправленные в чаты,
+    продолжают вести в ту же категорию. Старый формат ({"категория": [...]})
+    читается с id по алфавиту — одинаково в каждом процессе до первого сохранения.
+
+    items — категория -> список карточек; новые категории заводятся через add_category().
+    """
+
+    def __init__(self) -> None:
+        self.items: dict[str, list[Item]] = {}
+        self.next_id = 1
+        self._ids: dict[str, int] = {}
+        self._names: dict[int, str] = {}
+
+    @classmethod
+    def from_json(cls, raw: Any) -> SymptomsDoc:
+        doc = cls()
+        if isinstance(raw, dict) and isinstance(raw.get("categories"), list):
+            entries = [c for c in raw["categories"] if isinstance(c, dict)]
+            next_id = raw.get("next_id")
+            if isinstance(next_id, int) and next_id > 0:
+                doc.next_id = next_id
+        elif isinstance(raw, dict):
+            # старый формат
+            entries = [{"name": name, "items": raw[name]} for name in sorted(raw)]
+        else:
+            entries = []
+
+        pending: list[tuple[str, list[Item]]] = []
+        for entry in entries:
+            name = str(entry.get("name") or "").strip()
+            if not name or name in doc.items:
+                continue
+            items = entry.get("items")
+            items = items if isinstance(items, list) else []
+            cat_id = entry.get("id")
+            if isinstance(cat_id, int) and cat_id > 0 and cat_id not in doc._names:
+                doc._register(name, cat_id, items)
+            else:
+                # без id (старый формат) или битый/повторный id — выдадим новый
+                pending.append((name, items))
+
+        doc.next_id = max([doc.next_id, *(i + 1 for i in doc._names)])
+        for name, items in pending:
+            doc._register(name, doc._take_id(), items)
+        return doc
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "next_id": self.next_id,
+            "categories": [
+                {"id": cat_id, "name": name, "items": self.items[name]}
+                for cat_id, name in sorted(self._names.items())
+            ],
+        }
+
+    def _take_id(self) -> int:
+        cat_id = self.next_id
+        self.next_id += 1
+        return cat_id
+
+    def _register(self, name: str, cat_id: int, items: list[Item]) -> None:
+        self.items[name] = items
+        self._ids[name] = cat_id
+        self._names[cat_id] = name
+
+    def id_of(self, name: str) -> int | None:
+        return self._ids.get(name)
+
+    def name_of(self, cat_id: int) -> str | None:
+        return self._names.get(cat_id)
+
+    def add_category(self, name: str) -> int:
+        """
+        id категории; если её нет — создаёт пустую с новым id.
+        """
+        cat_id = self._ids.get(name)
+        if cat_id is None:
+            cat_id = self._take_id()
+            self._register(name, cat_id, [])
+        return cat_id
+
+    def rename_category(self, cat_id: int, new_name: str) -> str:
+        """
+        Переименовывает категорию, id и карточки остаются. Возвращает старое название.
+        """
+        old_name = self._names.get(cat_id)
+        if old_name is None:
+            raise KeyError(cat_id)
+        if new_name != old_name and new_name in self._ids:
+            raise ValueError(f"category already exists: {new_name!r}")
+        self.items[new_name] = self.items.pop(old_name)
+        del self._ids[old_name]
+        self._ids[new_name] = cat_id
+        self._names[cat_id] = new_name
+        return old_name
+
+    def buttons(self) -> tuple[tuple[int, str], ...]:
+        # ((id, name), ...) по алфавиту — для клавиатур
+        return tuple((self._ids[name], name) for name in sorted(self.items))
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Hashable
+
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+
+
+class UserEventIsolation(BaseEventIsolation):
+    """
+    Изоляция событий для Dispatcher(events_isolation=...).
+
+    aiogram берёт lock(key) до чтения состояния FSM, поэтому:
+    - апдейты одного пользователя (одного FSM-ключа) идут строго по очереди —
+      шаги формы не гоняются друг с другом;
+    - общий семафор ограничивает число одновременно работающих хендлеров.
+    Семафор берётся уже после lock пользователя: очередь одного пользователя
+    не занимает слоты остальных. Неиспользуемые lock'и удаляются.
+    """
+
+    def __init__(self, limit: int) -> None:
+        # limit — Settings.update_concurrency: сколько хендлеров работает одновременно
+        self.limit = max(1, limit)
+        self._semaphore = asyncio.Semaphore(self.limit)
+        # key -> (lock, сколько апдейтов его держат или ждут)
+        self._locks: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+        self.queued = 0
+        self.running = 0
+        self.processed = 0
+
+    def _acquire_ref(self, key: Hashable) -> asyncio.Lock:
+        lock, refs = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, refs + 1)
+        return lock
+
+    def _release_ref(self, key: Hashable) -> None:
+        lock, refs = self._locks[key]
+        if refs <= 1:
+            del self._locks[key]
+        else:
+            self._locks[key] = (lock, refs - 1)
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        user_lock = self._acquire_ref(key)
+        self.queued += 1
+        started = False
+        try:
+            async with user_lock:
+                async with self._semaphore:
+                    self.queued -= 1
+                    self.running += 1
+                    started = True
+                    try:
+                        yield
+                    finally:
+                        self.running -= 1
+                        self.processed += 1
+        finally:
+            if not started:
+                self.queued -= 1
+            self._release_ref(key)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "processed": self.processed,
+            "users": len(self._locks),
+            "limit": self.limit,
+        }
+
+    async def close(self) -> None:
+        self._locks.clear()
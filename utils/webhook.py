@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from config import Settings
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PATH = "/healthz"
+
+
+async def _healthz(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok"})
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """
+    SimpleRequestHandler с лимитом фоновых задач на апдейты — как tasks_concurrency_limit
+    в polling: UserEventIsolation не ограничивает апдейты без пользователя (channel_post).
+    Сверх лимита запрос ждёт свободного слота, и Telegram не получает 200 раньше времени.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, *, limit: int, **kwargs: Any) -> None:
+        super().__init__(dispatcher, **kwargs)
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        await self._semaphore.acquire()
+        try:
+            return await super()._handle_request_background(bot, request)
+        except BaseException:
+            # задача не создана (например, битый JSON) — слот освобождаем сами
+            self._semaphore.release()
+            raise
+
+    async def _background_feed_update(self, bot: Bot, update: dict[str, Any]) -> None:
+        try:
+            await super()._background_feed_update(bot, update)
+        finally:
+            self._semaphore.release()
+
+
+def build_webhook_app(
+    bot: Bot,
+    dp: Dispatcher,
+    settings: Settings,
+    *,
+    handle_in_background: bool = True,
+) -> web.Application:
+    """
+    aiohttp-приложение: POST settings.webhook_path — апдейты от Telegram
+    (проверяется X-Telegram-Bot-Api-Secret-Token), GET /healthz — проверка живости.
+    startup/shutdown диспетчера привязаны к жизненному циклу приложения.
+    """
+    app = web.Application()
+    app.router.add_get(HEALTH_PATH, _healthz)
+
+    BoundedRequestHandler(
+        dp,
+        bot=bot,
+        # сразу отвечаем Telegram 200, апдейт обрабатывается в фоне
+        # (фоновых задач — не больше update_concurrency)
+        handle_in_background=handle_in_background,
+        limit=settings.update_concurrency,
+        secret_token=settings.webhook_secret or None,
+    ).register(app, path=settings.webhook_path)
+
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher, settings: Settings) -> None:
+    url = settings.webhook_url + settings.webhook_path
+    await bot.set_webhook(
+        url,
+        secret_token=settings.webhook_secret,
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+    logger.info("webhook: %s", url)
+
+    runner = web.AppRunner(build_webhook_app(bot, dp, settings))
+    await runner.setup()
+    site = web.TCPSite(runner, settings.webhook_host, settings.webhook_port)
+    await site.start()
+    try:
+        # работаем, пока процесс не остановят
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()